@@ -0,0 +1,151 @@
+"""
+LLM throughput load harness.
+
+Drives N concurrent AIChatbot agents against an OpenAI-compatible endpoint
+(by default a FakeLLMServer started in-process) and reports throughput,
+latency percentiles and socket usage. Run with src on PYTHONPATH:
+
+    python -m bench.llm_load --agents 50 --turns 10 --stream
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Any, Optional
+
+from core.agent import AIChatbot
+from models.fake_server import FakeLLMServer
+from models.client_pool import get_client_pool, reset_client_pool
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def _summary_ms(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        f"p{p}": round(percentile(values, p) * 1000, 2) if values else None
+        for p in (50, 95, 99)
+    }
+
+async def _run_agent(index: int, turns: int, stream: bool, latencies: List[float],
+                     ttfts: List[float], errors: List[str]):
+    agent = AIChatbot(agent_id=f"load_{index}")
+    for turn in range(turns):
+        prompt = f"agent {index} turn {turn}: summarize the market"
+        start = time.perf_counter()
+
+        if stream:
+            first = None
+            result: Dict[str, Any] = {}
+            async for event in agent.process_stream(prompt):
+                if first is None and event["type"] == "delta":
+                    first = time.perf_counter()
+                result = event
+            if first is not None:
+                ttfts.append(first - start)
+        else:
+            result = await agent.process(prompt)
+
+        if result.get("success"):
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(str(result.get("error")))
+
+async def run_load(agents: int = 10, turns: int = 5, stream: bool = False, url: Optional[str] = None,
+                   server: Optional[FakeLLMServer] = None) -> Dict[str, Any]:
+    """
+    Run the load and return a report. Without `url` a FakeLLMServer (the
+    given one or a default) is started for the duration of the run.
+    """
+    owned_server = None
+    if url is None:
+        owned_server = server or FakeLLMServer()
+        url = await owned_server.start()
+
+    os.environ.setdefault("API_KEY", "load-test")
+    os.environ["BASE_URL"] = url
+    os.environ.pop("BASE_URLS", None)
+    await reset_client_pool()
+
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    errors: List[str] = []
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*[
+            _run_agent(i, turns, stream, latencies, ttfts, errors) for i in range(agents)
+        ])
+        wall = time.perf_counter() - start
+        pool_stats = get_client_pool().get_stats()
+    finally:
+        await reset_client_pool()
+        if owned_server is not None:
+            await owned_server.stop()
+
+    report = {
+        "agents": agents,
+        "turns_per_agent": turns,
+        "stream": stream,
+        "wall_seconds": round(wall, 3),
+        "turns_ok": len(latencies),
+        "turns_failed": len(errors),
+        "throughput_per_second": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": _summary_ms(latencies),
+        "client": {
+            "sessions_created": pool_stats["sessions_created"],
+            "limit_per_host": pool_stats["limit_per_host"],
+            "scheduler": pool_stats["scheduler"]
+        },
+        "errors": sorted(set(errors))[:10]
+    }
+    if stream:
+        report["ttft_ms"] = _summary_ms(ttfts)
+    if owned_server is not None:
+        # Distinct client (host, port) pairs seen = sockets opened against the server
+        report["server"] = owned_server.get_stats()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test AIChatbot against an OpenAI-compatible endpoint")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--url", default=None, help="Existing endpoint; default starts a local fake server")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=100000, help="Scheduler requests-per-minute budget")
+    parser.add_argument("--tpm", type=float, default=100000000, help="Scheduler tokens-per-minute budget")
+    parser.add_argument("--concurrency", type=int, default=64, help="Scheduler max in-flight requests")
+    parser.add_argument("--cache", action="store_true", help="Leave the completion cache enabled")
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    os.environ["LLM_RPM"] = str(args.rpm)
+    os.environ["LLM_TPM"] = str(args.tpm)
+    os.environ["LLM_MAX_CONCURRENT"] = str(args.concurrency)
+    if not args.cache:
+        os.environ["COMPLETION_CACHE"] = "false"
+
+    server = None
+    if args.url is None:
+        server = FakeLLMServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                               error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+
+    report = asyncio.run(run_load(args.agents, args.turns, args.stream, args.url, server))
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
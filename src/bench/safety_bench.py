@@ -0,0 +1,105 @@
+"""
+SystemSafety throughput benchmark.
+
+Compares the anchor-prefiltered combined-matcher engine with the previous
+per-call `re.findall` loop on multi-KB model outputs. Run with src on
+PYTHONPATH:
+
+    python -m bench.safety_bench --sizes 2048 8192 32768
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+from typing import Dict, List, Any
+
+from core.safety import SystemSafety, PolicySet, RiskLevel
+
+WORDS = ("the market moved higher on volume while bitcoin held support and momentum traders "
+         "watched the moving average for a breakout into the close as risk appetite improved").split()
+
+def make_output(size: int, violation: str = "", where: str = "end", seed: int = 0) -> str:
+    """Realistic-looking prose of roughly `size` characters."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + ". "
+        parts.append(sentence)
+        length += len(sentence)
+    text = "".join(parts)[:size]
+    if violation:
+        text = violation + " " + text if where == "start" else text + " " + violation
+    return text
+
+def legacy_check(policies, content: str) -> Dict[str, Any]:
+    """The pre-compilation algorithm, kept here as the baseline."""
+    violations = []
+    max_risk = RiskLevel.NONE
+    action = "allow"
+    for policy in policies:
+        if re.findall(policy.pattern, content):
+            violations.append({"policy": policy.name, "risk": policy.risk_level.name, "action": policy.action})
+            if policy.risk_level.value > max_risk.value:
+                max_risk = policy.risk_level
+            if policy.action == "block":
+                action = "block"
+    if len(violations) >= 3:
+        action = "block"
+    return {"allowed": action != "block", "action": action, "max_risk": max_risk.name}
+
+def _time(fn, content: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(content)
+    return (time.perf_counter() - start) / iterations
+
+def run_bench(sizes: List[int], iterations: int = 2000) -> Dict[str, Any]:
+    policies = PolicySet.from_specs(SystemSafety.DEFAULT_POLICIES).policies
+    safety = SystemSafety()
+    cases = {
+        "clean": ("", "end"),
+        "credential_at_end": ("api token = sk-123456", "end"),
+        "drop_table_at_start": ("DROP TABLE users;", "start"),
+    }
+
+    results = []
+    for size in sizes:
+        for case, (violation, where) in cases.items():
+            content = make_output(size, violation, where)
+            # Both engines must agree on the verdict
+            assert legacy_check(policies, content)["allowed"] == safety.check(content)["allowed"]
+
+            legacy = _time(lambda c: legacy_check(policies, c), content, iterations)
+            compiled = _time(lambda c: safety.check(c, "output"), content, iterations)
+            results.append({
+                "size": size,
+                "case": case,
+                "legacy_us": round(legacy * 1e6, 2),
+                "compiled_us": round(compiled * 1e6, 2),
+                "speedup": round(legacy / compiled, 2) if compiled > 0 else None,
+                "compiled_mb_per_s": round(len(content) / compiled / 1e6, 1) if compiled > 0 else None
+            })
+    return {"iterations": iterations, "results": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SystemSafety.check on multi-KB outputs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2048, 8192, 32768])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    report = run_bench(args.sizes, args.iterations)
+    for row in report["results"]:
+        print(f"{row['size']:>7} B  {row['case']:<20} legacy {row['legacy_us']:>9.2f} us"
+              f"  compiled {row['compiled_us']:>9.2f} us  x{row['speedup']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
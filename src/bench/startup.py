@@ -0,0 +1,120 @@
+"""
+Cold-start import-time report.
+
+Imports the launcher and each subsystem in a fresh interpreter under
+`-X importtime` and reports cumulative import time, the heaviest
+top-level dependencies, and wall-clock time of `launcher --help`. Run
+with src on PYTHONPATH:
+
+    python -m bench.startup --runs 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Any
+
+from launcher import SUBSYSTEMS
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC_DIR + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+    # Fresh bytecode would dominate the first run; keep caches as a real restart would
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of `-X importtime` output as {"module", "self_us", "cumulative_us", "depth"}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip(" ")
+        rows.append({
+            "module": stripped.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            # Nested imports are indented two spaces per level
+            "depth": (len(name) - len(stripped) - 1) // 2
+        })
+    return rows
+
+def measure_import(module: str, top: int = 5) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), cwd=SRC_DIR
+    )
+    if result.returncode != 0:
+        return {"module": module, "error": result.stderr.strip().splitlines()[-1:]}
+    rows = parse_importtime(result.stderr)
+    index = next((i for i in range(len(rows) - 1, -1, -1)
+                  if rows[i]["module"] == module and rows[i]["depth"] == 0), None)
+    target = rows[index] if index is not None else None
+    # Children are listed before their parent; stop at the previous top-level import
+    children = []
+    for row in reversed(rows[:index] if index is not None else []):
+        if row["depth"] == 0:
+            break
+        if row["depth"] == 1:
+            children.append(row)
+    top_level = sorted(children, key=lambda r: r["cumulative_us"], reverse=True)
+    return {
+        "module": module,
+        "cumulative_ms": round(target["cumulative_us"] / 1000, 2) if target else None,
+        "modules_loaded": len(rows),
+        "heaviest": [{"module": r["module"], "ms": round(r["cumulative_us"] / 1000, 2)} for r in top_level[:top]]
+    }
+
+def measure_wall(args: List[str], runs: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, capture_output=True, env=_env(), cwd=SRC_DIR)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1)}
+
+def run_bench(runs: int = 5) -> Dict[str, Any]:
+    report = {
+        "python": sys.version.split()[0],
+        "launcher_help": measure_wall(["-m", "launcher", "--help"], runs),
+        "bare_interpreter": measure_wall(["-c", "pass"], runs),
+        "imports": [measure_import("launcher")]
+    }
+    for name, spec in SUBSYSTEMS.items():
+        entry = measure_import(spec["module"])
+        entry["command"] = name
+        report["imports"].append(entry)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the launcher and subsystems")
+    parser.add_argument("--runs", type=int, default=5, help="Wall-clock samples per command")
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    report = run_bench(args.runs)
+    print(f"python {report['python']}")
+    print(f"bare interpreter     {report['bare_interpreter']['median_ms']:>8.1f} ms (median wall)")
+    print(f"launcher --help      {report['launcher_help']['median_ms']:>8.1f} ms (median wall)")
+    for entry in report["imports"]:
+        label = entry.get("command", "launcher")
+        if "error" in entry:
+            print(f"{label:<20} failed: {entry['error']}")
+            continue
+        heaviest = ", ".join(f"{h['module']} {h['ms']:.1f}" for h in entry["heaviest"][:3])
+        print(f"{label:<20} {entry['cumulative_ms']:>8.1f} ms import  {entry['modules_loaded']:>4} modules  [{heaviest}]")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
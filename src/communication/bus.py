@@ -0,0 +1,218 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"   # Keep the freshest events (market data)
+    DROP_NEWEST = "drop_newest"   # Keep what is already queued
+    BLOCK = "block"               # Publisher waits for room (trades, alerts)
+
+def topic_segment(value: str) -> str:
+    """
+    One topic segment from a free-form value such as a symbol: dots would
+    split it (BRK.B), so they become underscores (market.tick.BRK_B).
+    """
+    return value.replace(".", "_")
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """
+    Dotted topics. `*` matches exactly one segment, a trailing `#` matches
+    any remaining segments (including none).
+    """
+    pattern_parts = pattern.split(".")
+    topic_parts = topic.split(".")
+    for i, part in enumerate(pattern_parts):
+        if part == "#" and i == len(pattern_parts) - 1:
+            return True
+        if i >= len(topic_parts) or (part != "*" and part != topic_parts[i]):
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+class Subscription:
+    """One consumer's bounded queue. Iterate it, or call get()."""
+
+    def __init__(self, bus: "EventBus", pattern: str, maxsize: int, policy: OverflowPolicy):
+        self.bus = bus
+        self.pattern = pattern
+        self.maxsize = maxsize
+        self.policy = policy
+        self._queue: Deque[Tuple[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self._room = asyncio.Event()
+        self._room.set()
+        # BLOCK events waiting for room, oldest first, moved in by one drain task
+        self._parked: Deque[Tuple[str, Any, asyncio.Future]] = deque()
+        self._drainer: Optional[asyncio.Task] = None
+        self.closed = False
+
+        self.delivered = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _offer(self, topic: str, event: Any) -> bool:
+        """Enqueue without waiting. False only when a BLOCK queue is full."""
+        if self._parked:
+            # Only BLOCK queues park; later events wait behind the parked ones
+            return False
+        if len(self._queue) >= self.maxsize:
+            if self.policy is OverflowPolicy.BLOCK:
+                self._room.clear()
+                return False
+            self.dropped += 1
+            if self.policy is OverflowPolicy.DROP_NEWEST:
+                return True
+            self._queue.popleft()
+        self._queue.append((topic, event))
+        self.delivered += 1
+        self._ready.set()
+        return True
+
+    def _park(self, topic: str, event: Any) -> asyncio.Future:
+        """Queue an event behind any already waiting; resolves once it is enqueued."""
+        loop = asyncio.get_running_loop()
+        enqueued = loop.create_future()
+        self._parked.append((topic, event, enqueued))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = loop.create_task(self._drain())
+        return enqueued
+
+    async def _drain(self):
+        while self._parked and not self.closed:
+            if len(self._queue) >= self.maxsize:
+                self._room.clear()
+                await self._room.wait()
+                continue
+            topic, event, enqueued = self._parked.popleft()
+            self._queue.append((topic, event))
+            self.delivered += 1
+            self._ready.set()
+            if not enqueued.done():
+                enqueued.set_result(True)
+
+    async def _put(self, topic: str, event: Any):
+        if not self.closed and not self._offer(topic, event):
+            await self._park(topic, event)
+
+    async def get_with_topic(self) -> Tuple[str, Any]:
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        item = self._queue.popleft()
+        self._room.set()
+        return item
+
+    async def get(self) -> Any:
+        return (await self.get_with_topic())[1]
+
+    def get_nowait(self) -> Optional[Any]:
+        if not self._queue:
+            return None
+        self._room.set()
+        return self._queue.popleft()[1]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self.get()
+
+    def close(self):
+        """Stop receiving. Queued events can still be read, then iteration ends."""
+        if not self.closed:
+            self.closed = True
+            self.bus._remove(self)
+            while self._parked:
+                enqueued = self._parked.popleft()[2]
+                if not enqueued.done():
+                    enqueued.set_result(False)
+            self._ready.set()
+            self._room.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pattern": self.pattern,
+            "policy": self.policy.value,
+            "queued": len(self._queue),
+            "parked": len(self._parked),
+            "maxsize": self.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+class EventBus:
+    """
+    In-process pub/sub for agents sharing one event loop.
+    Publishers send immutable events to dotted topics; each subscriber
+    gets the same object by reference in its own bounded queue, so a slow
+    consumer only affects itself (unless it asked for BLOCK). The
+    subscriber list per topic is resolved once and cached until the
+    subscriptions change.
+    """
+
+    def __init__(self, default_maxsize: int = 1000):
+        self.default_maxsize = default_maxsize
+        self.subscriptions: List[Subscription] = []
+        self._routes: Dict[str, List[Subscription]] = {}
+        self.published = 0
+
+    def subscribe(self, pattern: str = "#", maxsize: Optional[int] = None,
+                  policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> Subscription:
+        subscription = Subscription(self, pattern, maxsize or self.default_maxsize, policy)
+        self.subscriptions.append(subscription)
+        self._routes.clear()
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+            self._routes.clear()
+
+    def _route(self, topic: str) -> List[Subscription]:
+        route = self._routes.get(topic)
+        if route is None:
+            route = self._routes[topic] = [s for s in self.subscriptions if topic_matches(s.pattern, topic)]
+        return route
+
+    async def publish(self, event: Any, topic: Optional[str] = None) -> int:
+        """Fan out to every matching subscriber; waits only on full BLOCK queues."""
+        topic = topic or event.topic
+        self.published += 1
+        route = self._route(topic)
+        blocked = [s for s in route if not s._offer(topic, event)]
+        for subscription in blocked:
+            await subscription._put(topic, event)
+        return len(route)
+
+    def publish_nowait(self, event: Any, topic: Optional[str] = None) -> int:
+        """
+        For synchronous publishers. Full BLOCK queues park the event on the
+        subscription, which enqueues parked events in publish order as the
+        consumer makes room, instead of holding up the caller.
+        """
+        topic = topic or event.topic
+        self.published += 1
+        route = self._route(topic)
+        for subscription in route:
+            if not subscription._offer(topic, event):
+                subscription._park(topic, event)
+        return len(route)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "published": self.published,
+            "subscribers": [s.get_stats() for s in self.subscriptions]
+        }
+
+
+_shared_bus: Optional[EventBus] = None
+
+def get_event_bus() -> EventBus:
+    global _shared_bus
+    if _shared_bus is None:
+        _shared_bus = EventBus()
+    return _shared_bus
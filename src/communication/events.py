@@ -0,0 +1,60 @@
+import time
+from dataclasses import dataclass, field
+
+from communication.bus import topic_segment
+
+# Events are frozen: the bus hands the same instance to every subscriber,
+# so no consumer can change what another one sees. Fields used in a topic
+# go through topic_segment, so a dotted symbol stays one segment.
+
+@dataclass(frozen=True)
+class Tick:
+    symbol: str
+    price: float
+    volume: float = 0.0
+    change_24h: float = 0.0
+    source: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def topic(self) -> str:
+        return f"market.tick.{topic_segment(self.symbol)}"
+
+@dataclass(frozen=True)
+class SignalEvent:
+    symbol: str
+    action: str
+    strategy: str
+    confidence: float
+    expected_return: float = 0.0
+    source: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def topic(self) -> str:
+        return f"signal.{topic_segment(self.symbol)}"
+
+@dataclass(frozen=True)
+class TradeEvent:
+    agent: str
+    symbol: str
+    action: str
+    size: float
+    price: float = 0.0
+    pnl: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def topic(self) -> str:
+        return f"trade.{topic_segment(self.agent)}"
+
+@dataclass(frozen=True)
+class Alert:
+    source: str
+    level: str
+    message: str
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def topic(self) -> str:
+        return f"alert.{topic_segment(self.level)}.{topic_segment(self.source)}"
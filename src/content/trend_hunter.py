@@ -1,12 +1,12 @@
 ﻿import os
-import asyncio
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 import json
 
 from content.scrapers import AmazonMoversScraper, GoogleTrendsScraper
 from content.generator import ContentGenerator, ArticleDraft
 from mycelium.constitution import RootSystem
+from core.control import ControlPlane
 
 class TrendHunterAgent:
     """
@@ -14,12 +14,13 @@ class TrendHunterAgent:
     Finds trending products, writes articles, tracks performance.
     """
     
-    def __init__(self, serpapi_key: str = None):
+    def __init__(self, serpapi_key: str = None, root: Optional[RootSystem] = None):
         self.serpapi_key = serpapi_key or os.getenv("SERPAPI_KEY") or os.getenv("SERPAPI_API_KEY")
         self.amazon = AmazonMoversScraper()
         self.trends = GoogleTrendsScraper(self.serpapi_key) if self.serpapi_key else None
         self.generator = ContentGenerator()
-        self.root = RootSystem()
+        # Share the trading network's root when co-hosted with it
+        self.root = root or RootSystem()
         
         self.discovered_products: List = []
         self.generated_articles: List[ArticleDraft] = []
@@ -115,24 +116,29 @@ class TrendHunterAgent:
         with open("data/content/hunt_log.jsonl", "a") as f:
             f.write(json.dumps(log_entry) + "\n")
     
-    async def run_autonomous(self, interval_hours: int = 6):
+    async def run_autonomous(self, interval_hours: int = 6, control: Optional[ControlPlane] = None):
         """
         Continuous hunting mode.
         Runs every 6 hours (4x per day).
         """
+        control = control or ControlPlane("trend-hunter", port=-1)
+        control.set_status(self.get_status)
+        
         print("🤖 TREND HUNTER AUTONOMOUS MODE")
         print(f"   Hunting every {interval_hours} hours")
         print(f"   SerpAPI: {'✅ Active' if self.serpapi_key else '⚠️ Amazon-only mode'}")
-        print("   Press Ctrl+C to stop\n")
+        print("   Press Ctrl+C to stop; type status, pause, resume or cycle-now\n")
         
         try:
             while True:
+                await control.wait_until_running()
                 await self.run_hunt_cycle()
+                control.cycle_done()
                 
                 print(f"\n⏰ Next hunt in {interval_hours} hours...")
                 print(f"   Articles ready: {len(self.generated_articles)}")
                 print(f"   Est. daily earnings: ${self.daily_earnings_estimate:.2f}")
-                await asyncio.sleep(interval_hours * 3600)
+                await control.sleep(interval_hours * 3600)
                 
         except KeyboardInterrupt:
             print("\n\n🛑 Trend Hunter entering dormancy")
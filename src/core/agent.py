@@ -1,13 +1,19 @@
 ﻿import os
 import uuid
 import asyncio
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
-from datetime import datetime
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Any, Optional, TYPE_CHECKING
 from enum import Enum
 
-from models.cerebras_client import CerebrasClient, Message
+from models.cerebras_client import Message, CompletionResponse, CerebrasClient
+from models.client_pool import get_client_pool
+from models.scheduler import Priority
+from models.router import TaskClass
 from core.safety import SystemSafety
+from core.memory import ConversationMemory, ConversationMessage
+
+if TYPE_CHECKING:
+    from tools.registry import ToolRegistry
 
 class AgentState(Enum):
     IDLE = "idle"
@@ -15,21 +21,75 @@ class AgentState(Enum):
     ERROR = "error"
     SAFETY_BLOCKED = "safety_blocked"
 
-@dataclass
-class ConversationMessage:
-    role: str
-    content: str
-    timestamp: datetime = field(default_factory=datetime.now)
-
 class AIChatbot:
-    def __init__(self, agent_id: Optional[str] = None, system_prompt: Optional[str] = None):
+    def __init__(self, agent_id: Optional[str] = None, system_prompt: Optional[str] = None,
+                 priority: Priority = Priority.NORMAL, task: TaskClass = TaskClass.CHAT,
+                 tools: Optional["ToolRegistry"] = None):
         self.agent_id = agent_id or os.getenv("AGENT_ID", f"agent_{uuid.uuid4().hex[:8]}")
         self.system_prompt = system_prompt or "You are a helpful AI assistant."
+        self.priority = priority
+        # Routing hint: which kind of model this agent's turns need
+        self.task = task
+        self.tools = tools
+        self.max_tool_rounds = int(os.getenv("AGENT_MAX_TOOL_ROUNDS", "4"))
         self.safety = SystemSafety()
         self.state = AgentState.IDLE
-        self.conversation_history = [ConversationMessage(role="system", content=self.system_prompt)]
+        recall = None
+        if os.getenv("SEMANTIC_MEMORY", "false").lower() == "true":
+            # Imported lazily: numpy is only needed when recall is on
+            from core.semantic_memory import SemanticMemory
+            recall = SemanticMemory.for_agent(self.agent_id)
+        self.memory = ConversationMemory(self.system_prompt, summarizer=self._summarize, recall=recall)
+        # One turn at a time: state and memory are not safe to interleave
+        self._lock = asyncio.Lock()
+    
+    @property
+    def conversation_history(self) -> List[ConversationMessage]:
+        return self.memory.messages
+    
+    async def process(self, user_input: str, priority: Optional[Priority] = None) -> Dict[str, Any]:
+        async with self._lock:
+            return await self._process(user_input, priority)
+    
+    async def process_stream(self, user_input: str, priority: Optional[Priority] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process().
+        Yields {"type": "delta"} events as the model produces text, then one
+        final "done" or "error" event. Text is only released after it passed
+        the safety scan, and the upstream stream is dropped as soon as a
+        blocking policy matches.
+        """
+        async with self._lock:
+            async with aclosing(self._process_stream(user_input, priority)) as events:
+                async for event in events:
+                    yield event
     
-    async def process(self, user_input: str) -> Dict[str, Any]:
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked() or self.memory.compacting
+    
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Serializable state, enough to rebuild the session elsewhere."""
+        return {
+            "agent_id": self.agent_id,
+            "system_prompt": self.system_prompt,
+            "priority": int(self.priority),
+            "task": self.task.value,
+            "memory": self.memory.to_dict()
+        }
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "AIChatbot":
+        agent = cls(
+            agent_id=snapshot["agent_id"],
+            system_prompt=snapshot["system_prompt"],
+            priority=Priority(snapshot.get("priority", Priority.NORMAL)),
+            task=TaskClass(snapshot.get("task", TaskClass.CHAT.value))
+        )
+        agent.memory.load(snapshot.get("memory", {}))
+        return agent
+    
+    async def _process(self, user_input: str, priority: Optional[Priority]) -> Dict[str, Any]:
         self.state = AgentState.PROCESSING
         
         try:
@@ -38,18 +98,18 @@ class AIChatbot:
                 self.state = AgentState.SAFETY_BLOCKED
                 return {"success": False, "error": "Safety violation", "agent_id": self.agent_id}
             
-            self.conversation_history.append(ConversationMessage(role="user", content=user_input))
-            messages = [Message(role=m.role, content=m.content) for m in self.conversation_history[-10:]]
+            self.memory.add("user", user_input)
+            messages = self._build_messages()
             
-            async with CerebrasClient() as client:
-                response = await client.complete(messages)
+            client = get_client_pool().get_client()
+            response = await self._complete(client, messages, priority if priority is not None else self.priority)
             
             safety_result = self.safety.check(response.content, "output")
             if not safety_result["allowed"]:
                 self.state = AgentState.SAFETY_BLOCKED
                 return {"success": False, "error": "Output safety violation", "agent_id": self.agent_id}
             
-            self.conversation_history.append(ConversationMessage(role="assistant", content=response.content))
+            self.memory.add("assistant", response.content)
             self.state = AgentState.IDLE
             
             return {
@@ -62,3 +122,106 @@ class AIChatbot:
         except Exception as e:
             self.state = AgentState.ERROR
             return {"success": False, "error": str(e), "agent_id": self.agent_id}
+    
+    async def _process_stream(self, user_input: str, priority: Optional[Priority]) -> AsyncIterator[Dict[str, Any]]:
+        self.state = AgentState.PROCESSING
+        
+        try:
+            safety_result = self.safety.check(user_input, "input")
+            if not safety_result["allowed"]:
+                self.state = AgentState.SAFETY_BLOCKED
+                yield {"type": "error", "success": False, "error": "Safety violation", "agent_id": self.agent_id}
+                return
+            
+            self.memory.add("user", user_input)
+            messages = self._build_messages()
+            
+            client = get_client_pool().get_client()
+            scanner = self.safety.stream_scanner("output")
+            pending: List[str] = []
+            
+            if self.tools:
+                # Tool rounds are resolved up front; the answer arrives whole
+                response = await self._complete(client, messages, priority if priority is not None else self.priority)
+                stream = self._single_delta(response.content)
+            else:
+                stream = client.stream(messages, priority=priority if priority is not None else self.priority,
+                                       task=self.task, agent_id=self.agent_id)
+            
+            async with aclosing(stream) as deltas:
+                async for delta in deltas:
+                    pending.append(delta)
+                    safety_result = scanner.feed(delta)
+                    if safety_result is None:
+                        continue
+                    
+                    if not safety_result["allowed"]:
+                        self.state = AgentState.SAFETY_BLOCKED
+                        yield {"type": "error", "success": False, "error": "Output safety violation", "agent_id": self.agent_id}
+                        return
+                    
+                    for chunk in pending:
+                        yield {"type": "delta", "content": chunk, "agent_id": self.agent_id}
+                    pending.clear()
+            
+            safety_result = scanner.finish()
+            if not safety_result["allowed"]:
+                self.state = AgentState.SAFETY_BLOCKED
+                yield {"type": "error", "success": False, "error": "Output safety violation", "agent_id": self.agent_id}
+                return
+            
+            for chunk in pending:
+                yield {"type": "delta", "content": chunk, "agent_id": self.agent_id}
+            
+            self.memory.add("assistant", scanner.text)
+            self.state = AgentState.IDLE
+            
+            yield {
+                "type": "done",
+                "success": True,
+                "response": scanner.text,
+                "agent_id": self.agent_id,
+                "safety_score": safety_result["risk_score"]
+            }
+            
+        except Exception as e:
+            self.state = AgentState.ERROR
+            yield {"type": "error", "success": False, "error": str(e), "agent_id": self.agent_id}
+    
+    async def _complete(self, client: CerebrasClient, messages: List[Message], priority: Priority) -> CompletionResponse:
+        """
+        One completion, letting the model call tools first if it has any.
+        Each round's calls run concurrently and their results are sent back;
+        after `max_tool_rounds` the model has to answer without tools.
+        Tool traffic stays out of the conversation memory.
+        """
+        rounds = 0
+        while True:
+            offer_tools = self.tools is not None and len(self.tools) > 0 and rounds < self.max_tool_rounds
+            response = await client.complete(messages, priority=priority, task=self.task, agent_id=self.agent_id,
+                                             tools=self.tools.schemas() if offer_tools else None)
+            if not (offer_tools and response.tool_calls):
+                return response
+            
+            rounds += 1
+            messages = messages + [Message(role="assistant", content=response.content, tool_calls=response.tool_calls)]
+            messages += await self.tools.execute_all(response.tool_calls)
+    
+    @staticmethod
+    async def _single_delta(text: str) -> AsyncIterator[str]:
+        yield text
+    
+    def _build_messages(self) -> List[Message]:
+        return self.memory.build_prompt()
+    
+    async def _summarize(self, summary: str, turns: List[ConversationMessage]) -> str:
+        """Fold older turns into the running summary (background priority)."""
+        transcript = "\n".join(f"{m.role}: {m.content}" for m in turns)
+        messages = [
+            Message(role="system", content="Condense conversations into a short factual summary. Keep names, numbers and decisions. Reply with the summary only."),
+            Message(role="user", content=f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}")
+        ]
+        client = get_client_pool().get_client()
+        response = await client.complete(messages, priority=Priority.BACKGROUND, use_cache=False,
+                                         task=TaskClass.SUMMARIZE, agent_id=self.agent_id)
+        return response.content.strip()
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import asyncio
+from typing import Dict, Any, Optional
+from aiohttp import web, WSMsgType
+import aiohttp_cors
+
+from core.agent import AIChatbot
+from core.session_store import SessionStore
+from core.safety import watch_policy_file
+from core.safety_metrics import get_safety_metrics
+from models.client_pool import get_client_pool, close_client_pool
+
+class ChatService:
+    """
+    HTTP + WebSocket front end that hosts many AIChatbot sessions on one
+    event loop. Each session serializes its own turns; the service bounds
+    the number of turns in flight and sheds load with 503 beyond that.
+    """
+
+    def __init__(self, system_prompt: Optional[str] = None, max_inflight: Optional[int] = None,
+                 request_timeout: Optional[float] = None, store: Optional[SessionStore] = None):
+        self.system_prompt = system_prompt
+        self.max_inflight = max_inflight if max_inflight is not None else int(os.getenv("CHAT_MAX_INFLIGHT", "256"))
+        self.request_timeout = request_timeout if request_timeout is not None else float(os.getenv("CHAT_REQUEST_TIMEOUT", "90"))
+
+        self.store = store or SessionStore(self._new_session)
+        self.inflight = 0
+        self.served = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.started_at = time.time()
+        self._policy_watcher: Optional[asyncio.Task] = None
+
+    def _new_session(self, session_id: str) -> AIChatbot:
+        return AIChatbot(agent_id=session_id, system_prompt=self.system_prompt)
+
+    def _admit(self) -> bool:
+        if self.inflight >= self.max_inflight:
+            self.rejected += 1
+            return False
+        self.inflight += 1
+        return True
+
+    def _done(self):
+        self.inflight -= 1
+        self.served += 1
+
+    def _overloaded(self) -> web.Response:
+        return web.json_response(
+            {"success": False, "error": "Server busy, retry shortly"},
+            status=503, headers={"Retry-After": "1"}
+        )
+
+    async def handle_message(self, request: web.Request) -> web.Response:
+        session_id = request.match_info["session_id"]
+        try:
+            body = await request.json()
+            message = str(body["message"])
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"success": False, "error": "Expected JSON body with 'message'"}, status=400)
+
+        if not self._admit():
+            return self._overloaded()
+
+        try:
+            async with self.store.session(session_id) as agent:
+                result = await asyncio.wait_for(agent.process(message), self.request_timeout)
+            return web.json_response(result)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return web.json_response({"success": False, "error": "Request timed out", "agent_id": session_id}, status=504)
+        finally:
+            self._done()
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """
+        One socket per session. Each text frame is a user turn; the reply
+        streams back as JSON events (delta ... done|error).
+        """
+        session_id = request.match_info["session_id"]
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+
+            try:
+                message = str(json.loads(msg.data)["message"])
+            except (ValueError, KeyError, TypeError):
+                message = msg.data
+
+            if not self._admit():
+                await ws.send_json({"type": "error", "success": False, "error": "Server busy, retry shortly"})
+                continue
+
+            try:
+                async with self.store.session(session_id) as agent:
+                    await asyncio.wait_for(self._stream_turn(ws, agent, message), self.request_timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                await ws.send_json({"type": "error", "success": False, "error": "Request timed out", "agent_id": session_id})
+            finally:
+                self._done()
+
+        return ws
+
+    async def _stream_turn(self, ws: web.WebSocketResponse, agent: AIChatbot, message: str):
+        async for event in agent.process_stream(message):
+            # send_json awaits the transport drain, so a slow reader slows
+            # its own stream instead of buffering unbounded output
+            await ws.send_json(event)
+
+    async def handle_delete(self, request: web.Request) -> web.Response:
+        removed = await self.store.drop(request.match_info["session_id"])
+        return web.json_response({"success": removed})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_status())
+
+    async def handle_safety(self, request: web.Request) -> web.Response:
+        return web.json_response(get_safety_metrics().get_stats())
+
+    async def handle_false_positive(self, request: web.Request) -> web.Response:
+        try:
+            audit_id = int(request.match_info["audit_id"])
+        except ValueError:
+            return web.json_response({"success": False, "error": "Bad audit id"}, status=400)
+        marked = get_safety_metrics().mark_false_positive(audit_id)
+        return web.json_response({"success": marked}, status=200 if marked else 404)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "sessions": self.store.get_stats(),
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "served": self.served,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "uptime_seconds": time.time() - self.started_at,
+            "client_pool": get_client_pool().get_stats()
+        }
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/sessions/{session_id}/ws", self.handle_websocket)
+
+        cors = aiohttp_cors.setup(app, defaults={
+            "*": aiohttp_cors.ResourceOptions(allow_headers="*", expose_headers="*")
+        })
+        cors.add(app.router.add_post("/sessions/{session_id}/messages", self.handle_message))
+        cors.add(app.router.add_delete("/sessions/{session_id}", self.handle_delete))
+        cors.add(app.router.add_get("/health", self.handle_health))
+        cors.add(app.router.add_get("/safety", self.handle_safety))
+        cors.add(app.router.add_post("/safety/audit/{audit_id}/false-positive", self.handle_false_positive))
+
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: web.Application):
+        # Policy edits take effect without a restart
+        if os.getenv("SAFETY_POLICY_FILE"):
+            self._policy_watcher = asyncio.get_running_loop().create_task(watch_policy_file())
+
+    async def _on_cleanup(self, app: web.Application):
+        if self._policy_watcher is not None:
+            self._policy_watcher.cancel()
+        await get_safety_metrics().flush()
+        await self.store.flush()
+        self.store.close()
+        await close_client_pool()
+
+
+def run_chat_service(host: Optional[str] = None, port: Optional[int] = None):
+    """Serve the chat API until interrupted."""
+    host = host or os.getenv("AGENT_HOST", "127.0.0.1")
+    port = port or int(os.getenv("AGENT_PORT", "8080"))
+    service = ChatService()
+    web.run_app(service.build_app(), host=host, port=port)
+
+
+if __name__ == "__main__":
+    run_chat_service()
@@ -0,0 +1,218 @@
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import asyncio
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Union
+
+Handler = Callable[[], Union[Any, Awaitable[Any]]]
+
+# First line of an HTTP request: a browser page must never be able to drive an agent
+_HTTP_REQUEST = re.compile(rb"^(GET|HEAD|POST|PUT|PATCH|DELETE|OPTIONS|CONNECT|TRACE) \S+|HTTP/\d", re.IGNORECASE)
+
+class ControlPlane:
+    """
+    Operator commands for an agent that is running an autonomous loop.
+    Commands arrive from a console reader thread (so the event loop never
+    blocks on input) and from a local TCP endpoint that takes one command
+    per line and answers with one JSON line. Both are dispatched on the
+    agent's own event loop, so handlers see and change live state.
+
+    The console is trusted. Over TCP only read-only commands (status,
+    help) are open; everything else needs `auth <CONTROL_TOKEN>` first on
+    that connection, and is refused outright while no token is set.
+    Connections that speak HTTP are dropped before any command runs.
+
+    Built in: status, pause, resume, cycle-now, help. Agents register the
+    rest (e.g. reset-risk) and provide a status callback.
+    """
+
+    def __init__(self, name: str = "agent", host: Optional[str] = None, port: Optional[int] = None,
+                 console: bool = False, token: Optional[str] = None):
+        self.name = name
+        self.host = host or os.getenv("CONTROL_HOST", "127.0.0.1")
+        # Negative disables the endpoint; 0 picks a free port
+        self.port = port if port is not None else int(os.getenv("CONTROL_PORT", "8765"))
+        self.console = console
+        self.token = token if token is not None else os.getenv("CONTROL_TOKEN", "")
+
+        self.commands: Dict[str, Handler] = {}
+        self.help: Dict[str, str] = {}
+        self.read_only: Set[str] = set()
+        self._status: Optional[Handler] = None
+
+        self._running = asyncio.Event()
+        self._running.set()
+        self._wake = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._console_thread: Optional[threading.Thread] = None
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+        self.started_at = time.time()
+        self.cycles = 0
+        self.last_cycle: Optional[float] = None
+
+        self.register("status", self.status, "Agent and loop status", read_only=True)
+        self.register("pause", self.pause, "Finish the current cycle, then hold")
+        self.register("resume", self.resume, "Continue after pause")
+        self.register("cycle-now", self.cycle_now, "Start the next cycle without waiting out the interval")
+        self.register("help", lambda: dict(self.help), "List commands", read_only=True)
+
+    def register(self, command: str, handler: Handler, description: str = "", read_only: bool = False):
+        """Commands change state unless `read_only`; those need auth over TCP."""
+        self.commands[command] = handler
+        self.help[command] = description
+        if read_only:
+            self.read_only.add(command)
+        else:
+            self.read_only.discard(command)
+
+    def set_status(self, provider: Handler):
+        self._status = provider
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    # Loop side: the autonomous loop calls these instead of asyncio.sleep
+
+    async def wait_until_running(self):
+        await self._running.wait()
+
+    def cycle_done(self):
+        self.cycles += 1
+        self.last_cycle = time.time()
+
+    async def sleep(self, seconds: float):
+        """Wait out the interval; `cycle-now` cuts it short, `pause` extends it."""
+        # A cycle-now sent mid-cycle is kept and skips this wait entirely
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+        await self._running.wait()
+
+    # Commands
+
+    async def status(self) -> Dict[str, Any]:
+        status = {
+            "agent": self.name,
+            "paused": self.paused,
+            "cycles": self.cycles,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "last_cycle_age_s": round(time.time() - self.last_cycle, 1) if self.last_cycle else None
+        }
+        if self._status is not None:
+            detail = self._status()
+            if inspect.isawaitable(detail):
+                detail = await detail
+            status["detail"] = detail
+        return status
+
+    def pause(self) -> Dict[str, Any]:
+        self._running.clear()
+        return {"paused": True}
+
+    def resume(self) -> Dict[str, Any]:
+        self._running.set()
+        return {"paused": False}
+
+    def cycle_now(self) -> Dict[str, Any]:
+        self._running.set()
+        self._wake.set()
+        return {"cycle": "requested"}
+
+    async def dispatch(self, line: str, trusted: bool = True) -> Dict[str, Any]:
+        """Run one command line. Untrusted callers only get read-only commands."""
+        command = line.strip().lower()
+        if not command:
+            return {"ok": False, "error": "empty command"}
+        handler = self.commands.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"unknown command '{command}'", "commands": sorted(self.commands)}
+        if not trusted and command not in self.read_only:
+            reason = "send 'auth <token>' first" if self.token else "set CONTROL_TOKEN to allow it over TCP"
+            return {"ok": False, "command": command, "error": f"not authorized: {reason}"}
+        try:
+            result = handler()
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            return {"ok": False, "command": command, "error": str(e)}
+        return {"ok": True, "command": command, "result": result}
+
+    # Transports
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        if self.port >= 0:
+            try:
+                self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            except OSError as e:
+                print(f"⚠️ Control endpoint unavailable on {self.host}:{self.port}: {e}")
+            else:
+                self.port = self._server.sockets[0].getsockname()[1]
+                access = "auth <CONTROL_TOKEN> to change state" if self.token else "read-only, set CONTROL_TOKEN for more"
+                print(f"🎛️  Control: nc {self.host} {self.port}  (status, help; {access})")
+        if self.console:
+            self._console_thread = threading.Thread(target=self._read_console, name="control-console", daemon=True)
+            self._console_thread.start()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Open connections would otherwise outlive the server (and block wait_closed)
+            for writer in list(self._clients.values()):
+                writer.close()
+            if self._clients:
+                await asyncio.wait(list(self._clients), timeout=5)
+            await self._server.wait_closed()
+            self._server = None
+        # The console thread is a daemon blocked in readline; it ends with the process
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        authorized = False
+        first = True
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if first and _HTTP_REQUEST.match(line.strip()):
+                    break
+                first = False
+                text = line.decode("utf-8", "replace").strip()
+                verb, _, secret = text.partition(" ")
+                if verb.lower() == "auth":
+                    authorized = bool(self.token) and hmac.compare_digest(secret.encode(), self.token.encode())
+                    reply = {"ok": authorized, "command": "auth"}
+                    if not authorized:
+                        reply["error"] = "invalid token" if self.token else "no CONTROL_TOKEN configured"
+                else:
+                    reply = await self.dispatch(text, trusted=authorized)
+                writer.write(json.dumps(reply, default=str).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(task, None)
+            writer.close()
+
+    def _read_console(self):
+        loop = self._loop
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                reply = asyncio.run_coroutine_threadsafe(self.dispatch(line), loop).result()
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            print(json.dumps(reply.get("result", reply), indent=2, default=str))
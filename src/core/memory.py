@@ -0,0 +1,183 @@
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TYPE_CHECKING
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from models.cerebras_client import Message
+from models.scheduler import estimate_tokens
+
+if TYPE_CHECKING:
+    from core.semantic_memory import SemanticMemory
+
+# Per-message framing overhead (role markers etc.) in the chat template
+MESSAGE_OVERHEAD_TOKENS = 4
+
+@dataclass
+class ConversationMessage:
+    role: str
+    content: str
+    timestamp: datetime = field(default_factory=datetime.now)
+    tokens: int = 0
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.content) + MESSAGE_OVERHEAD_TOKENS
+
+Summarizer = Callable[[str, List[ConversationMessage]], Awaitable[str]]
+
+class ConversationMemory:
+    """
+    Token-budgeted conversation history.
+    The system prompt is always pinned. Recent turns are packed newest-first
+    into the context budget, and older turns are folded into a running
+    summary by a background task so the request path never waits on it.
+    With a `recall` store, earlier turns relevant to the newest one are
+    retrieved and injected within a separate token allowance.
+    """
+
+    def __init__(self, system_prompt: str, context_budget: Optional[int] = None,
+                 reserve_tokens: Optional[int] = None, max_turns: Optional[int] = None,
+                 summarizer: Optional[Summarizer] = None, recall: Optional["SemanticMemory"] = None,
+                 recall_tokens: Optional[int] = None):
+        self.context_budget = context_budget if context_budget is not None else int(os.getenv("CONTEXT_TOKEN_BUDGET", "8192"))
+        # Room left for the model's reply
+        self.reserve_tokens = reserve_tokens if reserve_tokens is not None else int(os.getenv("MAX_TOKENS", "4096"))
+        # Hard cap on resident turns, applied even if summarization keeps failing
+        self.max_turns = max_turns if max_turns is not None else int(os.getenv("CONTEXT_MAX_TURNS", "200"))
+        self.summarizer = summarizer
+        self.recall = recall
+        self.recall_tokens = recall_tokens if recall_tokens is not None else int(os.getenv("SEMANTIC_MEMORY_TOKENS", "512"))
+
+        self.system = ConversationMessage(role="system", content=system_prompt)
+        self.turns: List[ConversationMessage] = []
+        self.summary = ""
+        self.compactions = 0
+        self._compaction: Optional[asyncio.Task] = None
+
+    @property
+    def messages(self) -> List[ConversationMessage]:
+        """Resident history, system prompt first. Read-only view."""
+        return [self.system] + self.turns
+
+    @property
+    def prompt_budget(self) -> int:
+        """Tokens available for turns after the pinned parts and the reply."""
+        summary_tokens = estimate_tokens(self.summary) + MESSAGE_OVERHEAD_TOKENS if self.summary else 0
+        recall_tokens = self.recall_tokens if self.recall is not None else 0
+        return max(0, self.context_budget - self.reserve_tokens - self.system.tokens - summary_tokens - recall_tokens)
+
+    def add(self, role: str, content: str) -> ConversationMessage:
+        message = ConversationMessage(role=role, content=content)
+        self.turns.append(message)
+        if self.recall is not None:
+            self.recall.add(role, content)
+
+        if len(self.turns) > self.max_turns:
+            del self.turns[:len(self.turns) - self.max_turns]
+
+        self._maybe_compact()
+        return message
+
+    def build_prompt(self) -> List[Message]:
+        """
+        System prompt, running summary, recalled snippets, then as many
+        recent turns as fit. The newest turn is always included, even if it
+        alone overflows.
+        """
+        budget = self.prompt_budget
+        selected: List[ConversationMessage] = []
+        used = 0
+
+        for message in reversed(self.turns):
+            if selected and used + message.tokens > budget:
+                break
+            selected.append(message)
+            used += message.tokens
+
+        prompt = [Message(role="system", content=self.system.content)]
+        if self.summary:
+            prompt.append(Message(role="system", content=f"Summary of the earlier conversation:\n{self.summary}"))
+        if self.recall is not None and selected:
+            recalled = self._recall(selected[0].content, exclude_last=len(selected))
+            if recalled:
+                prompt.append(Message(role="system", content=f"Relevant earlier conversation:\n{recalled}"))
+        prompt.extend(Message(role=m.role, content=m.content) for m in reversed(selected))
+        return prompt
+
+    def _recall(self, query: str, exclude_last: int) -> str:
+        # Turns already in the prompt are the newest rows of the store
+        lines: List[str] = []
+        used = 0
+        for _, role, content in self.recall.search(query, exclude_last=exclude_last):
+            cost = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if used + cost > self.recall_tokens:
+                continue
+            lines.append(f"{role}: {content}")
+            used += cost
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary,
+            "turns": [
+                {"role": m.role, "content": m.content, "timestamp": m.timestamp.isoformat()}
+                for m in self.turns
+            ]
+        }
+
+    def load(self, data: Dict[str, Any]):
+        self.summary = data.get("summary", "")
+        self.turns = [
+            ConversationMessage(role=t["role"], content=t["content"], timestamp=datetime.fromisoformat(t["timestamp"]))
+            for t in data.get("turns", [])
+        ]
+
+    def token_count(self) -> int:
+        return self.system.tokens + sum(m.tokens for m in self.turns)
+
+    def _maybe_compact(self):
+        if self.summarizer is None or (self._compaction and not self._compaction.done()):
+            return
+
+        budget = self.prompt_budget
+        total = sum(m.tokens for m in self.turns)
+        if total <= budget * 0.75:
+            return
+
+        # Fold the oldest turns until what remains fits in half the budget
+        batch: List[ConversationMessage] = []
+        for message in self.turns[:-1]:
+            if total <= budget * 0.5:
+                break
+            batch.append(message)
+            total -= message.tokens
+
+        if not batch:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._compaction = loop.create_task(self._compact(batch))
+
+    async def _compact(self, batch: List[ConversationMessage]):
+        try:
+            summary = await self.summarizer(self.summary, batch)
+        except Exception as e:
+            print(f"Conversation summary failed: {e}")
+            return
+
+        self.summary = summary
+        folded = {id(m) for m in batch}
+        self.turns = [m for m in self.turns if id(m) not in folded]
+        self.compactions += 1
+
+    @property
+    def compacting(self) -> bool:
+        return self._compaction is not None and not self._compaction.done()
+
+    async def wait_for_compaction(self):
+        if self._compaction and not self._compaction.done():
+            await self._compaction
@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+
+class MappedColumn:
+    """Append-only memory-mapped array whose file doubles when full."""
+
+    def __init__(self, path: str, dtype, width: int = 1, initial_rows: int = 1024):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self.row_bytes = self.dtype.itemsize * width
+        existing = os.path.getsize(path) // self.row_bytes if os.path.exists(path) else 0
+        self._map(max(initial_rows, existing))
+
+    def _map(self, capacity: int):
+        with open(self.path, "a+b") as f:
+            if os.path.getsize(self.path) < capacity * self.row_bytes:
+                f.truncate(capacity * self.row_bytes)
+        shape = (capacity, self.width) if self.width > 1 else (capacity,)
+        self.data = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=shape)
+        self.capacity = capacity
+
+    def ensure(self, rows: int):
+        if rows > self.capacity:
+            self.data.flush()
+            self._map(max(rows, self.capacity * 2))
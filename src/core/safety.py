@@ -1,8 +1,14 @@
-﻿import re
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+﻿import os
+import re
+import json
+import time
+import asyncio
+from typing import Dict, List, Any, Optional, Pattern, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from core.safety_metrics import SafetyMetrics, get_safety_metrics
+
 class RiskLevel(Enum):
     NONE = 0
     LOW = 1
@@ -16,46 +22,226 @@ class SafetyPolicy:
     pattern: Optional[str]
     risk_level: RiskLevel
     action: str
+    # Lowercase literals of which every match contains at least one; on ASCII
+    # text a policy whose anchors are all absent is skipped without running its regex
+    anchors: Tuple[str, ...] = ()
+    regex: Optional[Pattern] = field(default=None, repr=False, compare=False)
+
+# Leading global flags, e.g. "(?i)", which Python only accepts at the very start
+_LEADING_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+# Backreferences, named groups and conditionals depend on group numbering or names
+_NOT_COMBINABLE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(")
+
+def _scoped(pattern: str) -> Optional[str]:
+    """`pattern` rewritten to sit inside an alternation, or None if it cannot."""
+    if _NOT_COMBINABLE.search(pattern):
+        return None
+    flags = _LEADING_FLAGS.match(pattern)
+    scoped = f"(?{flags.group(1)}:{pattern[flags.end():]})" if flags else f"(?:{pattern})"
+    try:
+        re.compile(scoped)
+    except re.error:
+        return None
+    return scoped
+
+class PolicySet:
+    """
+    Immutable, precompiled set of policies, ordered most severe first and
+    blocking before flagging within a level (the first wins where several
+    match at the same position). Policies are matched together by one alternation (a named group per
+    policy) built for each combination the anchor prefilter lets through;
+    patterns that cannot share an alternation run on their own.
+    Swapping sets is a single reference assignment.
+    """
+
+    MAX_MATCHERS = 256
+
+    def __init__(self, policies: List[SafetyPolicy], source: str = "defaults"):
+        compiled = []
+        for policy in policies:
+            if not policy.pattern:
+                continue
+            compiled.append(SafetyPolicy(
+                name=policy.name, pattern=policy.pattern, risk_level=policy.risk_level, action=policy.action,
+                anchors=tuple(a.lower() for a in policy.anchors), regex=re.compile(policy.pattern)
+            ))
+        compiled.sort(key=lambda p: (-p.risk_level.value, p.action != "block"))
+        self.policies: Tuple[SafetyPolicy, ...] = tuple(compiled)
+        # (name, regex) pairs the audit uses to mask every match in an excerpt
+        self.patterns: Tuple[Tuple[str, Pattern], ...] = tuple((p.name, p.regex) for p in compiled)
+        self.scoped: Tuple[Optional[str], ...] = tuple(_scoped(p.pattern) for p in compiled)
+        self._matchers: Dict[Tuple[int, ...], Pattern] = {}
+        self.source = source
+
+    def matcher(self, indices: Tuple[int, ...]) -> Pattern:
+        """Combined regex for the policies at `indices`; group `p<i>` is policy i."""
+        regex = self._matchers.get(indices)
+        if regex is None:
+            if len(self._matchers) >= self.MAX_MATCHERS:
+                self._matchers.clear()
+            regex = self._matchers[indices] = re.compile("|".join(f"(?P<p{i}>{self.scoped[i]})" for i in indices))
+        return regex
+
+    @classmethod
+    def from_specs(cls, specs: List[Dict[str, Any]], source: str = "config") -> "PolicySet":
+        """Specs: {"name", "pattern", "risk", optional "action" and "anchors"}."""
+        policies = []
+        for spec in specs:
+            risk = RiskLevel[spec["risk"].upper()]
+            policies.append(SafetyPolicy(
+                name=spec["name"], pattern=spec["pattern"], risk_level=risk,
+                action=spec.get("action", "block" if risk == RiskLevel.CRITICAL else "flag"),
+                anchors=tuple(spec.get("anchors", ()))
+            ))
+        return cls(policies, source)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PolicySet":
+        """
+        JSON file: {"include_defaults": true, "policies": [spec, ...]}.
+        Compiles everything up front, so a bad pattern fails here and not
+        on the request path.
+        """
+        with open(path) as f:
+            config = json.load(f)
+        specs = list(config.get("policies", []))
+        if config.get("include_defaults", True):
+            specs = SystemSafety.DEFAULT_POLICIES + specs
+        return cls.from_specs(specs, source=path)
+
+_active_policies: Optional[PolicySet] = None
+
+def get_policy_set() -> PolicySet:
+    """Process-wide policies: SAFETY_POLICY_FILE if set, else the defaults."""
+    global _active_policies
+    if _active_policies is None:
+        path = os.getenv("SAFETY_POLICY_FILE")
+        if path:
+            _active_policies = PolicySet.from_file(path)
+        else:
+            _active_policies = PolicySet.from_specs(SystemSafety.DEFAULT_POLICIES, source="defaults")
+    return _active_policies
+
+def set_policy_set(policies: PolicySet):
+    """Hot-swap the policies used by every SystemSafety that isn't pinned to its own set."""
+    global _active_policies
+    _active_policies = policies
+
+async def watch_policy_file(path: Optional[str] = None, interval: float = 5.0):
+    """
+    Recompile and swap in the policy file whenever it changes. Compilation
+    happens in a worker thread; a broken file keeps the previous policies.
+    """
+    path = path or os.getenv("SAFETY_POLICY_FILE")
+    if not path:
+        return
+    last_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if mtime == last_mtime:
+            continue
+        last_mtime = mtime
+        try:
+            set_policy_set(await asyncio.to_thread(PolicySet.from_file, path))
+            print(f"Safety policies reloaded from {path}")
+        except (OSError, ValueError, KeyError, re.error) as e:
+            print(f"Safety policy reload failed, keeping previous set: {e}")
 
 class SystemSafety:
-    HARD_CODED_PATTERNS = [
-        (r"(?i)(password|secret|key|token)\s*[=:]\s*\S+", "credential_exposure", RiskLevel.CRITICAL),
-        (r"(?i)(rm\s+-rf|del\s+/f|format\s+[a-z]:)", "destructive_command", RiskLevel.CRITICAL),
-        (r"(?i)DROP\s+TABLE|DELETE\s+FROM.*WHERE\s+1\s*=\s*1", "database_destruction", RiskLevel.CRITICAL),
-        (r"(?i)(import\s+os|subprocess|socket)\s*.*\b(system|exec|eval|compile)\b", "code_injection", RiskLevel.HIGH),
+    DEFAULT_POLICIES = [
+        {"name": "credential_exposure", "pattern": r"(?i)(password|secret|key|token)\s*[=:]\s*\S+",
+         "risk": "CRITICAL", "anchors": ["password", "secret", "key", "token"]},
+        {"name": "destructive_command", "pattern": r"(?i)(rm\s+-rf|del\s+/f|format\s+[a-z]:)",
+         "risk": "CRITICAL", "anchors": ["-rf", "del", "format"]},
+        {"name": "database_destruction", "pattern": r"(?i)DROP\s+TABLE|DELETE\s+FROM.*WHERE\s+1\s*=\s*1",
+         "risk": "CRITICAL", "anchors": ["drop", "delete"]},
+        {"name": "code_injection", "pattern": r"(?i)(import\s+os|subprocess|socket)\s*.*\b(system|exec|eval|compile)\b",
+         "risk": "HIGH", "anchors": ["import", "subprocess", "socket"]},
     ]
     
-    def __init__(self):
-        self.policies = []
+    def __init__(self, policies: Optional[PolicySet] = None, metrics: Optional[SafetyMetrics] = None):
+        # Without an explicit set, follow the process-wide one (hot-swappable)
+        self._pinned = policies
+        self.metrics = metrics or get_safety_metrics()
         self.blocked_count = 0
-        
-        for pattern, name, risk in self.HARD_CODED_PATTERNS:
-            self.policies.append(SafetyPolicy(
-                name=name, pattern=pattern, risk_level=risk,
-                action="block" if risk == RiskLevel.CRITICAL else "flag"
-            ))
+    
+    @property
+    def policy_set(self) -> PolicySet:
+        return self._pinned if self._pinned is not None else get_policy_set()
+    
+    @property
+    def policies(self) -> Tuple[SafetyPolicy, ...]:
+        return self.policy_set.policies
     
     def check(self, content: str, context: str = "unknown") -> Dict[str, Any]:
+        """
+        One search over a combined matcher of the policies that pass the
+        anchor prefilter. On ASCII text a policy only takes part if one of
+        its anchors occurs in it; other text can case-fold onto an anchor
+        (e.g. U+017F 'ſ' matches 's' under `(?i)`), so there all do. Each
+        search finds the leftmost match of any remaining policy, which then
+        drops out, so clean text costs a single pass. Scanning stops as soon
+        as the verdict is certainly "block" and no remaining policy could
+        raise the risk (so `violations` may then be partial, but `max_risk`
+        is not).
+        """
+        started = time.perf_counter()
+        metrics = self.metrics
         violations = []
+        spans = []
         max_risk = RiskLevel.NONE
         action = "allow"
+        lowered = content.lower() if content.isascii() else None
         
-        for policy in self.policies:
-            if not policy.pattern:
+        policy_set = self.policy_set
+        policies = policy_set.policies
+        combined: List[int] = []
+        alone: List[int] = []
+        for i, policy in enumerate(policies):
+            if policy.anchors and lowered is not None and not any(anchor in lowered for anchor in policy.anchors):
+                metrics.skipped[policy.name] = metrics.skipped.get(policy.name, 0) + 1
                 continue
-            if re.findall(policy.pattern, content):
-                violations.append({"policy": policy.name, "risk": policy.risk_level.name, "action": policy.action})
-                if policy.risk_level.value > max_risk.value:
-                    max_risk = policy.risk_level
-                if policy.action == "block":
-                    action = "block"
+            metrics.evaluated[policy.name] = metrics.evaluated.get(policy.name, 0) + 1
+            (combined if policy_set.scoped[i] is not None else alone).append(i)
         
-        if len(violations) >= 3:
-            action = "block"
+        while combined or alone:
+            if combined:
+                match = policy_set.matcher(tuple(combined)).search(content)
+                if match is None:
+                    combined.clear()
+                    continue
+                i = int(match.lastgroup[1:])
+                combined.remove(i)
+                start, end = match.span(match.lastgroup)
+            else:
+                i = alone.pop(0)
+                match = policies[i].regex.search(content)
+                if match is None:
+                    continue
+                start, end = match.span()
+            
+            policy = policies[i]
+            metrics.matched[policy.name] = metrics.matched.get(policy.name, 0) + 1
+            spans.append({"policy": policy.name, "start": start, "end": end})
+            violations.append({"policy": policy.name, "risk": policy.risk_level.name, "action": policy.action})
+            if policy.risk_level.value > max_risk.value:
+                max_risk = policy.risk_level
+            if policy.action == "block" or len(violations) >= 3:
+                action = "block"
+            if action == "block" and all(policies[j].risk_level.value <= max_risk.value for j in combined + alone):
+                break
         
         if action == "block":
             self.blocked_count += 1
         
+        metrics.record_check(context, (time.perf_counter() - started) * 1e6, action == "block")
+        if spans:
+            metrics.audit(context, action, content, spans, policy_set.patterns)
+        
         return {
             "allowed": action != "block",
             "action": action,
@@ -63,3 +249,43 @@ class SystemSafety:
             "violations": violations,
             "risk_score": 1.0 - (max_risk.value / 4.0)
         }
+    
+    def stream_scanner(self, context: str = "output") -> "StreamingSafetyScanner":
+        return StreamingSafetyScanner(self, context)
+
+class StreamingSafetyScanner:
+    """
+    Runs SystemSafety over a growing stream of text.
+    Each scan covers the text added since the previous scan, back to the
+    start of the line it continues plus an overlap window before that.
+    `.*` never crosses a newline, so a match of any length on the current
+    line is still seen, without rescanning the whole output on every delta.
+    """
+    
+    def __init__(self, safety: SystemSafety, context: str = "output",
+                 min_chunk: int = 64, overlap: int = 256):
+        self.safety = safety
+        self.context = context
+        self.min_chunk = min_chunk
+        self.overlap = overlap
+        self.text = ""
+        self.scanned_upto = 0
+    
+    def feed(self, delta: str) -> Optional[Dict[str, Any]]:
+        """
+        Add a delta. Returns a check result when a scan ran, else None.
+        Scans run once min_chunk new characters arrive or a line ends.
+        """
+        self.text += delta
+        if len(self.text) - self.scanned_upto < self.min_chunk and "\n" not in delta:
+            return None
+        
+        line_start = self.text.rfind("\n", 0, self.scanned_upto) + 1
+        window = self.text[max(0, line_start - self.overlap):]
+        self.scanned_upto = len(self.text)
+        return self.safety.check(window, self.context)
+    
+    def finish(self) -> Dict[str, Any]:
+        """Authoritative check over the complete output."""
+        self.scanned_upto = len(self.text)
+        return self.safety.check(self.text, self.context)
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import random
+import asyncio
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Pattern, Sequence, Tuple
+
+# Upper bounds (microseconds) of the scan-time histogram buckets
+LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 100000)
+
+class LatencyHistogram:
+    """Fixed-bucket histogram: constant memory, O(log buckets) per sample."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_US):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def observe(self, micros: float):
+        self.counts[bisect_left(self.bounds, micros)] += 1
+        self.count += 1
+        self.total_us += micros
+        self.max_us = max(self.max_us, micros)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th sample."""
+        if not self.count:
+            return None
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max_us
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{b}us" for b in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_us": round(self.total_us / self.count, 2) if self.count else None,
+            "max_us": round(self.max_us, 2),
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class SafetyMetrics:
+    """
+    Process-wide counters for SystemSafety.
+    Per policy: how often its regex ran, how often the anchor prefilter
+    skipped it, how often it matched and how many matches were later marked
+    false positives. Scan time is histogrammed per context. A sample of
+    violations goes to an in-memory ring and, from a worker thread, to a
+    JSONL audit file; the matched text itself is masked.
+    """
+
+    def __init__(self, sample_rate: Optional[float] = None, audit_path: Optional[str] = None,
+                 flush_delay: float = 1.0, max_pending: int = 10000):
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("SAFETY_AUDIT_SAMPLE", "0.2"))
+        self.audit_path = audit_path if audit_path is not None else os.getenv("SAFETY_AUDIT_PATH", "data/safety/audit.jsonl")
+        self.flush_delay = flush_delay
+
+        self.evaluated: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+        self.matched: Dict[str, int] = {}
+        self.false_positives: Dict[str, int] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.checks = 0
+        self.blocks = 0
+
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self._pending: Deque[Dict[str, Any]] = deque(maxlen=max_pending)
+        self._flush_scheduled = False
+        self._next_id = 1
+        self.audit_dropped = 0
+        self.random = random.Random()
+
+    def record_check(self, context: str, micros: float, blocked: bool):
+        self.checks += 1
+        if blocked:
+            self.blocks += 1
+        histogram = self.latency.get(context)
+        if histogram is None:
+            histogram = self.latency[context] = LatencyHistogram()
+        histogram.observe(micros)
+
+    def audit(self, context: str, action: str, content: str, hits: List[Dict[str, Any]],
+              patterns: Sequence[Tuple[str, Pattern]] = ()):
+        """
+        Maybe record a violation. `hits` carry the policy name and the
+        match span (start, end); `patterns` are (policy name, regex) pairs
+        used to mask every other match inside the excerpt. Only in-memory
+        work happens here.
+        """
+        if self.sample_rate <= 0 or self.random.random() >= self.sample_rate:
+            return
+
+        entry = {
+            "id": self._next_id,
+            "timestamp": time.time(),
+            "context": context,
+            "action": action,
+            "policies": [hit["policy"] for hit in hits],
+            "excerpt": self._excerpt(content, hits, patterns)
+        }
+        self._next_id += 1
+        self.recent.append(entry)
+
+        if len(self._pending) == self._pending.maxlen:
+            self.audit_dropped += 1
+        self._pending.append(entry)
+        self._schedule_flush()
+
+    @staticmethod
+    def _excerpt(content: str, hits: List[Dict[str, Any]], patterns: Sequence[Tuple[str, Pattern]] = (),
+                 margin: int = 60) -> str:
+        """
+        Text around the first hit with the hits, and every match of
+        `patterns` that overlaps the excerpt, masked by their policy name.
+        """
+        first = min(hit["start"] for hit in hits)
+        last = max(hit["end"] for hit in hits)
+        lo, hi = max(0, first - margin), min(len(content), max(last, first) + margin)
+        if hi - lo > 4 * margin:
+            hi = lo + 4 * margin
+
+        spans = [(hit["start"], hit["end"], hit["policy"]) for hit in hits]
+        # A match may start before the excerpt or need text just after it to match
+        scan_hi = min(len(content), hi + margin)
+        for name, regex in patterns:
+            for match in regex.finditer(content, 0, scan_hi):
+                if match.end() > lo and match.start() < hi and match.end() > match.start():
+                    spans.append((match.start(), match.end(), name))
+
+        pieces = []
+        cursor = lo
+        for start, end, policy in sorted(spans):
+            if start >= hi:
+                continue
+            if start < cursor:
+                # Overlaps a span already masked (or starts before the excerpt); extend the mask
+                cursor = max(cursor, min(end, hi))
+                continue
+            pieces.append(content[cursor:start])
+            pieces.append(f"[{policy}]")
+            cursor = min(end, hi)
+        pieces.append(content[cursor:hi])
+        return "".join(pieces)
+
+    def mark_false_positive(self, audit_id: int) -> bool:
+        """Operator feedback: the audited match should not have fired."""
+        for entry in self.recent:
+            if entry["id"] == audit_id and not entry.get("false_positive"):
+                entry["false_positive"] = True
+                for policy in entry["policies"]:
+                    self.false_positives[policy] = self.false_positives.get(policy, 0) + 1
+                return True
+        return False
+
+    def _schedule_flush(self):
+        if self._flush_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_scheduled = True
+        loop.call_later(self.flush_delay, lambda: loop.create_task(self.flush()))
+
+    async def flush(self):
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        entries = list(self._pending)
+        self._pending.clear()
+        await asyncio.to_thread(self._append, entries)
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        directory = os.path.dirname(self.audit_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.audit_path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def get_stats(self) -> Dict[str, Any]:
+        policies = sorted(set(self.evaluated) | set(self.skipped) | set(self.matched))
+        return {
+            "checks": self.checks,
+            "blocks": self.blocks,
+            "policies": {
+                name: {
+                    "evaluated": self.evaluated.get(name, 0),
+                    "skipped_by_prefilter": self.skipped.get(name, 0),
+                    "matched": self.matched.get(name, 0),
+                    "false_positives": self.false_positives.get(name, 0)
+                }
+                for name in policies
+            },
+            "latency": {context: h.to_dict() for context, h in self.latency.items()},
+            "audit": {
+                "sample_rate": self.sample_rate,
+                "pending": len(self._pending),
+                "dropped": self.audit_dropped,
+                "recent": list(self.recent)[-20:]
+            }
+        }
+
+
+_shared_metrics: Optional[SafetyMetrics] = None
+
+def get_safety_metrics() -> SafetyMetrics:
+    global _shared_metrics
+    if _shared_metrics is None:
+        _shared_metrics = SafetyMetrics()
+    return _shared_metrics
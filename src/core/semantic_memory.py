@@ -0,0 +1,272 @@
+import os
+import re
+import json
+import zlib
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from core.mmap_column import MappedColumn
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of word unigrams and bigrams into a fixed-size,
+    L2-normalized vector. No model download and no network call, so every
+    turn can be embedded on the request path.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = re.findall(r"\w+", text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+class SemanticMemory:
+    """
+    Long-term recall for one conversation.
+    Every turn is embedded into a memory-mapped float32 matrix on disk; the
+    text goes to an append-only JSONL file next to it. Small stores are
+    searched exactly. Past `ivf_min` rows an IVF index (spherical k-means
+    centroids plus inverted lists) is trained off the event loop, and a
+    query only scores the rows in its `nprobe` nearest clusters.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, top_k: Optional[int] = None,
+                 min_score: Optional[float] = None, nprobe: Optional[int] = None,
+                 ivf_min: Optional[int] = None):
+        self.directory = directory
+        self.top_k = top_k if top_k is not None else int(os.getenv("SEMANTIC_MEMORY_TOP_K", "4"))
+        self.min_score = min_score if min_score is not None else float(os.getenv("SEMANTIC_MEMORY_MIN_SCORE", "0.2"))
+        self.nprobe = nprobe if nprobe is not None else int(os.getenv("SEMANTIC_MEMORY_NPROBE", "8"))
+        self.ivf_min = ivf_min if ivf_min is not None else int(os.getenv("SEMANTIC_MEMORY_IVF_MIN", "20000"))
+        os.makedirs(directory, exist_ok=True)
+
+        meta = self._read_meta()
+        if dim is None:
+            dim = meta.get("dim") or int(os.getenv("SEMANTIC_MEMORY_DIM", "256"))
+        if meta.get("dim", dim) != dim:
+            raise ValueError(f"{directory} holds {meta['dim']}-d vectors, not {dim}-d")
+        self.embedder = HashingEmbedder(dim)
+
+        self.texts_path = os.path.join(directory, "texts.jsonl")
+        self.vectors = MappedColumn(os.path.join(directory, "vectors.f32"), np.float32, dim)
+        # Cluster id + 1 per row; 0 means not yet assigned
+        self.assignments = MappedColumn(os.path.join(directory, "lists.i32"), np.int32)
+        self.offsets: List[int] = self._scan_offsets()
+
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        self._lists: List[List[int]] = []
+        self._list_arrays: List[Optional[np.ndarray]] = []
+        self._training: Optional[asyncio.Task] = None
+        self.searches = 0
+
+        centroids_path = os.path.join(directory, "centroids.npy")
+        if os.path.exists(centroids_path):
+            self._install(np.load(centroids_path), meta.get("trained_rows", 0))
+
+        if not meta:
+            self._write_meta()
+
+    @classmethod
+    def for_agent(cls, agent_id: str) -> "SemanticMemory":
+        root = os.getenv("SEMANTIC_MEMORY_PATH", "data/semantic")
+        return cls(os.path.join(root, re.sub(r"[^\w.-]", "_", agent_id)))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def add(self, role: str, content: str):
+        row = len(self.offsets)
+        self.vectors.ensure(row + 1)
+        self.assignments.ensure(row + 1)
+        vector = self.embedder.embed(content)
+        # Vector first: a crash in between leaves an unused row, never a text without one
+        self.vectors.data[row] = vector
+
+        with open(self.texts_path, "ab") as f:
+            offset = f.tell()
+            f.write(json.dumps({"role": role, "content": content}).encode("utf-8") + b"\n")
+        self.offsets.append(offset)
+
+        if self.centroids is not None:
+            self._assign_rows(row, row + 1)
+        self._maybe_train()
+
+    def search(self, query: str, k: Optional[int] = None, exclude_last: int = 0) -> List[Tuple[float, str, str]]:
+        """
+        Best matches for `query` as (score, role, content), best first.
+        The newest `exclude_last` rows are skipped (they are already in the prompt).
+        """
+        k = k or self.top_k
+        limit = len(self.offsets) - exclude_last
+        if limit <= 0:
+            return []
+        self.searches += 1
+        q = self.embedder.embed(query)
+
+        if self.centroids is None:
+            rows = None
+            scores = self.vectors.data[:limit] @ q
+        else:
+            rows = self._candidate_rows(q, limit)
+            if not len(rows):
+                return []
+            scores = self.vectors.data[rows] @ q
+
+        top = min(k, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+
+        results = []
+        with open(self.texts_path, "rb") as f:
+            for i in best:
+                score = float(scores[i])
+                if score < self.min_score:
+                    break
+                f.seek(self.offsets[int(rows[i]) if rows is not None else int(i)])
+                entry = json.loads(f.readline())
+                results.append((score, entry["role"], entry["content"]))
+        return results
+
+    def _candidate_rows(self, q: np.ndarray, limit: int) -> np.ndarray:
+        nprobe = min(self.nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+        parts = []
+        for cluster in probe:
+            array = self._list_arrays[cluster]
+            if array is None:
+                array = self._list_arrays[cluster] = np.array(self._lists[cluster], dtype=np.int64)
+            parts.append(array)
+        rows = np.concatenate(parts)
+        return rows[rows < limit]
+
+    def _assign_rows(self, start: int, end: int, chunk: int = 65536):
+        for lo in range(start, end, chunk):
+            hi = min(end, lo + chunk)
+            labels = np.argmax(self.vectors.data[lo:hi] @ self.centroids.T, axis=1)
+            self.assignments.data[lo:hi] = labels + 1
+            for row, label in zip(range(lo, hi), labels.tolist()):
+                self._lists[label].append(row)
+                self._list_arrays[label] = None
+
+    def _install(self, centroids: np.ndarray, trained_rows: int):
+        """Swap in a new set of centroids and rebuild the inverted lists."""
+        self.centroids = centroids.astype(np.float32)
+        self.trained_rows = trained_rows
+        self._lists = [[] for _ in range(len(centroids))]
+        self._list_arrays = [None] * len(centroids)
+
+        count = len(self.offsets)
+        labels = np.asarray(self.assignments.data[:count]) - 1
+        assigned = np.flatnonzero(labels >= 0)
+        order = assigned[np.argsort(labels[assigned], kind="stable")]
+        bounds = np.searchsorted(labels[order], np.arange(len(centroids) + 1))
+        for cluster in range(len(centroids)):
+            self._lists[cluster] = order[bounds[cluster]:bounds[cluster + 1]].tolist()
+
+        unassigned = np.flatnonzero(labels < 0)
+        if len(unassigned):
+            self._assign_rows(int(unassigned[0]), count)
+
+    def _maybe_train(self):
+        count = len(self.offsets)
+        if count < self.ivf_min or count < 2 * self.trained_rows:
+            return
+        if self._training is not None and not self._training.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._finish_training(*self._train(count), count)
+            return
+        self._training = loop.create_task(self._train_in_background(count))
+
+    async def _train_in_background(self, count: int):
+        centroids, labels = await asyncio.to_thread(self._train, count)
+        self._finish_training(centroids, labels, count)
+
+    def _train(self, count: int, sample_size: int = 20000, iterations: int = 8,
+               chunk: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+        """k-means on a sample, then label the first `count` rows. Runs in a worker thread."""
+        # Appends may remap the column meanwhile; the old mapping stays valid
+        data = self.vectors.data
+        rng = np.random.default_rng(count)
+        nlist = max(1, min(1024, int(count ** 0.5)))
+        sample_rows = np.sort(rng.choice(count, size=min(count, max(sample_size, nlist * 8)), replace=False))
+        sample = np.asarray(data[sample_rows])
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        centroids = centroids.astype(np.float32)
+
+        labels = np.empty(count, dtype=np.int32)
+        for lo in range(0, count, chunk):
+            hi = min(count, lo + chunk)
+            labels[lo:hi] = np.argmax(data[lo:hi] @ centroids.T, axis=1)
+        return centroids, labels
+
+    def _finish_training(self, centroids: np.ndarray, labels: np.ndarray, count: int):
+        # Rows added while training ran are labelled by _install
+        self.assignments.data[:count] = labels + 1
+        self.assignments.data[count:len(self.offsets)] = 0
+        self._install(centroids, count)
+        np.save(os.path.join(self.directory, "centroids.npy"), centroids)
+        self._write_meta()
+
+    async def wait_for_training(self):
+        if self._training is not None and not self._training.done():
+            await self._training
+
+    def _read_meta(self) -> Dict[str, Any]:
+        path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self):
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump({"dim": self.embedder.dim, "trained_rows": self.trained_rows}, f)
+
+    def _scan_offsets(self) -> List[int]:
+        offsets = []
+        if os.path.exists(self.texts_path):
+            with open(self.texts_path, "rb") as f:
+                position = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offsets.append(position)
+                    position += len(line)
+            # Drop a torn final line so the next append starts cleanly
+            if os.path.getsize(self.texts_path) > position:
+                with open(self.texts_path, "r+b") as f:
+                    f.truncate(position)
+        return offsets
+
+    def flush(self):
+        self.vectors.data.flush()
+        self.assignments.data.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self.offsets),
+            "dim": self.embedder.dim,
+            "index": "ivf" if self.centroids is not None else "exact",
+            "clusters": len(self.centroids) if self.centroids is not None else 0,
+            "trained_rows": self.trained_rows,
+            "searches": self.searches
+        }
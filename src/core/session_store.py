@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Tuple
+
+from core.agent import AIChatbot
+
+# Rough per-object overheads used for the resident-size estimate
+SESSION_BASE_BYTES = 4096
+MESSAGE_BASE_BYTES = 200
+
+class SessionStore:
+    """
+    Two-tier home for chat sessions.
+    Active sessions stay in an in-memory LRU. Once the hot tier exceeds its
+    session count or memory ceiling, the least recently used idle sessions
+    are serialized to SQLite and rehydrated lazily on their next request.
+    """
+
+    def __init__(self, factory: Callable[[str], AIChatbot], max_hot_sessions: Optional[int] = None,
+                 memory_ceiling_mb: Optional[float] = None, db_path: Optional[str] = None):
+        self.factory = factory
+        self.max_hot_sessions = max_hot_sessions if max_hot_sessions is not None else int(os.getenv("SESSION_MAX_HOT", "1000"))
+        ceiling_mb = memory_ceiling_mb if memory_ceiling_mb is not None else float(os.getenv("SESSION_MEMORY_MB", "256"))
+        self.memory_ceiling = int(ceiling_mb * 1024 * 1024)
+        self.db_path = db_path if db_path is not None else os.getenv("SESSION_DB_PATH", "data/sessions/sessions.sqlite3")
+
+        self._hot: "OrderedDict[str, AIChatbot]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._pins: Dict[str, int] = {}
+        # Sessions being written out; still served from here until the write lands
+        self._spilling: Dict[str, AIChatbot] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._hot_bytes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self.evictions = 0
+        self.rehydrations = 0
+        self.created = 0
+
+    @asynccontextmanager
+    async def session(self, session_id: str) -> AsyncIterator[AIChatbot]:
+        """
+        Borrow a session for one turn. It is pinned (never evicted) while
+        borrowed, and the memory ceiling is enforced when it is returned.
+        """
+        agent = await self.get(session_id)
+        self._pins[session_id] = self._pins.get(session_id, 0) + 1
+        try:
+            yield agent
+        finally:
+            self._pins[session_id] -= 1
+            if not self._pins[session_id]:
+                del self._pins[session_id]
+            if self._hot.get(session_id) is agent:
+                self._resize(session_id, agent)
+            await self.enforce_ceiling()
+
+    async def get(self, session_id: str) -> AIChatbot:
+        agent = self._hot.get(session_id)
+        if agent is not None:
+            self._hot.move_to_end(session_id)
+            return agent
+
+        agent = self._spilling.pop(session_id, None)
+        if agent is None:
+            # Collapse concurrent rehydrations of the same session
+            task = self._loading.get(session_id)
+            if task is None:
+                task = asyncio.get_running_loop().create_task(self._load(session_id))
+                self._loading[session_id] = task
+            agent = await task
+
+            # A concurrent caller may already have installed it
+            if session_id in self._hot:
+                return self._hot[session_id]
+
+        self._hot[session_id] = agent
+        self._resize(session_id, agent)
+        return agent
+
+    async def _load(self, session_id: str) -> AIChatbot:
+        try:
+            snapshot = await asyncio.to_thread(self._disk_get, session_id)
+            if snapshot is None:
+                self.created += 1
+                return self.factory(session_id)
+            self.rehydrations += 1
+            return AIChatbot.from_snapshot(snapshot)
+        finally:
+            self._loading.pop(session_id, None)
+
+    async def drop(self, session_id: str) -> bool:
+        agent = self._hot.pop(session_id, None)
+        if agent is not None:
+            self._hot_bytes -= self._sizes.pop(session_id, 0)
+        self._spilling.pop(session_id, None)
+        removed = await asyncio.to_thread(self._disk_delete, session_id)
+        return agent is not None or removed
+
+    async def enforce_ceiling(self):
+        """Spill least recently used idle sessions until within limits."""
+        victims: List[Tuple[str, AIChatbot]] = []
+        for session_id, agent in list(self._hot.items()):
+            if len(self._hot) <= self.max_hot_sessions and self._hot_bytes <= self.memory_ceiling:
+                break
+            if session_id in self._pins or agent.busy:
+                continue
+            del self._hot[session_id]
+            self._hot_bytes -= self._sizes.pop(session_id, 0)
+            self._spilling[session_id] = agent
+            victims.append((session_id, agent))
+
+        if victims:
+            await self._spill(victims)
+
+    async def flush(self):
+        """Write every resident session to disk (e.g. on shutdown)."""
+        await self._spill(list(self._hot.items()))
+
+    async def _spill(self, victims: List[Tuple[str, AIChatbot]]):
+        rows = [(session_id, json.dumps(agent.to_snapshot())) for session_id, agent in victims]
+        await asyncio.to_thread(self._disk_put_many, rows)
+
+        for session_id, agent in victims:
+            # Skip sessions pulled back into the hot tier while the write was in flight
+            if self._spilling.get(session_id) is agent:
+                del self._spilling[session_id]
+                self.evictions += 1
+
+    def _resize(self, session_id: str, agent: AIChatbot):
+        size = SESSION_BASE_BYTES + sum(
+            MESSAGE_BASE_BYTES + len(m.content) for m in agent.memory.turns
+        ) + len(agent.memory.summary)
+        self._hot_bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, updated_at REAL, snapshot TEXT)"
+            )
+        return self._db
+
+    def _disk_get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT snapshot FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _disk_put_many(self, rows: List[Tuple[str, str]]):
+        now = time.time()
+        with self._db_lock:
+            db = self._connect()
+            db.executemany(
+                "INSERT OR REPLACE INTO sessions (session_id, updated_at, snapshot) VALUES (?, ?, ?)",
+                [(session_id, now, snapshot) for session_id, snapshot in rows]
+            )
+            db.commit()
+
+    def _disk_delete(self, session_id: str) -> bool:
+        with self._db_lock:
+            db = self._connect()
+            cursor = db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            db.commit()
+        return cursor.rowcount > 0
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "hot": len(self._hot),
+            "hot_bytes": self._hot_bytes,
+            "memory_ceiling": self.memory_ceiling,
+            "max_hot_sessions": self.max_hot_sessions,
+            "spilling": len(self._spilling),
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+            "created": self.created
+        }
@@ -0,0 +1,267 @@
+import os
+import time
+import signal
+import asyncio
+import inspect
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.control import ControlPlane
+
+@dataclass
+class AgentSpec:
+    name: str
+    # Runs the agent's autonomous loop under the given control plane
+    run: Callable[[ControlPlane], Awaitable[Any]]
+    # CPU seconds the agent may use per supervisor window; None = unlimited
+    cpu_budget: Optional[float] = None
+    # Flush state on shutdown (sync or async)
+    on_shutdown: Optional[Callable[[], Any]] = None
+
+class _MeteredRun:
+    """
+    Awaitable that steps a coroutine itself and charges the thread CPU time
+    of each step to `charge`. Agents share one thread, so this measures
+    only that agent's own work; CPU it hands to other tasks or worker
+    threads is not counted.
+    """
+
+    def __init__(self, coro, charge: Callable[[float], None]):
+        self.coro = coro
+        self.charge = charge
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            started = time.thread_time()
+            try:
+                yielded = self.coro.throw(error) if error is not None else self.coro.send(value)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self.charge(time.thread_time() - started)
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                self.coro.close()
+                raise
+            except BaseException as e:
+                error = e
+
+class AgentControl(ControlPlane):
+    """
+    Per-agent control plane handed to a supervised loop. Starting a cycle
+    takes one of the supervisor's cycle slots and is held back while the
+    agent is over its CPU budget for the current window.
+    """
+
+    def __init__(self, supervisor: "Supervisor", spec: AgentSpec):
+        super().__init__(spec.name, port=-1)
+        self.supervisor = supervisor
+        self.spec = spec
+        self.state = "starting"
+        self.crashes = 0
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.throttled = 0
+
+        self.cpu_total = 0.0
+        self.cpu_window = 0.0
+        self.window_start = time.monotonic()
+        self._holding_slot = False
+
+    async def wait_until_running(self):
+        await super().wait_until_running()
+        await self._respect_budget()
+        await self.supervisor.cycle_slots.acquire()
+        self._holding_slot = True
+        self.state = "cycling"
+
+    def cycle_done(self):
+        self.release_slot()
+        self.state = "sleeping"
+        super().cycle_done()
+
+    def release_slot(self):
+        if not self._holding_slot:
+            return
+        self._holding_slot = False
+        self.supervisor.cycle_slots.release()
+
+    def charge_cpu(self, seconds: float):
+        """CPU used by one step of this agent's own task."""
+        self.cpu_total += seconds
+        self.cpu_window += seconds
+
+    async def _respect_budget(self):
+        window = self.supervisor.cpu_window
+        if time.monotonic() - self.window_start >= window:
+            self.window_start, self.cpu_window = time.monotonic(), 0.0
+        budget = self.spec.cpu_budget
+        if budget is None or self.cpu_window < budget:
+            return
+        wait = self.window_start + window - time.monotonic()
+        self.throttled += 1
+        self.state = "throttled"
+        print(f"⏳ {self.name} used {self.cpu_window:.1f}s CPU of {budget:.1f}s; next cycle in {wait:.0f}s")
+        await asyncio.sleep(max(0.0, wait))
+        self.window_start, self.cpu_window = time.monotonic(), 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": "paused" if self.paused else self.state,
+            "cycles": self.cycles,
+            "crashes": self.crashes,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "cpu_s": round(self.cpu_total, 3),
+            "cpu_window_s": round(self.cpu_window, 3),
+            "cpu_budget_s": self.spec.cpu_budget,
+            "throttled": self.throttled
+        }
+
+class StackControl(ControlPlane):
+    """
+    Operator plane for the whole stack. `pause`, `resume` and `cycle-now`
+    apply to every agent; `<agent> <command>` goes to one agent
+    (e.g. `finance reset-risk`, `mycelium status`).
+    """
+
+    def __init__(self, supervisor: "Supervisor", port: Optional[int] = None, console: bool = False):
+        super().__init__("stack", port=port, console=console)
+        self.supervisor = supervisor
+        self.set_status(supervisor.get_status)
+
+    def pause(self) -> Dict[str, Any]:
+        return {name: agent.pause() for name, agent in self.supervisor.agents.items()}
+
+    def resume(self) -> Dict[str, Any]:
+        return {name: agent.resume() for name, agent in self.supervisor.agents.items()}
+
+    def cycle_now(self) -> Dict[str, Any]:
+        return {name: agent.cycle_now() for name, agent in self.supervisor.agents.items()}
+
+    async def dispatch(self, line: str, trusted: bool = True) -> Dict[str, Any]:
+        name, _, rest = line.strip().partition(" ")
+        agent = self.supervisor.agents.get(name.lower())
+        if agent is not None:
+            return await agent.dispatch(rest or "status", trusted=trusted)
+        return await super().dispatch(line, trusted=trusted)
+
+class Supervisor:
+    """
+    Hosts several autonomous agents in one event loop so they share the
+    LLM pool, caches, the event bus and one data engine.
+    At most `max_concurrent` agents run a cycle at the same time, each
+    agent can be given a CPU budget per window, crashed agents are
+    restarted with exponential backoff (reset once a run has been stable),
+    and shutdown cancels every loop and then runs each agent's flush hook.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, cpu_window: Optional[float] = None,
+                 backoff_base: Optional[float] = None, backoff_max: Optional[float] = None,
+                 stable_after: Optional[float] = None, port: Optional[int] = None, console: bool = False):
+        self.max_concurrent = max_concurrent if max_concurrent is not None else int(os.getenv("SUPERVISOR_MAX_CONCURRENT", "2"))
+        self.cpu_window = cpu_window if cpu_window is not None else float(os.getenv("SUPERVISOR_CPU_WINDOW", "3600"))
+        self.backoff_base = backoff_base if backoff_base is not None else float(os.getenv("SUPERVISOR_BACKOFF_BASE", "5"))
+        self.backoff_max = backoff_max if backoff_max is not None else float(os.getenv("SUPERVISOR_BACKOFF_MAX", "300"))
+        self.stable_after = stable_after if stable_after is not None else float(os.getenv("SUPERVISOR_STABLE_AFTER", "600"))
+
+        self.cycle_slots = asyncio.Semaphore(self.max_concurrent)
+        self.agents: Dict[str, AgentControl] = {}
+        self.control = StackControl(self, port=port, console=console)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stop = asyncio.Event()
+        self.started_at: Optional[float] = None
+
+    def add(self, spec: AgentSpec) -> AgentControl:
+        if spec.name in self.agents:
+            raise ValueError(f"Agent already registered: {spec.name}")
+        agent = self.agents[spec.name] = AgentControl(self, spec)
+        return agent
+
+    async def start(self):
+        self.started_at = time.time()
+        await self.control.start()
+        loop = asyncio.get_running_loop()
+        for name, agent in self.agents.items():
+            self._tasks[name] = loop.create_task(self._supervise(agent), name=f"agent:{name}")
+
+    async def _supervise(self, agent: AgentControl):
+        consecutive = 0
+        while True:
+            started = time.monotonic()
+            try:
+                agent.state = "running"
+                await _MeteredRun(agent.spec.run(agent), agent.charge_cpu)
+                agent.state = "finished"
+                return
+            except asyncio.CancelledError:
+                agent.release_slot()
+                agent.state = "stopped"
+                raise
+            except Exception as e:
+                agent.release_slot()
+                agent.crashes += 1
+                agent.last_error = f"{type(e).__name__}: {e}"
+                if time.monotonic() - started >= self.stable_after:
+                    consecutive = 0
+                consecutive += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (consecutive - 1))
+                delay *= random.uniform(0.9, 1.1)
+                agent.state = "backoff"
+                print(f"💥 {agent.name} crashed ({agent.last_error}); restarting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                agent.restarts += 1
+
+    def request_stop(self):
+        self._stop.set()
+
+    async def run(self):
+        """Start every agent and run until request_stop() or SIGINT/SIGTERM."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Windows: Ctrl+C still cancels us, and stop() runs below
+                pass
+        await self.start()
+        try:
+            await self._stop.wait()
+        finally:
+            await self.stop()
+
+    async def stop(self, timeout: float = 10.0):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        self._tasks.clear()
+
+        for agent in self.agents.values():
+            if agent.spec.on_shutdown is None:
+                continue
+            try:
+                result = agent.spec.on_shutdown()
+                if inspect.isawaitable(result):
+                    await asyncio.wait_for(result, timeout)
+            except Exception as e:
+                print(f"⚠️ {agent.name} shutdown hook failed: {e}")
+        await self.control.stop()
+
+    async def get_status(self) -> Dict[str, Any]:
+        agents = {}
+        for name, agent in self.agents.items():
+            agents[name] = agent.get_stats()
+            if agent._status is not None:
+                detail = agent._status()
+                agents[name]["detail"] = await detail if inspect.isawaitable(detail) else detail
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+            "max_concurrent": self.max_concurrent,
+            "agents": agents
+        }
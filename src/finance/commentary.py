@@ -0,0 +1,185 @@
+import os
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Any, Optional
+
+from core.safety import SystemSafety
+from models.cerebras_client import Message
+from models.client_pool import get_client_pool
+from models.router import TaskClass
+from models.scheduler import Priority
+from finance.strategies.core_strategies import Signal
+
+@dataclass
+class SignalDecision:
+    signal: Signal
+    executed: bool
+    reason: str = ""
+
+    @property
+    def outcome(self) -> str:
+        return "executed" if self.executed else "blocked"
+
+class SignalCommentator:
+    """
+    Plain-language explanations for each cycle's trading decisions.
+    A cycle's signals go out as one compact batch request on a background
+    task, so the trading loop never waits on the model. Explanations are
+    cached by a fingerprint of the decision (rounded numbers included), so
+    a repeat of the same setup is explained from cache.
+    """
+
+    def __init__(self, max_cached: Optional[int] = None, max_batch: Optional[int] = None,
+                 log_path: Optional[str] = None):
+        self.max_cached = max_cached if max_cached is not None else int(os.getenv("COMMENTARY_CACHE_SIZE", "500"))
+        self.max_batch = max_batch if max_batch is not None else int(os.getenv("COMMENTARY_MAX_BATCH", "20"))
+        self.log_path = log_path if log_path is not None else os.getenv("COMMENTARY_LOG", "data/performance/commentary.jsonl")
+        self.safety = SystemSafety()
+
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: List[SignalDecision] = []
+        self._task: Optional[asyncio.Task] = None
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+        self.batches = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    @staticmethod
+    def fingerprint(decision: SignalDecision) -> str:
+        s = decision.signal
+        key = "|".join([
+            s.symbol, s.strategy.value, s.action, decision.outcome, decision.reason,
+            f"{round(s.confidence * 20) / 20:.2f}", f"{round(s.expected_return * 200) / 200:.3f}"
+        ])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def submit(self, decisions: List[SignalDecision]):
+        """Queue a cycle's decisions. Returns immediately."""
+        for decision in decisions:
+            fingerprint = self.fingerprint(decision)
+            cached = self._cache.get(fingerprint)
+            if cached is not None:
+                self._cache.move_to_end(fingerprint)
+                self.cache_hits += 1
+                self._publish(decision, cached, cached=True)
+            else:
+                self._pending.append(decision)
+
+        if self._pending and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def drain(self):
+        """Wait for queued explanations (e.g. before shutdown)."""
+        while self._task is not None and not self._task.done():
+            await self._task
+
+    async def _run(self):
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            try:
+                await self._explain(batch)
+            except Exception as e:
+                self.failures += 1
+                print(f"Signal commentary failed: {e}")
+
+    def _summary_line(self, index: int, decision: SignalDecision) -> str:
+        s = decision.signal
+        line = (f"{index}|{s.action.upper()} {s.symbol}|{s.strategy.value}|conf {s.confidence:.2f}"
+                f"|exp {s.expected_return:+.2%}|sl {s.stop_loss:.4g}|tp {s.take_profit:.4g}|{decision.outcome}")
+        return f"{line}: {decision.reason}" if decision.reason else line
+
+    async def _explain(self, batch: List[SignalDecision]):
+        # Two decisions with the same fingerprint in one batch are explained once
+        unique: Dict[str, SignalDecision] = {}
+        for decision in batch:
+            unique.setdefault(self.fingerprint(decision), decision)
+        fingerprints = list(unique)
+
+        summary = "\n".join(self._summary_line(i, unique[f]) for i, f in enumerate(fingerprints))
+        messages = [
+            Message(role="system", content=(
+                "You explain automated trading decisions to the account owner. For each numbered line "
+                "(id|action|strategy|confidence|expected return|stop loss|take profit|outcome) write one or two "
+                "plain sentences on why the signal fired and why it was executed or blocked. "
+                "Reply with a JSON object mapping each id to its explanation."
+            )),
+            Message(role="user", content=summary)
+        ]
+        client = get_client_pool().get_client()
+        response = await client.complete(messages, priority=Priority.BACKGROUND, task=TaskClass.SUMMARIZE,
+                                         agent_id="signal_commentary")
+        self.batches += 1
+
+        explanations = self._parse(response.content)
+        for i, fingerprint in enumerate(fingerprints):
+            text = explanations.get(str(i))
+            if not text or not self.safety.check(text, "output")["allowed"]:
+                continue
+            self._cache[fingerprint] = text
+            self._cache.move_to_end(fingerprint)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+        published = []
+        for decision in batch:
+            text = self._cache.get(self.fingerprint(decision))
+            if text is not None:
+                published.append(self._publish(decision, text, cached=False))
+        if published:
+            await asyncio.to_thread(self._append_log, published)
+
+    @staticmethod
+    def _parse(content: str) -> Dict[str, str]:
+        """JSON object if the model complied, otherwise "id: text" lines."""
+        start, end = content.find("{"), content.rfind("}")
+        if start != -1 and end > start:
+            try:
+                return {str(k): str(v).strip() for k, v in json.loads(content[start:end + 1]).items()}
+            except (ValueError, AttributeError):
+                pass
+        parsed = {}
+        for line in content.splitlines():
+            head, sep, text = line.partition(":")
+            if sep and head.strip().strip("-*#. ").isdigit():
+                parsed[head.strip().strip("-*#. ")] = text.strip()
+        return parsed
+
+    def _publish(self, decision: SignalDecision, text: str, cached: bool) -> Dict[str, Any]:
+        s = decision.signal
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "symbol": s.symbol,
+            "action": s.action,
+            "strategy": s.strategy.value,
+            "outcome": decision.outcome,
+            "explanation": text,
+            "cached": cached
+        }
+        self.recent.append(entry)
+        return entry
+
+    def _append_log(self, entries: List[Dict[str, Any]]):
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.log_path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def latest(self, limit: int = 10, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        entries = [e for e in self.recent if symbol is None or e["symbol"] == symbol.upper()]
+        return entries[-limit:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "cache_hits": self.cache_hits,
+            "cached": len(self._cache),
+            "pending": len(self._pending),
+            "failures": self.failures
+        }
@@ -1,10 +1,17 @@
 ﻿import os
 import json
 import asyncio
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-import aiohttp
+from datetime import datetime
+
+from models.client_pool import get_client_pool
+from finance.market_cache import QuoteCache, get_quote_cache
+from communication.bus import EventBus, get_event_bus
+from communication.events import Tick
+
+if TYPE_CHECKING:
+    from finance.tick_store import TickStore
 
 @dataclass
 class MarketData:
@@ -18,113 +25,156 @@ class MarketData:
 class FreeDataEngine:
     """
     Fetches market data using FREE APIs (no keys required for basic data).
-    Falls back to cached data if APIs fail.
+    Quotes live in the process-wide QuoteCache, so every engine (and every
+    agent) shares one copy and one upstream request per symbol; stale
+    quotes are served if the APIs fail.
+    Every fresh quote is published as a Tick on the event bus and, with
+    TICK_STORE=true, appended to the on-disk tick store unless
+    `is_streaming` reports its symbol live (the stream records it then).
     """
     
-    def __init__(self):
-        self.cache: Dict[str, MarketData] = {}
-        self.cache_time = timedelta(minutes=5)
-        self.last_update: Dict[str, datetime] = {}
+    def __init__(self, bus: Optional[EventBus] = None, coingecko_url: Optional[str] = None,
+                 batch_size: Optional[int] = None, quote_cache: Optional[QuoteCache] = None,
+                 tick_store: Optional["TickStore"] = None):
+        self.bus = bus or get_event_bus()
+        self.quotes = quote_cache if quote_cache is not None else get_quote_cache()
+        self.coingecko_url = (coingecko_url or os.getenv("COINGECKO_URL", "https://api.coingecko.com/api/v3")).rstrip("/")
+        self.batch_size = batch_size if batch_size is not None else int(os.getenv("COINGECKO_BATCH_SIZE", "50"))
+        self.batch_requests = 0
+        if tick_store is None and os.getenv("TICK_STORE", "false").lower() == "true":
+            # Imported lazily: numpy is only needed when the store is on
+            from finance.tick_store import get_tick_store
+            tick_store = get_tick_store()
+        self.tick_store = tick_store
+        # Set by an agent streaming ticks into the same store
+        self.is_streaming: Optional[Callable[[str], bool]] = None
     
     async def get_crypto_price(self, symbol: str = "BTC") -> Optional[MarketData]:
         """
         Get crypto price from free CoinGecko API (no key required).
         """
-        cache_key = f"crypto_{symbol}"
-        
-        # Check cache
-        if self._is_cached(cache_key):
-            return self.cache[cache_key]
+        return (await self.get_crypto_prices([symbol])).get(symbol)
+    
+    async def get_crypto_prices(self, symbols: List[str]) -> Dict[str, MarketData]:
+        """
+        Quotes for many coins (CoinGecko ids) keyed by the symbol as given.
+        Uncached coins are fetched in `batch_size` chunks, one `simple/price`
+        call per chunk over the shared pooled session; each coin is then
+        cached on its own.
+        """
+        found = await self.quotes.get_many([f"crypto:{s.lower()}" for s in symbols], self._fetch_crypto)
+        quotes = {}
+        for symbol in symbols:
+            data = found.get(f"crypto:{symbol.lower()}")
+            if data is not None:
+                quotes[symbol] = data
+        return quotes
+    
+    async def _fetch_crypto(self, keys: List[str]) -> Dict[str, MarketData]:
+        coin_ids = [key.split(":", 1)[1] for key in keys]
+        chunks = [coin_ids[i:i + self.batch_size] for i in range(0, len(coin_ids), self.batch_size)]
+        results = await asyncio.gather(*[self._fetch_crypto_batch(chunk) for chunk in chunks], return_exceptions=True)
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                # CoinGecko free API (no key needed)
-                url = f"https://api.coingecko.com/api/v3/simple/price?ids={symbol.lower()}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true"
-                
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if symbol.lower() in data:
-                            coin_data = data[symbol.lower()]
-                            market_data = MarketData(
-                                symbol=symbol.upper(),
-                                price=coin_data["usd"],
-                                change_24h=coin_data.get("usd_24h_change", 0),
-                                volume=coin_data.get("usd_24h_vol", 0),
-                                timestamp=datetime.now(),
-                                source="coingecko_free"
-                            )
-                            self._update_cache(cache_key, market_data)
-                            return market_data
-        except Exception as e:
-            print(f"Error fetching crypto {symbol}: {e}")
+        fetched = {}
+        failures = []
+        for result in results:
+            if isinstance(result, Exception):
+                failures.append(result)
+            else:
+                fetched.update(result)
+        if failures and not fetched:
+            raise failures[0]
+        for error in failures:
+            print(f"Error fetching crypto batch: {error}")
+        return fetched
+    
+    async def _fetch_crypto_batch(self, coin_ids: List[str]) -> Dict[str, MarketData]:
+        params = {
+            "ids": ",".join(coin_ids),
+            "vs_currencies": "usd",
+            "include_24hr_change": "true",
+            "include_24hr_vol": "true"
+        }
+        self.batch_requests += 1
+        session = get_client_pool().session()
+        async with session.get(f"{self.coingecko_url}/simple/price", params=params) as response:
+            if response.status != 200:
+                raise RuntimeError(f"CoinGecko HTTP {response.status}")
+            data = await response.json()
         
-        return self._get_cached_or_none(cache_key)
+        now = datetime.now()
+        fetched = {}
+        for coin_id in coin_ids:
+            coin_data = data.get(coin_id)
+            if not coin_data or "usd" not in coin_data:
+                continue
+            fetched[f"crypto:{coin_id}"] = self._published(MarketData(
+                symbol=coin_id.upper(),
+                price=coin_data["usd"],
+                change_24h=coin_data.get("usd_24h_change") or 0,
+                volume=coin_data.get("usd_24h_vol") or 0,
+                timestamp=now,
+                source="coingecko_free"
+            ))
+        return fetched
     
     async def get_stock_price(self, symbol: str = "AAPL") -> Optional[MarketData]:
         """
         Get stock price from free Yahoo Finance proxy.
         """
-        cache_key = f"stock_{symbol}"
-        
-        if self._is_cached(cache_key):
-            return self.cache[cache_key]
-        
-        try:
-            # Using Yahoo Finance via RapidAPI free tier or direct
-            # For now, return mock data with realistic structure
-            # Replace with real API when you get Alpha Vantage key
-            
-            mock_data = MarketData(
-                symbol=symbol.upper(),
+        return await self.quotes.get(f"stock:{symbol.upper()}", self._fetch_stocks)
+    
+    async def _fetch_stocks(self, keys: List[str]) -> Dict[str, MarketData]:
+        # Using Yahoo Finance via RapidAPI free tier or direct
+        # For now, return mock data with realistic structure
+        # Replace with real API when you get Alpha Vantage key
+        fetched = {}
+        for key in keys:
+            symbol = key.split(":", 1)[1]
+            fetched[key] = self._published(MarketData(
+                symbol=symbol,
                 price=150.0 + (hash(symbol) % 50),  # Deterministic "random" price
                 change_24h=2.5,
                 volume=1000000,
                 timestamp=datetime.now(),
                 source="mock_data"
-            )
-            self._update_cache(cache_key, mock_data)
-            return mock_data
-            
-        except Exception as e:
-            print(f"Error fetching stock {symbol}: {e}")
-        
-        return self._get_cached_or_none(cache_key)
-    
-    def _is_cached(self, key: str) -> bool:
-        if key not in self.last_update:
-            return False
-        return datetime.now() - self.last_update[key] < self.cache_time
-    
-    def _update_cache(self, key: str, data: MarketData):
-        self.cache[key] = data
-        self.last_update[key] = datetime.now()
+            ))
+        return fetched
     
-    def _get_cached_or_none(self, key: str) -> Optional[MarketData]:
-        return self.cache.get(key)
+    def _published(self, data: MarketData) -> MarketData:
+        tick = Tick(
+            symbol=data.symbol, price=data.price, volume=data.volume,
+            change_24h=data.change_24h, source=data.source, timestamp=data.timestamp.timestamp()
+        )
+        self.bus.publish_nowait(tick)
+        if self.tick_store is not None and not (self.is_streaming is not None and self.is_streaming(tick.symbol)):
+            self.tick_store.append_tick(tick)
+        return data
     
     async def get_multiple_assets(self, crypto_symbols: List[str], stock_symbols: List[str]) -> Dict[str, MarketData]:
         """
-        Fetch multiple assets in parallel.
+        Fetch multiple assets in parallel (all crypto in batched calls).
         """
-        tasks = []
-        
-        for symbol in crypto_symbols:
-            tasks.append(self.get_crypto_price(symbol))
-        
-        for symbol in stock_symbols:
-            tasks.append(self.get_stock_price(symbol))
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        crypto, *stocks = await asyncio.gather(
+            self.get_crypto_prices(crypto_symbols),
+            *[self.get_stock_price(symbol) for symbol in stock_symbols],
+            return_exceptions=True
+        )
         
         assets = {}
-        for i, result in enumerate(results):
+        if isinstance(crypto, dict):
+            for symbol in crypto_symbols:
+                if symbol in crypto:
+                    assets[crypto[symbol].symbol] = crypto[symbol]
+                else:
+                    print(f"Failed to fetch crypto: {symbol}")
+        else:
+            print(f"Failed to fetch crypto: {crypto}")
+        
+        for symbol, result in zip(stock_symbols, stocks):
             if isinstance(result, MarketData):
                 assets[result.symbol] = result
-            elif i < len(crypto_symbols):
-                print(f"Failed to fetch crypto: {crypto_symbols[i]}")
             else:
-                stock_idx = i - len(crypto_symbols)
-                print(f"Failed to fetch stock: {stock_symbols[stock_idx]}")
+                print(f"Failed to fetch stock: {symbol}")
         
         return assets
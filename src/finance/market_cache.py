@@ -0,0 +1,200 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Fetches a batch of keys; returns what it found (missing keys are simply absent)
+BatchFetcher = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+    refreshing: bool = False
+
+class QuoteCache:
+    """
+    Process-wide market quote cache shared by every data engine.
+
+    - Fresh for `ttl` seconds. A hit in the last part of that window
+      (after `refresh_ahead` * ttl) refreshes the key in the background,
+      so symbols that are read every cycle never go cold.
+    - Concurrent misses on one key share a single upstream request
+      (single-flight), also across differently shaped batches.
+    - If the upstream fails, a value up to `stale_ttl` old is served
+      instead (stale-while-revalidate).
+    - At most `max_entries` keys, least recently used evicted first.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, refresh_ahead: Optional[float] = None,
+                 stale_ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("QUOTE_CACHE_TTL", "300"))
+        self.refresh_ahead = refresh_ahead if refresh_ahead is not None else float(os.getenv("QUOTE_CACHE_REFRESH_AHEAD", "0.8"))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("QUOTE_CACHE_STALE_TTL", "3600"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("QUOTE_CACHE_SIZE", "2048"))
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: set = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.stale_served = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str, fetcher: BatchFetcher) -> Optional[Any]:
+        return (await self.get_many([key], fetcher)).get(key)
+
+    async def get_many(self, keys: List[str], fetcher: BatchFetcher) -> Dict[str, Any]:
+        now = time.monotonic()
+        results: Dict[str, Any] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        missing: List[str] = []
+        refresh: List[str] = []
+
+        for key in dict.fromkeys(keys):
+            entry = self._entries.get(key)
+            age = now - entry.fetched_at if entry is not None else None
+            if age is not None and age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                results[key] = entry.value
+                if age >= self.refresh_ahead * self.ttl and not entry.refreshing and key not in self._inflight:
+                    refresh.append(key)
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                missing.append(key)
+
+        if refresh:
+            for key in refresh:
+                self._entries[key].refreshing = True
+            task = asyncio.get_running_loop().create_task(self._refresh(refresh, fetcher))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+        if missing:
+            await self._fetch(missing, fetcher)
+            for key in missing:
+                value = self._value_or_stale(key, now)
+                if value is not None:
+                    results[key] = value
+
+        for key, future in waiting.items():
+            try:
+                await asyncio.shield(future)
+            except Exception:
+                pass
+            value = self._value_or_stale(key, now)
+            if value is not None:
+                results[key] = value
+
+        return results
+
+    async def _fetch(self, keys: List[str], fetcher: BatchFetcher):
+        """One upstream call for `keys`; anyone else asking meanwhile waits on it."""
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in keys}
+        self._inflight.update(futures)
+        try:
+            fetched = await fetcher(keys)
+        except Exception as e:
+            self.errors += 1
+            print(f"Quote fetch failed for {', '.join(keys[:5])}{'...' if len(keys) > 5 else ''}: {e}")
+            fetched = {}
+        finally:
+            for key, future in futures.items():
+                self._inflight.pop(key, None)
+                if not future.done():
+                    future.set_result(None)
+
+        now = time.monotonic()
+        for key, value in fetched.items():
+            if value is not None:
+                self._store(key, value, now)
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refreshing = False
+
+    async def _refresh(self, keys: List[str], fetcher: BatchFetcher):
+        self.refreshes += 1
+        await self._fetch(keys, fetcher)
+
+    def _value_or_stale(self, key: str, asked_at: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.fetched_at >= asked_at:
+            # Fetched for this very call
+            return entry.value
+        age = time.monotonic() - entry.fetched_at
+        if age >= self.stale_ttl:
+            return None
+        if age >= self.ttl:
+            self.stale_served += 1
+        return entry.value
+
+    def _store(self, key: str, value: Any, now: float):
+        self._entries[key] = _Entry(value, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Cached value regardless of age, without touching LRU order or stats."""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def fresh(self, key: str) -> Optional[Any]:
+        """Cached value only while younger than `ttl`, without touching LRU order or stats."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.fetched_at >= self.ttl:
+            return None
+        return entry.value
+
+    def invalidate(self, key: Optional[str] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def drain(self):
+        """Wait for background refreshes (tests, shutdown)."""
+        while self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "refreshes": self.refreshes,
+            "stale_served": self.stale_served,
+            "errors": self.errors,
+            "evictions": self.evictions
+        }
+
+
+_shared_cache: Optional[QuoteCache] = None
+
+def get_quote_cache() -> QuoteCache:
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = QuoteCache()
+    return _shared_cache
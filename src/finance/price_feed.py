@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import codecs
+import random
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import aiohttp
+
+from models.client_pool import get_client_pool
+from communication.bus import EventBus, get_event_bus
+from communication.events import Tick
+
+TickSink = Callable[[Tick], Awaitable[Any]]
+
+class TickDecoder:
+    """
+    Incremental decoder for newline-delimited JSON ticks. A frame may carry
+    several ticks, a JSON array of ticks, or end mid-record; the unfinished
+    tail is kept for the next frame. Binary frames are decoded as UTF-8
+    across frame boundaries.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.errors = 0
+
+    def feed(self, data: Union[str, bytes]) -> List[Dict[str, Any]]:
+        if isinstance(data, bytes):
+            data = self._utf8.decode(data)
+        *lines, self._buffer = (self._buffer + data).split("\n")
+
+        records: List[Dict[str, Any]] = []
+        for line in lines:
+            self._decode(line, records, strict=True)
+        # A frame with one record and no trailing newline should not wait for the next frame
+        if self._buffer.strip() and self._decode(self._buffer, records, strict=False):
+            self._buffer = ""
+        return records
+
+    def _decode(self, line: str, records: List[Dict[str, Any]], strict: bool) -> bool:
+        line = line.strip()
+        if not line:
+            return True
+        try:
+            value = json.loads(line)
+        except ValueError:
+            if strict:
+                self.errors += 1
+            return False
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, dict):
+                records.append(item)
+            else:
+                self.errors += 1
+        return True
+
+class PriceFeed(ABC):
+    """
+    Push-based source of ticks. Implementations call `_emit` for each tick
+    as it arrives; every tick is published on the event bus and handed to
+    the registered sinks (e.g. a strategy engine) in arrival order.
+    """
+
+    source = "stream"
+
+    def __init__(self, symbols: List[str], bus: Optional[EventBus] = None, stale_after: Optional[float] = None):
+        self.symbols = [s.upper() for s in symbols]
+        self.bus = bus if bus is not None else get_event_bus()
+        self.stale_after = stale_after if stale_after is not None else float(os.getenv("PRICE_FEED_STALE_AFTER", "60"))
+        self._sinks: List[TickSink] = []
+        self.last_tick_at: Dict[str, float] = {}
+        self.ticks = 0
+        self.sink_errors = 0
+
+    def add_sink(self, sink: TickSink):
+        self._sinks.append(sink)
+
+    async def _emit(self, tick: Tick):
+        self.ticks += 1
+        self.last_tick_at[tick.symbol] = time.monotonic()
+        await self.bus.publish(tick)
+        for sink in self._sinks:
+            try:
+                await sink(tick)
+            except Exception as e:
+                self.sink_errors += 1
+                print(f"Tick sink failed for {tick.symbol}: {e}")
+
+    def is_live(self, symbol: str) -> bool:
+        """True if `symbol` ticked within `stale_after` seconds."""
+        last = self.last_tick_at.get(symbol.upper())
+        return last is not None and time.monotonic() - last < self.stale_after
+
+    @abstractmethod
+    async def run(self):
+        """Receive ticks until stop() is called."""
+
+    @abstractmethod
+    async def stop(self):
+        """Make run() return and release the connection."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": self.symbols,
+            "ticks": self.ticks,
+            "live": [s for s in self.last_tick_at if self.is_live(s)],
+            "sink_errors": self.sink_errors
+        }
+
+class WebSocketPriceFeed(PriceFeed):
+    """
+    Websocket tick stream over the shared client session.
+
+    On connect the client sends
+        {"op": "subscribe", "symbols": [...], "since": <last seq seen>}
+    and the server streams ticks as newline-delimited JSON records
+        {"seq": 42, "symbol": "BITCOIN", "price": 60000.0, "volume": 0.3, "ts": 1760000000.0}
+    Records are decoded as frames arrive. After a dropped connection the
+    client reconnects with jittered exponential backoff and resumes after
+    the last sequence number it processed; replayed duplicates are skipped.
+    """
+
+    def __init__(self, url: str, symbols: List[str], bus: Optional[EventBus] = None,
+                 reconnect_base: Optional[float] = None, reconnect_max: Optional[float] = None,
+                 heartbeat: Optional[float] = None, stale_after: Optional[float] = None):
+        super().__init__(symbols, bus=bus, stale_after=stale_after)
+        self.url = url
+        self.reconnect_base = reconnect_base if reconnect_base is not None else float(os.getenv("PRICE_FEED_RECONNECT_BASE", "1"))
+        self.reconnect_max = reconnect_max if reconnect_max is not None else float(os.getenv("PRICE_FEED_RECONNECT_MAX", "60"))
+        self.heartbeat = heartbeat if heartbeat is not None else float(os.getenv("PRICE_FEED_HEARTBEAT", "30"))
+
+        self.last_seq = 0
+        self.connected = False
+        self.connections = 0
+        self.reconnects = 0
+        self.duplicates = 0
+        self.decode_errors = 0
+        self.last_error: Optional[str] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        """Stream until stop(); connection failures are retried, never raised."""
+        self._stopping.clear()
+        failures = 0
+        while not self._stopping.is_set():
+            received = self.ticks
+            try:
+                await self._stream()
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                self.connected = False
+                self._ws = None
+            if self._stopping.is_set():
+                break
+
+            # Only back off further while connections keep failing without data
+            failures = 1 if self.ticks > received else failures + 1
+            delay = min(self.reconnect_max, self.reconnect_base * 2 ** (failures - 1))
+            delay *= random.uniform(0.9, 1.1)
+            self.reconnects += 1
+            print(f"🔌 Price feed disconnected ({self.last_error or 'closed by server'}); "
+                  f"resuming after seq {self.last_seq} in {delay:.1f}s")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _stream(self):
+        session = get_client_pool().session()
+        async with session.ws_connect(self.url, heartbeat=self.heartbeat or None) as ws:
+            self._ws = ws
+            self.connected = True
+            self.connections += 1
+            self.last_error = None
+            await ws.send_json({"op": "subscribe", "symbols": self.symbols, "since": self.last_seq})
+
+            decoder = TickDecoder()
+            async for message in ws:
+                if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    records = decoder.feed(message.data)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    raise ws.exception() or aiohttp.ClientError("websocket error")
+                else:
+                    break
+                for record in records:
+                    await self._handle(record)
+                self.decode_errors += decoder.errors
+                decoder.errors = 0
+
+    async def _handle(self, record: Dict[str, Any]):
+        seq = record.get("seq")
+        if isinstance(seq, int):
+            if seq <= self.last_seq:
+                self.duplicates += 1
+                return
+            self.last_seq = seq
+        try:
+            tick = Tick(
+                symbol=str(record["symbol"]).upper(),
+                price=float(record["price"]),
+                volume=float(record.get("volume") or 0.0),
+                change_24h=float(record.get("change_24h") or 0.0),
+                source=self.source,
+                timestamp=float(record.get("ts") or time.time())
+            )
+        except (KeyError, TypeError, ValueError):
+            self.decode_errors += 1
+            return
+        await self._emit(tick)
+
+    async def stop(self):
+        self._stopping.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({
+            "url": self.url,
+            "connected": self.connected,
+            "last_seq": self.last_seq,
+            "connections": self.connections,
+            "reconnects": self.reconnects,
+            "duplicates": self.duplicates,
+            "decode_errors": self.decode_errors,
+            "last_error": self.last_error
+        })
+        return stats
@@ -0,0 +1,183 @@
+"""
+Local websocket stand-in for a streaming price feed.
+
+Replays recorded ticks (JSONL, one {"symbol", "price", "volume", "ts"}
+record per line, or a TickStore directory) with the same protocol as
+WebSocketPriceFeed expects, honouring the client's subscribe/resume
+message. Without a recording it replays a seeded random walk. Run with
+src on PYTHONPATH:
+
+    python -m launcher replay-feed --file data/recordings/session.jsonl --speed 10
+    python -m launcher replay-feed --store data/ticks --speed 60
+    PRICE_FEED_URL=ws://127.0.0.1:8766/ws python -m launcher finance
+"""
+
+import os
+import json
+import random
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+from aiohttp import web, WSMsgType
+
+def load_ticks(path: str) -> List[Dict[str, Any]]:
+    """Read a recording; records without a seq are numbered in file order."""
+    ticks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                ticks.append(json.loads(line))
+    return _numbered(ticks)
+
+def store_ticks(directory: str, symbols: Optional[List[str]] = None,
+                start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Ticks from a TickStore, merged across symbols in time order."""
+    from finance.tick_store import TickStore
+    store = TickStore(directory)
+    ticks = []
+    for symbol in symbols or store.symbols():
+        window = store.window(symbol, start, end)
+        for ts, price, volume in zip(window.timestamps.tolist(), window.prices.tolist(), window.volumes.tolist()):
+            ticks.append({"symbol": symbol.upper(), "price": price, "volume": volume, "ts": ts})
+    ticks.sort(key=lambda t: t["ts"])
+    return _numbered(ticks)
+
+def save_ticks(path: str, ticks: Iterable[Dict[str, Any]]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for tick in ticks:
+            f.write(json.dumps(tick) + "\n")
+
+def synthetic_ticks(symbols: List[str], count: int = 500, interval: float = 1.0,
+                    start: float = 1_760_000_000.0, seed: int = 7) -> List[Dict[str, Any]]:
+    """Seeded random walk, `count` ticks per symbol, `interval` seconds apart."""
+    rng = random.Random(seed)
+    prices = {s.upper(): 100.0 * (i + 1) for i, s in enumerate(symbols)}
+    ticks = []
+    for step in range(count):
+        for symbol, price in prices.items():
+            price *= 1 + rng.gauss(0, 0.002)
+            prices[symbol] = price
+            ticks.append({
+                "symbol": symbol,
+                "price": round(price, 4),
+                "volume": round(rng.uniform(0.1, 5.0), 3),
+                "ts": start + step * interval
+            })
+    return _numbered(ticks)
+
+def _numbered(ticks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for i, tick in enumerate(ticks, 1):
+        tick.setdefault("seq", i)
+    ticks.sort(key=lambda t: t["seq"])
+    return ticks
+
+class ReplayServer:
+    """
+    Websocket endpoint at /ws. Each connection gets the ticks after the
+    client's `since` seq for its symbols, paced by the recorded timestamps
+    divided by `speed` (0 = as fast as possible) and batched `batch` records
+    per frame. The connection stays open after the recording ends.
+    """
+
+    def __init__(self, ticks: List[Dict[str, Any]], speed: float = 1.0, batch: int = 1,
+                 host: str = "127.0.0.1", port: int = 8766):
+        self.ticks = ticks
+        self.speed = speed
+        self.batch = max(1, batch)
+        self.host = host
+        self.port = port
+        self.connections: set = set()
+        self.sent = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/ws", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections.add(ws)
+        try:
+            symbols, since = await self._subscription(ws)
+            replay = asyncio.get_running_loop().create_task(self._replay(ws, symbols, since))
+            try:
+                # Drain client frames so close and ping/pong are handled
+                async for message in ws:
+                    if message.type == WSMsgType.ERROR:
+                        break
+            finally:
+                replay.cancel()
+                await asyncio.gather(replay, return_exceptions=True)
+        finally:
+            self.connections.discard(ws)
+        return ws
+
+    async def _subscription(self, ws: web.WebSocketResponse):
+        try:
+            message = await ws.receive(timeout=5)
+            request = json.loads(message.data) if message.type == WSMsgType.TEXT else {}
+        except (asyncio.TimeoutError, ValueError):
+            request = {}
+        symbols = {s.upper() for s in request.get("symbols") or []}
+        return symbols, int(request.get("since") or 0)
+
+    async def _replay(self, ws: web.WebSocketResponse, symbols: set, since: int):
+        pending: List[str] = []
+        previous_ts = None
+        for tick in self.ticks:
+            if tick["seq"] <= since or (symbols and tick["symbol"].upper() not in symbols):
+                continue
+            ts = tick.get("ts")
+            if self.speed > 0 and previous_ts is not None and ts is not None and ts > previous_ts:
+                if pending:
+                    await self._send(ws, pending)
+                await asyncio.sleep((ts - previous_ts) / self.speed)
+            previous_ts = ts if ts is not None else previous_ts
+            pending.append(json.dumps(tick))
+            if len(pending) >= self.batch:
+                await self._send(ws, pending)
+        if pending:
+            await self._send(ws, pending)
+
+    async def _send(self, ws: web.WebSocketResponse, pending: List[str]):
+        await ws.send_str("\n".join(pending) + "\n")
+        self.sent += len(pending)
+        pending.clear()
+
+    async def drop_connections(self):
+        """Close every client connection, as a flaky upstream would."""
+        for ws in list(self.connections):
+            await ws.close()
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return f"ws://{self.host}:{self.port}/ws"
+
+    async def stop(self):
+        await self.drop_connections()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+async def serve(path: Optional[str] = None, symbols: Optional[List[str]] = None, speed: float = 1.0,
+                host: str = "127.0.0.1", port: int = 8766, store: Optional[str] = None):
+    if path:
+        ticks = load_ticks(path)
+    elif store:
+        ticks = store_ticks(store, symbols)
+    else:
+        ticks = synthetic_ticks(symbols or ["BITCOIN", "ETHEREUM", "SOLANA"])
+    server = ReplayServer(ticks, speed=speed, host=host, port=port)
+    url = await server.start()
+    print(f"📼 Replaying {len(ticks)} ticks on {url} at {speed}x")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
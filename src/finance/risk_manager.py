@@ -3,6 +3,9 @@ from typing import Dict, Any
 from dataclasses import dataclass
 from datetime import datetime
 
+from communication.bus import get_event_bus
+from communication.events import Alert
+
 @dataclass
 class RiskProfile:
     max_daily_loss_percent: float
@@ -107,6 +110,7 @@ class RiskManager:
     def _trigger_alert(self, message: str):
         """Send alert (email/SMS) when limits hit."""
         print(f"🚨 RISK ALERT: {message}")
+        get_event_bus().publish_nowait(Alert(source="risk_manager", level="critical", message=message))
         # TODO: Implement actual notifications when APIs added
     
     def get_status(self) -> Dict[str, Any]:
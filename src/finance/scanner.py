@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from models.scheduler import TokenBucket
+from finance.data_engine import FreeDataEngine, MarketData
+
+# Fetches one request's worth of symbols; returns quotes keyed by the symbol as given
+ProviderFetch = Callable[[List[str]], Awaitable[Dict[str, MarketData]]]
+
+@dataclass
+class Provider:
+    name: str
+    fetch: ProviderFetch
+    rate_per_minute: float
+    # Symbols per upstream request
+    batch_size: int = 1
+    # Requests that may go out back to back before the rate applies
+    burst: Optional[float] = None
+    # Quote cache key for a symbol; symbols still fresh there need no request
+    cache_key: Optional[Callable[[str], str]] = None
+
+@dataclass
+class MarketSnapshot:
+    """Everything one sweep saw, in scan priority order."""
+    started_at: float
+    finished_at: float
+    quotes: Dict[Tuple[str, str], MarketData] = field(default_factory=dict)
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+    # Quotes served from the quote cache without a request (listed first)
+    cached: int = 0
+
+    def get(self, provider: str, symbol: str) -> Optional[MarketData]:
+        return self.quotes.get((provider, symbol))
+
+    def for_provider(self, provider: str) -> Dict[str, MarketData]:
+        """Quotes from one provider keyed by the symbol as given."""
+        return {symbol: data for (name, symbol), data in self.quotes.items() if name == provider}
+
+    def assets(self) -> Dict[str, MarketData]:
+        """All quotes keyed by their market symbol (like get_multiple_assets)."""
+        return {data.symbol: data for data in self.quotes.values()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "duration_s": round(self.finished_at - self.started_at, 3),
+            "quotes": len(self.quotes),
+            "cached": self.cached,
+            "failed": len(self.failed),
+            "skipped": len(self.skipped)
+        }
+
+class MarketScanner:
+    """
+    Sweeps a large symbol universe into one consolidated snapshot.
+
+    Symbols are scanned in priority order: held positions first, then
+    symbols whose last 24h move was at least `volatile_change` percent,
+    then everything else, least recently scanned first. Requests to each
+    provider are paced by its own token bucket, at most `max_concurrent`
+    requests are in flight across all providers, and each request gives up
+    after `timeout` seconds. With a `deadline`, requests that could not
+    start in time are skipped and come first in the next sweep. Symbols
+    still fresh in the engine's quote cache are taken from it and spend no
+    request.
+    Share one scanner between co-hosted agents so they share the limits.
+    """
+
+    def __init__(self, engine: Optional[FreeDataEngine] = None, providers: Optional[List[Provider]] = None,
+                 max_concurrent: Optional[int] = None, timeout: Optional[float] = None,
+                 volatile_change: Optional[float] = None):
+        self.engine = engine or FreeDataEngine()
+        self.max_concurrent = max_concurrent if max_concurrent is not None else int(os.getenv("SCANNER_MAX_CONCURRENT", "8"))
+        self.timeout = timeout if timeout is not None else float(os.getenv("SCANNER_TIMEOUT", "10"))
+        self.volatile_change = volatile_change if volatile_change is not None else float(os.getenv("SCANNER_VOLATILE_CHANGE", "5"))
+        if providers is None:
+            providers = [
+                Provider("crypto", self.engine.get_crypto_prices,
+                         rate_per_minute=float(os.getenv("SCANNER_CRYPTO_RPM", "30")),
+                         batch_size=self.engine.batch_size,
+                         cache_key=lambda symbol: f"crypto:{symbol.lower()}"),
+                Provider("stock", self._fetch_stocks,
+                         rate_per_minute=float(os.getenv("SCANNER_STOCK_RPM", "120")),
+                         batch_size=int(os.getenv("SCANNER_STOCK_BATCH", "1")),
+                         cache_key=lambda symbol: f"stock:{symbol.upper()}")
+            ]
+        self.providers: Dict[str, Provider] = {p.name: p for p in providers}
+        self.limiters = {p.name: TokenBucket(p.rate_per_minute, p.burst) for p in providers}
+
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pacing: Dict[str, asyncio.Lock] = {}
+        self._last_scanned: Dict[Tuple[str, str], float] = {}
+        self._last_change: Dict[Tuple[str, str], float] = {}
+        self.stats: Dict[str, Dict[str, float]] = {
+            p.name: {"requests": 0, "errors": 0, "timeouts": 0, "rate_wait_s": 0.0} for p in providers
+        }
+        self.sweeps = 0
+        self.last_snapshot: Optional[MarketSnapshot] = None
+
+    async def _fetch_stocks(self, symbols: List[str]) -> Dict[str, MarketData]:
+        quotes = await asyncio.gather(*[self.engine.get_stock_price(s) for s in symbols])
+        return {symbol: data for symbol, data in zip(symbols, quotes) if data is not None}
+
+    def _priority(self, key: Tuple[str, str], held: set) -> Tuple[int, float, float]:
+        change = abs(self._last_change.get(key, 0.0))
+        if key[1].upper() in held:
+            tier = 0
+        elif change >= self.volatile_change:
+            tier = 1
+        else:
+            tier = 2
+        return tier, self._last_scanned.get(key, float("-inf")), -change
+
+    def _cached(self, universe: Dict[str, List[str]]) -> Dict[Tuple[str, str], MarketData]:
+        cached = {}
+        for name, symbols in universe.items():
+            provider = self.providers.get(name)
+            if provider is None or provider.cache_key is None:
+                continue
+            for symbol in dict.fromkeys(symbols):
+                data = self.engine.quotes.fresh(provider.cache_key(symbol))
+                if data is not None:
+                    cached[(name, symbol)] = data
+        return cached
+
+    def plan(self, universe: Dict[str, List[str]], held: Iterable[str] = ()) -> List[Tuple[str, List[str]]]:
+        """
+        Requests for a sweep as (provider, symbols), most important first.
+        Symbols still fresh in the quote cache are left out.
+        """
+        return self._plan(universe, held, self._cached(universe))
+
+    def _plan(self, universe: Dict[str, List[str]], held: Iterable[str],
+              cached: Dict[Tuple[str, str], MarketData]) -> List[Tuple[str, List[str]]]:
+        held = {s.upper() for s in held}
+        keys = [(name, symbol) for name, symbols in universe.items() if name in self.providers
+                for symbol in dict.fromkeys(symbols) if (name, symbol) not in cached]
+        keys.sort(key=lambda key: self._priority(key, held))
+
+        # Batch within each provider in priority order; a batch ranks by its first symbol
+        open_batches: Dict[str, List[str]] = {}
+        requests: List[Tuple[str, List[str]]] = []
+        for name, symbol in keys:
+            batch = open_batches.get(name)
+            if batch is None:
+                batch = open_batches[name] = []
+                requests.append((name, batch))
+            batch.append(symbol)
+            if len(batch) >= self.providers[name].batch_size:
+                del open_batches[name]
+        return requests
+
+    async def sweep(self, universe: Dict[str, List[str]], held: Iterable[str] = (),
+                    deadline: Optional[float] = None) -> MarketSnapshot:
+        """
+        Scan `universe` ({provider: [symbols]}) once. `deadline` is seconds
+        from now; None waits for every request.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        cached = self._cached(universe)
+        requests = self._plan(universe, held, cached)
+        started_at = time.time()
+        started = time.monotonic()
+        cutoff = started + deadline if deadline is not None else None
+
+        # Tasks are created in priority order; pacing locks and slots are FIFO
+        results = await asyncio.gather(*[self._request(name, symbols, cutoff) for name, symbols in requests])
+
+        snapshot = MarketSnapshot(started_at=started_at, finished_at=time.time(), cached=len(cached))
+        now = time.monotonic()
+        for key, data in cached.items():
+            snapshot.quotes[key] = data
+            self._last_scanned[key] = now
+            self._last_change[key] = data.change_24h or 0.0
+        for (name, symbols), (status, quotes) in zip(requests, results):
+            for symbol in symbols:
+                key = (name, symbol)
+                data = quotes.get(symbol)
+                if data is not None:
+                    snapshot.quotes[key] = data
+                    self._last_scanned[key] = now
+                    self._last_change[key] = data.change_24h or 0.0
+                elif status == "skipped":
+                    snapshot.skipped.append(key)
+                else:
+                    snapshot.failed.append(key)
+        self.sweeps += 1
+        self.last_snapshot = snapshot
+        return snapshot
+
+    async def _request(self, name: str, symbols: List[str], cutoff: Optional[float]) -> Tuple[str, Dict[str, MarketData]]:
+        provider = self.providers[name]
+        stats = self.stats[name]
+        limiter = self.limiters[name]
+
+        pacing = self._pacing.setdefault(name, asyncio.Lock())
+        async with pacing:
+            wait = limiter.wait_time(1)
+            if cutoff is not None and time.monotonic() + wait > cutoff:
+                return "skipped", {}
+            if wait > 0:
+                stats["rate_wait_s"] += wait
+                await asyncio.sleep(wait)
+            await self._slots.acquire()
+            if cutoff is not None and time.monotonic() > cutoff:
+                self._slots.release()
+                return "skipped", {}
+            # Spend the token only once a slot is free, so requests that queued
+            # for a slot never leave in a burst
+            limiter.consume(1)
+
+        try:
+            stats["requests"] += 1
+            return "ok", await asyncio.wait_for(provider.fetch(symbols), self.timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"Scan of {len(symbols)} {name} symbols failed: {e}")
+        finally:
+            self._slots.release()
+        return "failed", {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sweeps": self.sweeps,
+            "max_concurrent": self.max_concurrent,
+            "providers": {name: {**stats, "rate_wait_s": round(stats["rate_wait_s"], 3)}
+                          for name, stats in self.stats.items()},
+            "last_sweep": self.last_snapshot.get_stats() if self.last_snapshot is not None else None
+        }
+
+def load_universe(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Symbol universe from a JSON file ({"crypto": [...], "stock": [...]}),
+    SCANNER_UNIVERSE_PATH by default. Empty when no file is configured.
+    """
+    path = path or os.getenv("SCANNER_UNIVERSE_PATH")
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        universe = json.load(f)
+    return {name: [str(s) for s in symbols] for name, symbols in universe.items()}
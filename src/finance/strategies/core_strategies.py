@@ -35,18 +35,15 @@ class StrategyEngine:
         }
         self.price_history: Dict[str, List[float]] = {}
     
-    async def analyze(self, symbol: str, current_price: float, market_data: Dict) -> List[Signal]:
+    async def analyze(self, symbol: str, current_price: float, market_data: Dict,
+                      record: bool = True) -> List[Signal]:
         """
         Run all strategies on an asset, return signals.
+        Pass record=False when the price is already in the history
+        (e.g. the symbol is streaming ticks through on_tick).
         """
-        # Update price history
-        if symbol not in self.price_history:
-            self.price_history[symbol] = []
-        self.price_history[symbol].append(current_price)
-        
-        # Keep last 100 prices
-        if len(self.price_history[symbol]) > 100:
-            self.price_history[symbol] = self.price_history[symbol][-100:]
+        if record:
+            self.record_price(symbol, current_price)
         
         signals = []
         
@@ -57,6 +54,34 @@ class StrategyEngine:
         
         return signals
     
+    def record_price(self, symbol: str, price: float):
+        history = self.price_history.setdefault(symbol, [])
+        history.append(price)
+        
+        # Keep last 100 prices
+        if len(history) > 100:
+            del history[:-100]
+    
+    def warm_up(self, store, symbols: Optional[List[str]] = None) -> int:
+        """
+        Seed price history from a TickStore so strategies can fire on
+        the first cycle after a restart. Returns the prices loaded.
+        """
+        loaded = 0
+        for symbol in symbols if symbols is not None else store.symbols():
+            prices = store.last(symbol, 100).prices
+            if len(prices):
+                self.price_history[symbol] = prices.tolist()
+                loaded += len(prices)
+        return loaded
+    
+    async def on_tick(self, symbol: str, price: float, volume: float = 0.0) -> List[Signal]:
+        """
+        Streaming entry point: record a pushed tick and evaluate it
+        right away instead of waiting for the next polling cycle.
+        """
+        return await self.analyze(symbol, price, {"volume": volume})
+    
     async def _mean_reversion(self, symbol: str, price: float, data: Dict) -> Optional[Signal]:
         """
         Buy when price below average, sell when above.
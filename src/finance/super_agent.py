@@ -1,14 +1,24 @@
 ﻿import os
 import asyncio
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 
 from core.agent import AIChatbot
+from models.scheduler import Priority
+from models.router import TaskClass
 from finance.data_engine import FreeDataEngine
 from finance.risk_manager import RiskManager
 from finance.strategies.core_strategies import StrategyEngine, Signal
+from finance.commentary import SignalCommentator, SignalDecision
+from finance.price_feed import PriceFeed, WebSocketPriceFeed
+from finance.scanner import MarketScanner, load_universe
+from mycelium.constitution import RootSystem
+from core.control import ControlPlane
+from communication.events import SignalEvent, TradeEvent, Tick
+from tools.registry import Tool
+from tools.finance_tools import build_finance_tools
 
 load_dotenv()
 
@@ -18,15 +28,44 @@ class FinancialSuperAgent:
     Runs autonomously within YOUR risk limits.
     """
     
-    def __init__(self):
+    def __init__(self, root: Optional[RootSystem] = None, data_engine: Optional[FreeDataEngine] = None,
+                 price_feed: Optional[PriceFeed] = None, scanner: Optional[MarketScanner] = None):
+        # Pass the same engine, scanner and root to co-hosted agents so they share quotes, rate limits and network state
+        self.data_engine = data_engine or FreeDataEngine()
+        self.scanner = scanner or MarketScanner(self.data_engine)
+        self.bus = self.data_engine.bus
+        self.risk_manager = RiskManager()
+        
+        # The assistant answers from live quotes and risk state via tools
         self.chat_agent = AIChatbot(
             agent_id="financial_assistant",
-            system_prompt="You are a financial analysis AI. Provide market insights and explain trading decisions."
+            system_prompt=(
+                "You are a financial analysis AI. Provide market insights and explain trading decisions. "
+                "Use the available tools for prices, risk limits and network state instead of guessing."
+            ),
+            task=TaskClass.ANALYSIS,
+            tools=build_finance_tools(self.data_engine, self.risk_manager, root)
         )
         
-        self.data_engine = FreeDataEngine()
-        self.risk_manager = RiskManager()
+        # Each cycle's decisions are explained in one background request
+        self.commentator = SignalCommentator()
+        self.chat_agent.tools.register(Tool(
+            name="get_trade_explanations",
+            description="Explanations of the most recent executed and blocked trading signals, newest last.",
+            handler=self.commentator.latest,
+            parameters={
+                "type": "object",
+                "properties": {"limit": {"type": "integer"}, "symbol": {"type": "string"}}
+            },
+            timeout=2
+        ))
+        
         self.strategy_engine = StrategyEngine()
+        self.tick_store = self.data_engine.tick_store
+        if self.tick_store is not None:
+            loaded = self.strategy_engine.warm_up(self.tick_store)
+            if loaded:
+                print(f"📈 Warmed up strategies with {loaded} stored prices")
         
         # Portfolio tracking (paper trading mode default)
         self.portfolio = {
@@ -35,9 +74,19 @@ class FinancialSuperAgent:
             "history": []
         }
         
-        # Watchlists
-        self.crypto_watchlist = ["bitcoin", "ethereum", "solana"]
-        self.stock_watchlist = ["AAPL", "MSFT", "GOOGL", "TSLA"]
+        # Watchlists (SCANNER_UNIVERSE_PATH widens them to a full universe)
+        universe = load_universe()
+        self.crypto_watchlist = universe.get("crypto", ["bitcoin", "ethereum", "solana"])
+        self.stock_watchlist = universe.get("stock", ["AAPL", "MSFT", "GOOGL", "TSLA"])
+        
+        # Optional push feed (PRICE_FEED_URL): ticks reach the strategies as they arrive
+        self.price_feed: Optional[PriceFeed] = None
+        self._stream_actions: Dict[tuple, str] = {}
+        feed_url = os.getenv("PRICE_FEED_URL")
+        if price_feed is None and feed_url:
+            price_feed = WebSocketPriceFeed(feed_url, self.crypto_watchlist, bus=self.bus)
+        if price_feed is not None:
+            self.attach_price_feed(price_feed)
         
         self.running = False
     
@@ -52,11 +101,14 @@ class FinancialSuperAgent:
         """
         print(f"\n🔍 Analysis Cycle: {datetime.now().strftime('%H:%M:%S')}")
         
-        # Fetch data
-        assets = await self.data_engine.get_multiple_assets(
-            self.crypto_watchlist,
-            self.stock_watchlist
+        # Fetch data: one sweep, held positions and big movers first
+        snapshot = await self.scanner.sweep(
+            {"crypto": self.crypto_watchlist, "stock": self.stock_watchlist},
+            held=self.portfolio["positions"].keys()
         )
+        assets = snapshot.assets()
+        if snapshot.failed:
+            print(f"  ⚠️ No quote for {len(snapshot.failed)} symbols")
         
         all_signals = []
         
@@ -64,8 +116,10 @@ class FinancialSuperAgent:
             print(f"  📊 {symbol}: ${data.price:.2f} ({data.change_24h:+.2f}%)")
             
             # Generate signals
+            # Streaming symbols already have this price history from the feed
+            streaming = self.price_feed is not None and self.price_feed.is_live(symbol)
             signals = await self.strategy_engine.analyze(
-                symbol, data.price, {"volume": data.volume}
+                symbol, data.price, {"volume": data.volume}, record=not streaming
             )
             all_signals.extend(signals)
         
@@ -73,18 +127,26 @@ class FinancialSuperAgent:
         all_signals.sort(key=lambda x: x.confidence, reverse=True)
         
         # Execute top signals within risk limits
+        decisions = []
         for signal in all_signals[:3]:  # Top 3 only
-            await self._evaluate_signal(signal)
+            decisions.append(await self._evaluate_signal(signal))
+        
+        if decisions:
+            self.commentator.submit(decisions)
         
         # Log status
         self._log_status()
     
-    async def _evaluate_signal(self, signal: Signal):
+    async def _evaluate_signal(self, signal: Signal) -> SignalDecision:
         """Check signal against risk manager before executing."""
         print(f"\n🎯 Signal: {signal.action.upper()} {signal.symbol}")
         print(f"   Strategy: {signal.strategy.value}")
         print(f"   Confidence: {signal.confidence:.2%}")
         print(f"   Expected Return: {signal.expected_return:.2%}")
+        await self.bus.publish(SignalEvent(
+            symbol=signal.symbol, action=signal.action, strategy=signal.strategy.value,
+            confidence=signal.confidence, expected_return=signal.expected_return, source="finance"
+        ))
         
         # Check with risk manager
         portfolio_value = self._calculate_portfolio_value()
@@ -94,10 +156,11 @@ class FinancialSuperAgent:
         
         if not risk_check["allowed"]:
             print(f"   🛡️ BLOCKED: {risk_check['reason']}")
-            return
+            return SignalDecision(signal, executed=False, reason=risk_check["reason"])
         
         # Execute paper trade
         await self._execute_paper_trade(signal, trade_size)
+        return SignalDecision(signal, executed=True)
     
     async def _execute_paper_trade(self, signal: Signal, size: float):
         """Execute paper trade (simulated, no real money)."""
@@ -120,6 +183,7 @@ class FinancialSuperAgent:
         }
         
         self.portfolio["history"].append(trade_record)
+        await self.bus.publish(TradeEvent(agent="finance", symbol=signal.symbol, action=signal.action, size=size))
         
         # Update positions (simplified)
         if signal.action == "buy":
@@ -161,16 +225,64 @@ class FinancialSuperAgent:
         with open("data/performance/status.json", "w") as f:
             json.dump(status, f, indent=2)
     
+    def attach_price_feed(self, feed: PriceFeed):
+        """Stream `feed` into the strategies; started by run_autonomous_mode."""
+        self.price_feed = feed
+        feed.add_sink(self._on_tick)
+        # Live symbols are stored from the stream; polled quotes would arrive out of order
+        self.data_engine.is_streaming = feed.is_live
+    
+    async def _on_tick(self, tick: Tick):
+        """
+        Evaluate each streamed tick immediately. Signals are published on
+        the bus when a strategy's call for a symbol changes; trades are
+        still decided once per analysis cycle.
+        """
+        if self.tick_store is not None:
+            self.tick_store.append_tick(tick)
+        for signal in await self.strategy_engine.on_tick(tick.symbol, tick.price, tick.volume):
+            key = (signal.symbol, signal.strategy)
+            if self._stream_actions.get(key) == signal.action:
+                continue
+            self._stream_actions[key] = signal.action
+            await self.bus.publish(SignalEvent(
+                symbol=signal.symbol, action=signal.action, strategy=signal.strategy.value,
+                confidence=signal.confidence, expected_return=signal.expected_return,
+                source="finance.stream"
+            ))
+    
     async def chat(self, message: str) -> str:
         """Talk to the financial assistant."""
-        result = await self.chat_agent.process(message)
+        result = await self.chat_agent.process(message, priority=Priority.INTERACTIVE)
         return result["response"] if result["success"] else "Error processing request"
     
-    async def run_autonomous_mode(self, interval_minutes: int = 60):
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "portfolio_value": self._calculate_portfolio_value(),
+            "cash": self.portfolio["cash"],
+            "positions": len(self.portfolio["positions"]),
+            "trades": len(self.portfolio["history"]),
+            "risk_status": self.risk_manager.get_status(),
+            "quote_cache": self.data_engine.quotes.get_stats(),
+            "price_feed": self.price_feed.get_stats() if self.price_feed is not None else None,
+            "tick_store": self.tick_store.get_stats() if self.tick_store is not None else None,
+            "scanner": self.scanner.get_stats()
+        }
+    
+    def reset_risk(self) -> Dict[str, Any]:
+        self.risk_manager.manual_reset()
+        return self.risk_manager.get_status()
+    
+    async def run_autonomous_mode(self, interval_minutes: int = 60, control: Optional[ControlPlane] = None):
         """
         'Set it and forget it' mode.
-        Runs analysis every X minutes automatically.
+        Runs analysis every X minutes automatically; `control` lets an
+        operator pause, resume, trigger a cycle or reset risk meanwhile.
         """
+        control = control or ControlPlane("finance", port=-1)
+        control.set_status(self.get_status)
+        control.register("reset-risk", self.reset_risk, "Clear the circuit breaker and daily loss limit")
+        
         print("🤖 AUTONOMOUS MODE ACTIVATED")
         print(f"   Analyzing every {interval_minutes} minutes")
         print(f"   Risk limits: {self.risk_manager.profile.max_daily_loss_percent}% daily loss max")
@@ -178,16 +290,29 @@ class FinancialSuperAgent:
         print("   Press Ctrl+C to stop\n")
         
         self.running = True
+        feed_task = None
+        if self.price_feed is not None:
+            print(f"   Streaming ticks for {', '.join(self.price_feed.symbols)}\n")
+            feed_task = asyncio.get_running_loop().create_task(self.price_feed.run())
         
         try:
             while self.running:
+                await control.wait_until_running()
                 await self.run_analysis_cycle()
+                control.cycle_done()
                 print(f"\n⏰ Next analysis in {interval_minutes} minutes...")
-                print("   (Ctrl+C to stop, or type 'status' in another window)")
-                await asyncio.sleep(interval_minutes * 60)
+                print("   (Ctrl+C to stop; type status, pause, resume, reset-risk or cycle-now)")
+                await control.sleep(interval_minutes * 60)
         except KeyboardInterrupt:
             print("\n\n🛑 Autonomous mode stopped")
             self._generate_report()
+        finally:
+            if feed_task is not None:
+                await self.price_feed.stop()
+                feed_task.cancel()
+                await asyncio.gather(feed_task, return_exceptions=True)
+            if self.tick_store is not None:
+                self.tick_store.flush()
     
     def _generate_report(self):
         """Generate daily performance report."""
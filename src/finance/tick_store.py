@@ -0,0 +1,276 @@
+import os
+import re
+import json
+import time
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from core.mmap_column import MappedColumn
+from communication.events import Tick
+
+class TickWindow(NamedTuple):
+    """Zero-copy views into one symbol's columns (valid until its next compaction)."""
+    timestamps: np.ndarray
+    prices: np.ndarray
+    volumes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+class _SymbolTicks:
+    """
+    One symbol: three append-only memory-mapped float64 columns. The
+    timestamp column is non-decreasing, so it is its own time index
+    (binary search). Timestamps are written last and a zero timestamp
+    marks unused capacity, so a crash mid-append leaves no partial row.
+    Compaction writes a new generation of files and switches meta.json to
+    it; readers holding views of the old generation are unaffected.
+    """
+
+    COLUMNS = ("ts", "price", "volume")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.generation = self._read_meta().get("generation", 0)
+        self.columns = self._open(self.generation)
+        filled = np.flatnonzero(self.columns["ts"].data)
+        self.rows = int(filled[-1]) + 1 if len(filled) else 0
+        self.out_of_order = 0
+        self._remove_other_generations()
+
+    def _path(self, column: str, generation: int) -> str:
+        return os.path.join(self.directory, f"{column}.{generation}.f64")
+
+    def _open(self, generation: int, initial_rows: int = 1024) -> Dict[str, MappedColumn]:
+        return {c: MappedColumn(self._path(c, generation), np.float64, initial_rows=initial_rows) for c in self.COLUMNS}
+
+    @property
+    def last_timestamp(self) -> float:
+        return float(self.columns["ts"].data[self.rows - 1]) if self.rows else 0.0
+
+    def append(self, timestamp: float, price: float, volume: float) -> bool:
+        if timestamp <= 0 or timestamp < self.last_timestamp:
+            self.out_of_order += 1
+            return False
+        row = self.rows
+        for column in self.columns.values():
+            column.ensure(row + 1)
+        self.columns["price"].data[row] = price
+        self.columns["volume"].data[row] = volume
+        self.columns["ts"].data[row] = timestamp
+        self.rows = row + 1
+        return True
+
+    def window(self, start: Optional[float], end: Optional[float]) -> TickWindow:
+        ts = self.columns["ts"].data[:self.rows]
+        lo = int(np.searchsorted(ts, start, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(ts, end, side="left")) if end is not None else self.rows
+        return self._slice(lo, max(lo, hi))
+
+    def last(self, n: int) -> TickWindow:
+        return self._slice(max(0, self.rows - n), self.rows)
+
+    def _slice(self, lo: int, hi: int) -> TickWindow:
+        return TickWindow(*(self.columns[c].data[lo:hi] for c in self.COLUMNS))
+
+    def build_generation(self, rows: int, raw_after: float, keep_after: float, resolution: float):
+        """
+        New generation from the first `rows` rows: drop ticks before
+        `keep_after`, bucket ticks before `raw_after` to `resolution`
+        seconds (last price, summed volume). Runs in a worker thread, so it
+        only reads a fixed range of the current columns. None if unchanged.
+        """
+        ts = np.asarray(self.columns["ts"].data[:rows])
+        price = np.asarray(self.columns["price"].data[:rows])
+        volume = np.asarray(self.columns["volume"].data[:rows])
+
+        lo = int(np.searchsorted(ts, keep_after, side="left"))
+        mid = max(lo, int(np.searchsorted(ts, raw_after, side="left")))
+        old_ts = ts[lo:mid]
+        buckets = np.floor(old_ts / resolution)
+        # Last row of each bucket; ts is sorted, so buckets are contiguous
+        ends = np.flatnonzero(np.append(np.diff(buckets) != 0, True)) if len(old_ts) else np.empty(0, dtype=np.int64)
+        if lo == 0 and len(ends) == len(old_ts):
+            return None
+        starts = np.insert(ends[:-1] + 1, 0, 0) if len(ends) else ends
+        bucket_volume = np.add.reduceat(volume[lo:mid], starts) if len(ends) else np.empty(0)
+
+        new_ts = np.concatenate([old_ts[ends], ts[mid:]])
+        new_price = np.concatenate([price[lo:mid][ends], price[mid:]])
+        new_volume = np.concatenate([bucket_volume, volume[mid:]])
+
+        generation = self.generation + 1
+        for column in self.COLUMNS:
+            path = self._path(column, generation)
+            if os.path.exists(path):
+                os.remove(path)
+        columns = self._open(generation, initial_rows=max(1024, len(new_ts) + 1024))
+        columns["price"].data[:len(new_ts)] = new_price
+        columns["volume"].data[:len(new_ts)] = new_volume
+        columns["ts"].data[:len(new_ts)] = new_ts
+        return generation, columns, len(new_ts)
+
+    def install(self, built, rows: int):
+        """Switch to a built generation, carrying over rows appended since `rows`."""
+        generation, columns, count = built
+        tail = self.rows - rows
+        for name, column in columns.items():
+            column.ensure(count + tail)
+            column.data[count:count + tail] = self.columns[name].data[rows:self.rows]
+            column.data.flush()
+        self.columns, self.generation, self.rows = columns, generation, count + tail
+        self._write_meta()
+        self._remove_other_generations()
+
+    def _remove_other_generations(self):
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(r"(\w+)\.(\d+)\.f64", name)
+            if match and int(match.group(2)) != self.generation:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    # Still mapped elsewhere (Windows); removed on a later open
+                    pass
+
+    def _read_meta(self) -> Dict[str, Any]:
+        path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self):
+        path = os.path.join(self.directory, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"generation": self.generation}, f)
+        os.replace(path + ".tmp", path)
+
+    def flush(self):
+        for column in self.columns.values():
+            column.data.flush()
+
+class TickStore:
+    """
+    Persistent per-symbol tick history (timestamp, price, volume) so
+    strategies warm up from disk after a restart instead of from scratch.
+    Appends go straight into memory-mapped columns; reads are zero-copy
+    views found by binary search on time. Compaction (at most every
+    `compact_interval` seconds) keeps full-resolution ticks for
+    `raw_window` seconds, buckets older ticks to `resolution` seconds and
+    drops anything older than `retention` (0 keeps everything).
+    """
+
+    def __init__(self, directory: Optional[str] = None, compact_interval: Optional[float] = None,
+                 raw_window: Optional[float] = None, resolution: Optional[float] = None,
+                 retention: Optional[float] = None):
+        self.directory = directory or os.getenv("TICK_STORE_PATH", "data/ticks")
+        self.compact_interval = compact_interval if compact_interval is not None else float(os.getenv("TICK_STORE_COMPACT_INTERVAL", "3600"))
+        self.raw_window = raw_window if raw_window is not None else float(os.getenv("TICK_STORE_RAW_WINDOW", "86400"))
+        self.resolution = resolution if resolution is not None else float(os.getenv("TICK_STORE_RESOLUTION", "60"))
+        self.retention = retention if retention is not None else float(os.getenv("TICK_STORE_RETENTION", "2592000"))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._series: Dict[str, _SymbolTicks] = {}
+        self._last_compaction = time.monotonic()
+        self._compacting: Optional[asyncio.Task] = None
+        self.appends = 0
+        self.compactions = 0
+        self.rows_compacted = 0
+
+    def _key(self, symbol: str) -> str:
+        return re.sub(r"[^\w.-]", "_", symbol.upper())
+
+    def _get(self, symbol: str, create: bool = False) -> Optional[_SymbolTicks]:
+        key = self._key(symbol)
+        series = self._series.get(key)
+        if series is None and (create or os.path.isdir(os.path.join(self.directory, key))):
+            series = self._series[key] = _SymbolTicks(os.path.join(self.directory, key))
+        return series
+
+    def symbols(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isdir(os.path.join(self.directory, name)))
+
+    def __len__(self) -> int:
+        return sum(self._get(symbol).rows for symbol in self.symbols())
+
+    def append(self, symbol: str, price: float, volume: float = 0.0, timestamp: Optional[float] = None) -> bool:
+        """Store one tick; ticks older than the symbol's latest are rejected."""
+        stored = self._get(symbol, create=True).append(timestamp or time.time(), price, volume)
+        if stored:
+            self.appends += 1
+            self._maybe_compact()
+        return stored
+
+    def append_tick(self, tick: Tick) -> bool:
+        return self.append(tick.symbol, tick.price, tick.volume, tick.timestamp)
+
+    def window(self, symbol: str, start: Optional[float] = None, end: Optional[float] = None) -> TickWindow:
+        """Ticks with start <= timestamp < end."""
+        series = self._get(symbol)
+        if series is None:
+            return TickWindow(np.empty(0), np.empty(0), np.empty(0))
+        return series.window(start, end)
+
+    def last(self, symbol: str, n: int) -> TickWindow:
+        series = self._get(symbol)
+        if series is None:
+            return TickWindow(np.empty(0), np.empty(0), np.empty(0))
+        return series.last(n)
+
+    def _maybe_compact(self):
+        if time.monotonic() - self._last_compaction < self.compact_interval:
+            return
+        if self._compacting is not None and not self._compacting.done():
+            return
+        self._last_compaction = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._compacting = loop.create_task(self.compact())
+
+    async def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Compact every symbol off the event loop; returns rows removed per symbol."""
+        now = now if now is not None else time.time()
+        keep_after = now - self.retention if self.retention > 0 else 0.0
+        removed = {}
+        for symbol in self.symbols():
+            series = self._get(symbol)
+            rows = series.rows
+            built = await asyncio.to_thread(series.build_generation, rows, now - self.raw_window,
+                                            keep_after, self.resolution)
+            if built is None:
+                continue
+            series.install(built, rows)
+            removed[symbol] = rows - built[2]
+            self.rows_compacted += removed[symbol]
+        self.compactions += 1
+        return removed
+
+    def flush(self):
+        for series in self._series.values():
+            series.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "symbols": len(self.symbols()),
+            "rows": {key: series.rows for key, series in self._series.items()},
+            "appends": self.appends,
+            "out_of_order": sum(series.out_of_order for series in self._series.values()),
+            "compactions": self.compactions,
+            "rows_compacted": self.rows_compacted
+        }
+
+
+_shared_store: Optional[TickStore] = None
+
+def get_tick_store() -> TickStore:
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = TickStore()
+    return _shared_store
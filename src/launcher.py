@@ -0,0 +1,221 @@
+"""
+Atomic Agents launcher.
+
+One entry point for every agent. Nothing beyond the standard library is
+imported until a subcommand has been chosen, and then only that
+subsystem's modules load, so `--help` and a restart of a small agent
+don't pay for aiohttp and the whole package graph. Run with src on
+PYTHONPATH:
+
+    python -m launcher finance --interval 60
+    python -m launcher mycelium
+    python -m launcher trend-hunter --interval 6
+    python -m launcher blitz
+    python -m launcher replay-feed    # local websocket tick replay
+    python -m launcher stack          # all three agents in one process
+
+The autonomous agents accept status, pause, resume, cycle-now (and
+reset-risk where it applies) on stdin while they run. The local control
+port (CONTROL_PORT, default 8765) answers status and help; other
+commands need `auth <CONTROL_TOKEN>` first on the connection.
+"""
+
+import sys
+import argparse
+from typing import Any, Callable, Dict, List, Optional
+
+def _load_env():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+def _control(name: str, args: argparse.Namespace):
+    from core.control import ControlPlane
+    return ControlPlane(name, port=args.control_port, console=sys.stdin is not None and sys.stdin.isatty())
+
+def _close_pool():
+    # Only close the shared LLM pool if this subsystem actually opened it
+    pool_module = sys.modules.get("models.client_pool")
+    if pool_module is not None:
+        return pool_module.close_client_pool()
+    return None
+
+async def _run_finance(args: argparse.Namespace):
+    from finance.super_agent import FinancialSuperAgent
+    agent = FinancialSuperAgent()
+    if args.feed:
+        from finance.price_feed import WebSocketPriceFeed
+        agent.attach_price_feed(WebSocketPriceFeed(args.feed, agent.crypto_watchlist, bus=agent.bus))
+    control = _control("finance", args)
+    await control.start()
+    try:
+        await agent.run_autonomous_mode(interval_minutes=args.interval, control=control)
+    finally:
+        await control.stop()
+        await agent.commentator.drain()
+        closing = _close_pool()
+        if closing is not None:
+            await closing
+
+async def _run_mycelium(args: argparse.Namespace):
+    from mycelium.constitution import RootSystem
+    from mycelium.execution_mat import ExecutionMycelium
+    control = _control("mycelium", args)
+    await control.start()
+    try:
+        await ExecutionMycelium(RootSystem()).run_autonomous_cycles(interval_minutes=args.interval, control=control)
+    finally:
+        await control.stop()
+
+async def _run_trend_hunter(args: argparse.Namespace):
+    from content.trend_hunter import TrendHunterAgent
+    control = _control("trend-hunter", args)
+    await control.start()
+    try:
+        await TrendHunterAgent().run_autonomous(interval_hours=args.interval, control=control)
+    finally:
+        await control.stop()
+
+async def _run_stack(args: argparse.Namespace):
+    from core.supervisor import Supervisor, AgentSpec
+    from finance.data_engine import FreeDataEngine
+    from finance.scanner import MarketScanner
+    from finance.super_agent import FinancialSuperAgent
+    from mycelium.constitution import RootSystem
+    from mycelium.execution_mat import ExecutionMycelium
+    from content.trend_hunter import TrendHunterAgent
+    from core.safety_metrics import get_safety_metrics
+
+    # One data engine, scanner and root for the whole stack
+    engine = FreeDataEngine()
+    scanner = MarketScanner(engine)
+    root = RootSystem()
+    finance = FinancialSuperAgent(root=root, data_engine=engine, scanner=scanner)
+    mycelium = ExecutionMycelium(root, engine, scanner)
+    hunter = TrendHunterAgent(root=root)
+
+    supervisor = Supervisor(max_concurrent=args.max_concurrent, port=args.control_port,
+                            console=sys.stdin is not None and sys.stdin.isatty())
+    supervisor.add(AgentSpec(
+        "finance", lambda control: finance.run_autonomous_mode(args.finance_interval, control),
+        cpu_budget=args.cpu_budget, on_shutdown=finance.commentator.drain
+    ))
+    supervisor.add(AgentSpec(
+        "mycelium", lambda control: mycelium.run_autonomous_cycles(args.mycelium_interval, control),
+        cpu_budget=args.cpu_budget
+    ))
+    supervisor.add(AgentSpec(
+        "trend-hunter", lambda control: hunter.run_autonomous(args.trend_interval, control),
+        cpu_budget=args.cpu_budget
+    ))
+    try:
+        await supervisor.run()
+    finally:
+        await get_safety_metrics().flush()
+        closing = _close_pool()
+        if closing is not None:
+            await closing
+
+async def _run_replay_feed(args: argparse.Namespace):
+    from finance.replay_server import serve
+    await serve(args.file, args.symbols, speed=args.speed, host=args.host, port=args.port, store=args.store)
+
+async def _run_blitz(args: argparse.Namespace):
+    from main import main as blitz_main
+    await blitz_main()
+
+# name -> module it loads, help, default interval and unit, extra options, runner
+SUBSYSTEMS: Dict[str, Dict[str, Any]] = {
+    "finance": {
+        "module": "finance.super_agent",
+        "help": "Financial super agent in autonomous mode",
+        "interval": 60, "unit": "minutes",
+        "options": [
+            ("--feed", {"default": None, "help": "websocket price feed URL (default PRICE_FEED_URL)"})
+        ],
+        "run": _run_finance
+    },
+    "mycelium": {
+        "module": "mycelium.execution_mat",
+        "help": "Mycelium execution mat with crypto and stock hyphae",
+        "interval": 30, "unit": "minutes",
+        "run": _run_mycelium
+    },
+    "trend-hunter": {
+        "module": "content.trend_hunter",
+        "help": "Trend hunter affiliate content agent",
+        "interval": 6, "unit": "hours",
+        "run": _run_trend_hunter
+    },
+    "blitz": {
+        "module": "main",
+        "help": "Interactive Gumroad product blitz CLI",
+        "interval": None, "unit": None,
+        "control": False,
+        "run": _run_blitz
+    },
+    "replay-feed": {
+        "module": "finance.replay_server",
+        "help": "Local websocket server replaying recorded ticks for the price feed",
+        "interval": None, "unit": None,
+        "control": False,
+        "options": [
+            ("--file", {"default": None, "help": "JSONL tick recording (default: synthetic random walk)"}),
+            ("--store", {"default": None, "help": "replay a tick store directory (e.g. data/ticks)"}),
+            ("--symbols", {"nargs": "+", "default": None, "help": "symbols to replay or to generate"}),
+            ("--speed", {"type": float, "default": 1.0, "help": "replay speed multiplier, 0 = unpaced"}),
+            ("--host", {"default": "127.0.0.1"}),
+            ("--port", {"type": int, "default": 8766})
+        ],
+        "run": _run_replay_feed
+    },
+    "stack": {
+        "module": "core.supervisor",
+        "help": "Finance, mycelium and trend-hunter agents supervised in one process",
+        "interval": None, "unit": None,
+        "options": [
+            ("--finance-interval", {"type": int, "default": 60, "help": "minutes between finance cycles"}),
+            ("--mycelium-interval", {"type": int, "default": 30, "help": "minutes between mycelium cycles"}),
+            ("--trend-interval", {"type": int, "default": 6, "help": "hours between trend hunts"}),
+            ("--max-concurrent", {"type": int, "default": None,
+                                  "help": "agents allowed to run a cycle at once (default SUPERVISOR_MAX_CONCURRENT or 2)"}),
+            ("--cpu-budget", {"type": float, "default": None,
+                              "help": "CPU seconds per agent per SUPERVISOR_CPU_WINDOW, counting only the agent's own task (default unlimited)"})
+        ],
+        "run": _run_stack
+    }
+}
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="launcher", description="Start an Atomic Agents subsystem")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+    for name, spec in SUBSYSTEMS.items():
+        sub = commands.add_parser(name, help=spec["help"], description=spec["help"])
+        if spec["interval"] is not None:
+            sub.add_argument("--interval", type=int, default=spec["interval"],
+                             help=f"{spec['unit']} between cycles (default {spec['interval']})")
+        for flag, options in spec.get("options", []):
+            sub.add_argument(flag, **options)
+        if spec.get("control", True):
+            sub.add_argument("--control-port", type=int, default=None,
+                             help="Local control port (default CONTROL_PORT or 8765; -1 disables)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    _load_env()
+
+    import asyncio
+    runner: Callable = SUBSYSTEMS[args.command]["run"]
+    try:
+        asyncio.run(runner(args))
+    except KeyboardInterrupt:
+        print(f"\n{args.command} stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -79,7 +79,8 @@ async def main():
     print("\n")
     
     while True:
-        cmd = input("Blitz: ").strip()
+        # Read on a worker thread so the event loop keeps running
+        cmd = (await asyncio.to_thread(input, "Blitz: ")).strip()
         
         if cmd == 'quit':
             break
@@ -1,63 +1,414 @@
 ﻿import os
+import json
+import time
 import asyncio
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, List, Optional, TYPE_CHECKING
+from dataclasses import dataclass, field
 import aiohttp
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+from models.scheduler import Priority, estimate_tokens
+from models.endpoints import Endpoint, EndpointPool, UpstreamError, RETRYABLE_STATUSES, parse_retry_after
+from models.router import ModelRouter, TaskClass
+
+if TYPE_CHECKING:
+    from models.client_pool import ClientPool
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    # Raw JSON string, exactly as the model produced it
+    arguments: str
 
 @dataclass
 class Message:
     role: str
     content: str
+    # Assistant turns that call tools, and the "tool" replies to them
+    tool_calls: Optional[List[ToolCall]] = None
+    tool_call_id: Optional[str] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {"role": self.role, "content": self.content}
+        if self.tool_calls:
+            entry["tool_calls"] = [
+                {"id": c.id, "type": "function", "function": {"name": c.name, "arguments": c.arguments}}
+                for c in self.tool_calls
+            ]
+        if self.tool_call_id is not None:
+            entry["tool_call_id"] = self.tool_call_id
+        return entry
 
 @dataclass
 class CompletionResponse:
     content: str
     usage: Dict
     model: str
+    tool_calls: List[ToolCall] = field(default_factory=list)
 
 class CerebrasClient:
-    def __init__(self):
+    def __init__(self, pool: Optional["ClientPool"] = None):
         self.api_key = os.getenv("API_KEY")
-        self.base_url = os.getenv("BASE_URL", "https://api.cerebras.ai/v1")
-        self.model = os.getenv("MODEL", "llama-3.3-70b")
+        self.endpoints = EndpointPool.from_env()
+        self.base_url = self.endpoints.endpoints[0].url
         self.max_tokens = int(os.getenv("MAX_TOKENS", "4096"))
         self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
         
+        self.max_attempts = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+        self.max_retry_wait = float(os.getenv("LLM_MAX_RETRY_WAIT", "10"))
+        # Hedging: if the first attempt is slower than the endpoint's p95,
+        # fire a second one at the next endpoint and keep whichever wins
+        self.hedge = os.getenv("LLM_HEDGE", "false").lower() == "true"
+        self.hedge_delay = float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+        self.hedge_min_delay = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        
         if not self.api_key:
             raise ValueError("API_KEY not set in .env file")
         
+        self.headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        
+        # With a pool, connections are borrowed from the shared session
+        # and this client never opens or closes one itself.
+        self.pool = pool
+        self.scheduler = pool.scheduler if pool is not None else None
+        self.cache = pool.cache if pool is not None else None
+        self.router = pool.router if pool is not None else ModelRouter.from_env()
+        self.meter = pool.meter if pool is not None else None
+        self.model = self.router.default_model
         self.session: Optional[aiohttp.ClientSession] = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
-            timeout=aiohttp.ClientTimeout(total=60)
-        )
+        if self.pool is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
         return self
     
     async def __aexit__(self, *args):
         if self.session:
             await self.session.close()
+            self.session = None
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    async def complete(self, messages: List[Message]) -> CompletionResponse:
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.pool is not None:
+            return self.pool.session()
         if not self.session:
             raise RuntimeError("Client not initialized")
+        return self.session
+    
+    async def complete(self, messages: List[Message], priority: Priority = Priority.NORMAL,
+                       use_cache: bool = True, task: TaskClass = TaskClass.CHAT,
+                       model: Optional[str] = None, agent_id: Optional[str] = None,
+                       tools: Optional[List[Dict[str, Any]]] = None) -> CompletionResponse:
+        """
+        `task` lets the router pick the model; an explicit `model` skips
+        routing and fallback entirely. Usage is metered against `agent_id`.
+        With `tools` (function schemas) the reply may carry tool_calls.
+        """
+        session = self._get_session()
+        candidates = [model] if model else [spec.name for spec in self.router.candidates(task)]
+        payload = self._build_payload(messages, candidates[0])
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = "auto"
+        
+        cache_key = None
+        # Tool turns answer from live data, so they are never cached
+        if self.cache is not None and use_cache and not tools:
+            cache_key = self.cache.make_key(payload)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        estimated = sum(estimate_tokens(m.content) for m in messages)
+        if self.meter is not None:
+            priority = await self.meter.admit(agent_id, priority)
+        
+        start = time.monotonic()
+        try:
+            async with self._slot(priority, estimated):
+                data = await self._post_routed(session, payload, candidates, task)
+        except Exception:
+            if self.meter is not None:
+                self.meter.record(agent_id, payload["model"], {}, time.monotonic() - start, success=False)
+            raise
+        
+        usage = data.get("usage", {})
+        if self.meter is not None:
+            self.meter.record(agent_id, data.get("model", payload["model"]), usage, time.monotonic() - start)
+        if self.scheduler and "total_tokens" in usage:
+            self.scheduler.record_usage(estimated, usage["total_tokens"])
         
-        payload = {
-            "model": self.model,
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+        reply = data["choices"][0]["message"]
+        result = CompletionResponse(
+            content=reply.get("content") or "",
+            usage=usage,
+            model=data.get("model", payload["model"]),
+            tool_calls=[
+                ToolCall(id=c["id"], name=c["function"]["name"], arguments=c["function"].get("arguments") or "{}")
+                for c in reply.get("tool_calls") or []
+            ]
+        )
+        
+        if cache_key is not None:
+            await self.cache.put(cache_key, result)
+        
+        return result
+    
+    async def stream(self, messages: List[Message], priority: Priority = Priority.NORMAL,
+                     task: TaskClass = TaskClass.CHAT, model: Optional[str] = None,
+                     agent_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream a completion over Server-Sent Events, yielding content deltas.
+        Closing the iterator early drops the connection, which stops generation.
+        """
+        session = self._get_session()
+        candidates = [model] if model else [spec.name for spec in self.router.candidates(task)]
+        payload = self._build_payload(messages, candidates[0])
+        payload["stream"] = True
+        estimated = sum(estimate_tokens(m.content) for m in messages)
+        if self.meter is not None:
+            priority = await self.meter.admit(agent_id, priority)
+        
+        async with self._slot(priority, estimated):
+            # Failover only happens before the first byte; once text has
+            # been yielded a broken stream is reported to the caller
+            start = time.monotonic()
+            try:
+                response, name = await self._open_routed_stream(session, payload, candidates, task)
+            except Exception:
+                if self.meter is not None:
+                    self.meter.record(agent_id, payload["model"], {}, time.monotonic() - start, success=False)
+                raise
+            
+            # Streams carry no usage block; meter what was actually produced
+            streamed_chars = 0
+            try:
+                async with response:
+                    async for raw_line in response.content:
+                        line = raw_line.decode("utf-8").strip()
+                        if not line.startswith("data:"):
+                            continue
+                        
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            self.router.record(name, task, time.monotonic() - start, True)
+                            break
+                        
+                        chunk = json.loads(data)
+                        choices = chunk.get("choices") or []
+                        if not choices:
+                            continue
+                        
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            streamed_chars += len(delta)
+                            yield delta
+            finally:
+                if self.meter is not None:
+                    usage = {"prompt_tokens": estimated, "completion_tokens": streamed_chars // 4}
+                    self.meter.record(agent_id, name, usage, time.monotonic() - start)
+    
+    def _slot(self, priority: Priority, estimated_tokens: int):
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(priority, estimated_tokens)
+    
+    def _model_deadline(self, name: str, candidates: List[str]) -> Optional[float]:
+        # Only worth abandoning a slow model when there is another to try
+        spec = self.router.specs.get(name)
+        if spec is None or name == candidates[-1]:
+            return None
+        return spec.max_latency
+    
+    async def _post_routed(self, session: aiohttp.ClientSession, payload: Dict, candidates: List[str],
+                           task: TaskClass) -> Dict[str, Any]:
+        """Try each candidate model in turn; a failing or too-slow one falls through to the next."""
+        last_error: Optional[UpstreamError] = None
+        
+        for name in candidates:
+            payload["model"] = name
+            deadline = self._model_deadline(name, candidates)
+            start = time.monotonic()
+            try:
+                data = await asyncio.wait_for(self._post_with_failover(session, payload), deadline)
+            except UpstreamError as e:
+                self.router.record(name, task, None, False)
+                last_error = e
+                continue
+            except asyncio.TimeoutError:
+                self.router.record(name, task, time.monotonic() - start, False)
+                last_error = UpstreamError(f"{name}: no reply within {deadline}s")
+                continue
+            
+            tokens = data.get("usage", {}).get("total_tokens", 0)
+            self.router.record(name, task, time.monotonic() - start, True, tokens)
+            return data
+        
+        raise last_error
+    
+    async def _open_routed_stream(self, session: aiohttp.ClientSession, payload: Dict, candidates: List[str],
+                                  task: TaskClass):
+        last_error: Optional[UpstreamError] = None
+        
+        for name in candidates:
+            payload["model"] = name
+            try:
+                return await self._open_stream(session, payload), name
+            except UpstreamError as e:
+                self.router.record(name, task, None, False)
+                last_error = e
+        
+        raise last_error
+    
+    async def _post_with_failover(self, session: aiohttp.ClientSession, payload: Dict) -> Dict[str, Any]:
+        last_error: Optional[UpstreamError] = None
+        
+        for attempt in range(self.max_attempts):
+            await self._wait_for_endpoint(attempt, last_error)
+            candidates = self.endpoints.ranked()
+            try:
+                if self.hedge and len(candidates) > 1:
+                    return await self._hedged(session, candidates, payload)
+                return await self._attempt(session, candidates[0], payload)
+            except UpstreamError as e:
+                last_error = e
+        
+        raise last_error
+    
+    async def _wait_for_endpoint(self, attempt: int, last_error: Optional[UpstreamError]):
+        """Back off only when no endpoint can take the retry right now."""
+        if attempt == 0:
+            return
+        wait = self.endpoints.seconds_until_available()
+        if wait <= 0 and len(self.endpoints.endpoints) == 1:
+            # Nowhere to fail over to: short exponential backoff
+            wait = 0.25 * 2 ** (attempt - 1)
+        if wait > 0 and self.scheduler is not None and last_error is not None and last_error.status == 429:
+            # Everyone shares the budget that was exceeded
+            self.scheduler.throttle(wait)
+        await asyncio.sleep(min(wait, self.max_retry_wait))
+    
+    async def _attempt(self, session: aiohttp.ClientSession, endpoint: Endpoint, payload: Dict) -> Dict[str, Any]:
+        endpoint.breaker.on_attempt()
+        start = time.monotonic()
+        try:
+            async with session.post(f"{endpoint.url}/chat/completions", json=payload, headers=self.headers) as response:
+                self._check_status(endpoint, response)
+                data = await response.json()
+        except UpstreamError:
+            raise
+        except asyncio.CancelledError:
+            endpoint.breaker.record_abandoned()
+            raise
+        except aiohttp.ClientResponseError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            endpoint.record_failure()
+            raise UpstreamError(f"{endpoint.url}: {e!r}") from e
+        
+        endpoint.record_success(time.monotonic() - start)
+        return data
+    
+    async def _hedged(self, session: aiohttp.ClientSession, candidates: List[Endpoint], payload: Dict) -> Dict[str, Any]:
+        primary_endpoint, backup_endpoint = candidates[0], candidates[1]
+        delay = max(self.hedge_min_delay, primary_endpoint.latency_percentile(0.95) or self.hedge_delay)
+        
+        primary = asyncio.create_task(self._attempt(session, primary_endpoint, payload))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            
+            self.hedges_fired += 1
+            backup = asyncio.create_task(self._attempt(session, backup_endpoint, payload))
+            pending.add(backup)
+            
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _open_stream(self, session: aiohttp.ClientSession, payload: Dict) -> aiohttp.ClientResponse:
+        last_error: Optional[UpstreamError] = None
+        
+        for attempt in range(self.max_attempts):
+            await self._wait_for_endpoint(attempt, last_error)
+            endpoint = self.endpoints.ranked()[0]
+            endpoint.breaker.on_attempt()
+            try:
+                response = await session.post(f"{endpoint.url}/chat/completions", json=payload, headers=self.headers)
+            except asyncio.CancelledError:
+                endpoint.breaker.record_abandoned()
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                endpoint.record_failure()
+                last_error = UpstreamError(f"{endpoint.url}: {e!r}")
+                continue
+            
+            try:
+                self._check_status(endpoint, response)
+            except UpstreamError as e:
+                response.release()
+                last_error = e
+                continue
+            except aiohttp.ClientResponseError:
+                response.release()
+                raise
+            
+            endpoint.record_success()
+            return response
+        
+        raise last_error
+    
+    def _check_status(self, endpoint: Endpoint, response: aiohttp.ClientResponse):
+        """
+        Classify an error status: retryable ones raise UpstreamError (and
+        count against the endpoint), other 4xx raise ClientResponseError.
+        """
+        if response.status < 400:
+            return
+        
+        if response.status in RETRYABLE_STATUSES:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status == 429:
+                endpoint.cool_down(retry_after if retry_after is not None else 5.0)
+            else:
+                endpoint.record_failure()
+                if retry_after is not None:
+                    endpoint.cool_down(retry_after)
+            raise UpstreamError(f"{endpoint.url}: HTTP {response.status}", response.status, retry_after)
+        
+        # The endpoint answered; the request itself was bad
+        endpoint.breaker.record_success()
+        response.raise_for_status()
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "endpoints": self.endpoints.get_status(),
+            "hedging": self.hedge,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "models": self.router.get_stats()
+        }
+    
+    def _build_payload(self, messages: List[Message], model: Optional[str] = None) -> Dict:
+        return {
+            "model": model or self.model,
+            "messages": [m.to_payload() for m in messages],
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
         }
-        
-        async with self.session.post(f"{self.base_url}/chat/completions", json=payload) as response:
-            response.raise_for_status()
-            data = await response.json()
-            
-            return CompletionResponse(
-                content=data["choices"][0]["message"]["content"],
-                usage=data.get("usage", {}),
-                model=data.get("model", self.model)
-            )
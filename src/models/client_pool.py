@@ -0,0 +1,116 @@
+import os
+import asyncio
+from typing import Dict, Any, Optional
+import aiohttp
+
+from models.cerebras_client import CerebrasClient
+from models.scheduler import RequestScheduler
+from models.completion_cache import CompletionCache
+from models.router import ModelRouter
+from models.metering import UsageMeter
+
+class ClientPool:
+    """
+    Process-wide pool of keep-alive HTTP connections.
+    Every agent borrows the same session instead of opening its own,
+    so the TCP+TLS handshake is paid once per host, not once per turn.
+    """
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 dns_ttl: Optional[int] = None, keepalive_timeout: Optional[float] = None,
+                 request_timeout: Optional[float] = None):
+        self.limit = limit if limit is not None else int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.limit_per_host = limit_per_host if limit_per_host is not None else int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+        self.dns_ttl = dns_ttl if dns_ttl is not None else int(os.getenv("HTTP_DNS_TTL", "300"))
+        self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+        self.request_timeout = request_timeout if request_timeout is not None else float(os.getenv("HTTP_TIMEOUT", "60"))
+
+        # Shared admission control so every agent draws from one rate budget
+        self.scheduler = RequestScheduler()
+        self.router = ModelRouter.from_env()
+        self.meter = UsageMeter()
+        self.cache = CompletionCache() if os.getenv("COMPLETION_CACHE", "true").lower() == "true" else None
+        
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[CerebrasClient] = None
+        self.sessions_created = 0
+
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared session, creating it on first use.
+        Must be called from inside the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+
+        # A session is bound to the loop it was created on; a new loop
+        # (e.g. a second asyncio.run) gets a fresh one.
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            self._loop = loop
+            self.sessions_created += 1
+
+        return self._session
+
+    def get_client(self) -> CerebrasClient:
+        """
+        Shared LLM client. Env config is read once, on first call.
+        """
+        if self._client is None:
+            self._client = CerebrasClient(pool=self)
+        return self._client
+
+    async def close(self):
+        """Close the shared session. The pool can be reused afterwards."""
+        await self.meter.flush()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._session is not None and not self._session.closed,
+            "sessions_created": self.sessions_created,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_ttl": self.dns_ttl,
+            "keepalive_timeout": self.keepalive_timeout,
+            "scheduler": self.scheduler.get_stats(),
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "usage": self.meter.get_stats(),
+            "client": self._client.get_status() if self._client is not None else None
+        }
+
+
+_shared_pool: Optional[ClientPool] = None
+
+def get_client_pool() -> ClientPool:
+    """Process-wide pool shared by every agent."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = ClientPool()
+    return _shared_pool
+
+async def close_client_pool():
+    """Release pooled connections. Call once on process shutdown."""
+    if _shared_pool is not None:
+        await _shared_pool.close()
+
+async def reset_client_pool():
+    """Close and discard the shared pool so the next use re-reads env config."""
+    global _shared_pool
+    await close_client_pool()
+    _shared_pool = None
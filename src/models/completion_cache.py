@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from models.cerebras_client import CompletionResponse
+
+class CompletionCache:
+    """
+    Content-addressed cache of chat completions.
+    Keys are a hash of the canonical request payload (model, messages,
+    temperature, max_tokens). Hot entries live in an in-memory LRU; every
+    entry is also written to SQLite so the cache survives restarts.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 db_path: Optional[str] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("COMPLETION_CACHE_SIZE", "1000"))
+        self.ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("COMPLETION_CACHE_TTL", "3600"))
+        self.db_path = db_path if db_path is not None else os.getenv("COMPLETION_CACHE_PATH", "data/cache/completions.sqlite3")
+
+        self._memory: "OrderedDict[str, Tuple[float, CompletionResponse]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes_since_purge = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[CompletionResponse]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, response = entry
+            if time.time() - created_at < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return response
+            del self._memory[key]
+
+        row = await asyncio.to_thread(self._disk_get, key)
+        if row is None:
+            self.misses += 1
+            return None
+
+        created_at, response = row
+        self._remember(key, created_at, response)
+        self.disk_hits += 1
+        return response
+
+    async def put(self, key: str, response: CompletionResponse):
+        created_at = time.time()
+        self._remember(key, created_at, response)
+        await asyncio.to_thread(self._disk_put, key, created_at, response)
+
+    def _remember(self, key: str, created_at: float, response: CompletionResponse):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, created_at REAL, content TEXT, usage TEXT, model TEXT)"
+            )
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, CompletionResponse]]:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT created_at, content, usage, model FROM completions WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        created_at, content, usage, model = row
+        return created_at, CompletionResponse(content=content, usage=json.loads(usage), model=model)
+
+    def _disk_put(self, key: str, created_at: float, response: CompletionResponse):
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO completions (key, created_at, content, usage, model) VALUES (?, ?, ?, ?, ?)",
+                (key, created_at, response.content, json.dumps(response.usage), response.model)
+            )
+            # Expired rows are swept occasionally rather than on every write
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= 100:
+                db.execute("DELETE FROM completions WHERE created_at <= ?", (time.time() - self.ttl,))
+                self._writes_since_purge = 0
+            db.commit()
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,168 @@
+import os
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Any, List, Optional
+from enum import Enum
+
+# Statuses worth trying again (possibly on another endpoint); anything
+# else in the 4xx range is the caller's fault and fails immediately.
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+class UpstreamError(Exception):
+    """A failed attempt that may succeed on retry or on another endpoint."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. After
+    `reset_timeout` seconds a single probe is let through; its outcome
+    closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def available(self) -> bool:
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        return not self.probe_in_flight
+
+    def on_attempt(self):
+        if self.state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN:
+            self.probe_in_flight = True
+
+    def record_success(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """Attempt cancelled (e.g. lost a hedge race): outcome unknown."""
+        self.probe_in_flight = False
+
+class Endpoint:
+    """One OpenAI-compatible base URL with its health history."""
+
+    def __init__(self, url: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latencies: Deque[float] = deque(maxlen=200)
+        self.cooldown_until = 0.0
+        self.successes = 0
+        self.failures = 0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until and self.breaker.available()
+
+    def cool_down(self, seconds: float):
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+    def record_success(self, latency: Optional[float] = None):
+        self.successes += 1
+        if latency is not None:
+            self.latencies.append(latency)
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self.failures += 1
+        self.breaker.record_failure()
+
+    @property
+    def error_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.failures / total if total else 0.0
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "circuit": self.breaker.state.value,
+            "available": self.available(),
+            "successes": self.successes,
+            "failures": self.failures,
+            "p50": self.latency_percentile(0.50),
+            "p95": self.latency_percentile(0.95),
+            "cooldown_remaining": max(0.0, self.cooldown_until - time.monotonic())
+        }
+
+class EndpointPool:
+    """
+    Ranks endpoints for each attempt: healthy ones first, ordered by error
+    rate then median latency. If every endpoint is down the least recently
+    failed ones are still returned so callers can wait instead of failing.
+    """
+
+    def __init__(self, urls: List[str], failure_threshold: Optional[int] = None,
+                 reset_timeout: Optional[float] = None):
+        failure_threshold = failure_threshold if failure_threshold is not None else int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+        reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv("LLM_BREAKER_RESET", "30"))
+        self.endpoints = [Endpoint(url, failure_threshold, reset_timeout) for url in urls]
+
+    @classmethod
+    def from_env(cls) -> "EndpointPool":
+        urls = [u.strip() for u in os.getenv("BASE_URLS", "").split(",") if u.strip()]
+        return cls(urls or [os.getenv("BASE_URL", "https://api.cerebras.ai/v1")])
+
+    def ranked(self) -> List[Endpoint]:
+        healthy = [e for e in self.endpoints if e.available()]
+        if healthy:
+            return sorted(healthy, key=lambda e: (round(e.error_rate, 1), e.latency_percentile(0.5) or 0.0))
+        return sorted(self.endpoints, key=lambda e: max(e.cooldown_until, e.breaker.opened_at + e.breaker.reset_timeout))
+
+    def seconds_until_available(self) -> float:
+        """0 if some endpoint can be tried now."""
+        now = time.monotonic()
+        waits = []
+        for e in self.endpoints:
+            wait = max(0.0, e.cooldown_until - now)
+            if not e.breaker.available():
+                wait = max(wait, e.breaker.opened_at + e.breaker.reset_timeout - now)
+            waits.append(wait)
+        return min(waits) if waits else 0.0
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        return [e.get_status() for e in self.endpoints]
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,173 @@
+import os
+import json
+import math
+import random
+import asyncio
+import argparse
+from typing import Dict, Any, Optional, Set, Tuple
+from aiohttp import web
+
+class FakeLLMServer:
+    """
+    Local stand-in for an OpenAI-compatible /chat/completions endpoint.
+    Latency, error rate and 429 rate are configurable so client behaviour
+    under load can be measured offline and repeatably.
+    """
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 20.0, distribution: str = "lognormal",
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 tokens_per_second: float = 500.0, reply_tokens: int = 40, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.random = random.Random(seed)
+
+        self.requests = 0
+        self.errors_sent = 0
+        self.rate_limits_sent = 0
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.connections: Set[Tuple[str, int]] = set()
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    def sample_latency(self) -> float:
+        """Time to first token, in seconds."""
+        if self.distribution == "fixed":
+            ms = self.latency_ms
+        elif self.distribution == "normal":
+            ms = self.random.gauss(self.latency_ms, self.jitter_ms)
+        else:
+            # Log-normal with the configured mean/stddev: long right tail like real APIs
+            mean, std = max(self.latency_ms, 1e-3), max(self.jitter_ms, 1e-3)
+            sigma2 = math.log(1 + (std / mean) ** 2)
+            mu = math.log(mean) - sigma2 / 2
+            ms = self.random.lognormvariate(mu, sigma2 ** 0.5)
+        return max(0.0, ms) / 1000.0
+
+    async def handle_completions(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        # Client (host, port) identifies the TCP connection
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+
+        try:
+            body = await request.json()
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limits_sent += 1
+                return web.json_response({"error": {"message": "Rate limit exceeded"}}, status=429,
+                                         headers={"Retry-After": str(self.retry_after)})
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors_sent += 1
+                return web.json_response({"error": {"message": "Internal error"}}, status=500)
+
+            await asyncio.sleep(self.sample_latency())
+
+            words = [f"tok{i}" for i in range(self.reply_tokens)]
+            model = body.get("model", "fake-model")
+            usage = {
+                "prompt_tokens": sum(len(m.get("content", "")) // 4 for m in body.get("messages", [])),
+                "completion_tokens": self.reply_tokens,
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+            if body.get("stream"):
+                return await self._stream(request, words, model)
+
+            await asyncio.sleep(self.reply_tokens / self.tokens_per_second)
+            return web.json_response({
+                "id": f"fake-{self.requests}",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                "usage": usage
+            })
+        finally:
+            self.inflight -= 1
+
+    async def _stream(self, request: web.Request, words, model: str) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        delay = 1.0 / self.tokens_per_second
+
+        for i, word in enumerate(words):
+            chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+            try:
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            except ConnectionResetError:
+                # Client aborted the stream
+                return response
+            await asyncio.sleep(delay)
+
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_stats())
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/chat/completions", self.handle_completions)
+        app.router.add_post("/v1/chat/completions", self.handle_completions)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start in the current loop; returns the base URL to use as BASE_URL."""
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors_sent": self.errors_sent,
+            "rate_limits_sent": self.rate_limits_sent,
+            "connections": len(self.connections),
+            "inflight": self.inflight,
+            "peak_inflight": self.peak_inflight
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_LLM_PORT", "8099")))
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--distribution", choices=["fixed", "normal", "lognormal"], default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, distribution=args.distribution,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        tokens_per_second=args.tokens_per_second, reply_tokens=args.reply_tokens, seed=args.seed
+    )
+    print(f"Fake LLM server on http://{args.host}:{args.port} (set BASE_URL to this)")
+    web.run_app(server.build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Any, List, Optional, Tuple
+
+from models.scheduler import Priority
+
+class BudgetExceededError(Exception):
+    """An agent has used up its hard token budget for the current window."""
+
+    def __init__(self, agent_id: str, used: int, limit: int, window: float):
+        super().__init__(f"Token budget exceeded for {agent_id}: {used}/{limit} tokens in {window:.0f}s")
+        self.agent_id = agent_id
+        self.used = used
+        self.limit = limit
+        self.window = window
+
+@dataclass
+class Budget:
+    window: float = 3600.0
+    # Past `soft` tokens an agent's calls are delayed and demoted to
+    # background priority; past `hard` they are rejected
+    soft: Optional[int] = None
+    hard: Optional[int] = None
+
+@dataclass
+class Usage:
+    requests: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, latency: float, success: bool):
+        self.requests += 1
+        self.errors += 0 if success else 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+class UsageMeter:
+    """
+    Token and latency accounting per agent, per model and per time window.
+    Recording is a couple of dict updates on the event loop; closed windows
+    are appended to a JSONL file from a worker thread every
+    `flush_interval` seconds. Budgets are checked against a rolling window
+    of each agent's recent usage.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, flush_interval: Optional[float] = None,
+                 path: Optional[str] = None, budgets: Optional[Dict[str, Budget]] = None,
+                 soft_delay: Optional[float] = None):
+        self.window_seconds = window_seconds if window_seconds is not None else float(os.getenv("METERING_WINDOW", "60"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("METERING_FLUSH_INTERVAL", "30"))
+        self.path = path if path is not None else os.getenv("METERING_PATH", "data/metering")
+        self.budgets = budgets if budgets is not None else self._budgets_from_env()
+        self.soft_delay = soft_delay if soft_delay is not None else float(os.getenv("LLM_BUDGET_SOFT_DELAY", "5"))
+
+        # (window_start, agent_id, model) -> Usage, until flushed
+        self._windows: Dict[Tuple[float, str, str], Usage] = {}
+        self.totals: Dict[str, Usage] = {}
+        self.by_model: Dict[str, Usage] = {}
+        # agent_id -> [(timestamp, tokens)] within its budget window
+        self._recent: Dict[str, Deque[Tuple[float, int]]] = {}
+        self._recent_tokens: Dict[str, int] = {}
+
+        self._last_flush = time.time()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.throttled = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _budgets_from_env() -> Dict[str, Budget]:
+        """LLM_BUDGETS: {"<agent_id>" | "*": {"window": s, "soft": n, "hard": n}}."""
+        raw = os.getenv("LLM_BUDGETS", "").strip()
+        if not raw:
+            return {}
+        return {agent_id: Budget(**config) for agent_id, config in json.loads(raw).items()}
+
+    def budget_for(self, agent_id: str) -> Optional[Budget]:
+        return self.budgets.get(agent_id) or self.budgets.get("*")
+
+    def window_tokens(self, agent_id: str) -> int:
+        """Tokens used by `agent_id` inside its budget window."""
+        budget = self.budget_for(agent_id)
+        recent = self._recent.get(agent_id)
+        if not recent:
+            return 0
+        if budget is not None:
+            cutoff = time.time() - budget.window
+            while recent and recent[0][0] < cutoff:
+                self._recent_tokens[agent_id] -= recent.popleft()[1]
+        return self._recent_tokens[agent_id]
+
+    async def admit(self, agent_id: Optional[str], priority: Priority) -> Priority:
+        """
+        Gate a call against the agent's budget. Returns the priority to use,
+        raises BudgetExceededError past the hard limit.
+        """
+        budget = self.budget_for(agent_id) if agent_id else None
+        if budget is None:
+            return priority
+
+        used = self.window_tokens(agent_id)
+        if budget.hard is not None and used >= budget.hard:
+            self.rejected += 1
+            raise BudgetExceededError(agent_id, used, budget.hard, budget.window)
+        if budget.soft is not None and used >= budget.soft:
+            self.throttled += 1
+            await asyncio.sleep(self.soft_delay)
+            return Priority.BACKGROUND
+        return priority
+
+    def record(self, agent_id: Optional[str], model: str, usage: Dict[str, Any], latency: float,
+               success: bool = True):
+        agent_id = agent_id or "unknown"
+        prompt_tokens = int(usage.get("prompt_tokens", 0))
+        completion_tokens = int(usage.get("completion_tokens", 0))
+        if not prompt_tokens and not completion_tokens:
+            prompt_tokens = int(usage.get("total_tokens", 0))
+
+        now = time.time()
+        start = now - now % self.window_seconds
+        for table, key in ((self._windows, (start, agent_id, model)), (self.totals, agent_id), (self.by_model, model)):
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = Usage()
+            entry.add(prompt_tokens, completion_tokens, latency, success)
+
+        tokens = prompt_tokens + completion_tokens
+        if tokens and self.budget_for(agent_id) is not None:
+            self._recent.setdefault(agent_id, deque()).append((now, tokens))
+            self._recent_tokens[agent_id] = self._recent_tokens.get(agent_id, 0) + tokens
+
+        if now - self._last_flush >= self.flush_interval and (self._flush_task is None or self._flush_task.done()):
+            self._last_flush = now
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush(closed_only=True))
+
+    async def flush(self):
+        """Write every pending window, including the current one."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self._flush(closed_only=False)
+
+    async def _flush(self, closed_only: bool):
+        now = time.time()
+        current = now - now % self.window_seconds
+        rows: List[Dict[str, Any]] = []
+        for key in list(self._windows):
+            start, agent_id, model = key
+            if closed_only and start >= current:
+                continue
+            usage = self._windows.pop(key)
+            rows.append({"window_start": start, "window_seconds": self.window_seconds,
+                         "agent_id": agent_id, "model": model, **asdict(usage)})
+        if rows:
+            await asyncio.to_thread(self._append, rows)
+
+    def _append(self, rows: List[Dict[str, Any]]):
+        os.makedirs(self.path, exist_ok=True)
+        filename = os.path.join(self.path, f"usage-{time.strftime('%Y%m%d')}.jsonl")
+        with open(filename, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    def get_stats(self) -> Dict[str, Any]:
+        def summary(usage: Usage) -> Dict[str, Any]:
+            return {
+                "requests": usage.requests,
+                "errors": usage.errors,
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "avg_latency": round(usage.latency_total / usage.requests, 3) if usage.requests else None,
+                "max_latency": round(usage.latency_max, 3)
+            }
+
+        return {
+            "agents": {agent_id: summary(usage) for agent_id, usage in self.totals.items()},
+            "models": {model: summary(usage) for model, usage in self.by_model.items()},
+            "budgets": {
+                agent_id: {"used": self.window_tokens(agent_id), **asdict(self.budget_for(agent_id))}
+                for agent_id in self._recent
+            },
+            "pending_windows": len(self._windows),
+            "throttled": self.throttled,
+            "rejected": self.rejected
+        }
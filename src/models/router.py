@@ -0,0 +1,123 @@
+import os
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Any, List, Optional
+
+class TaskClass(Enum):
+    CLASSIFY = "classify"
+    SUMMARIZE = "summarize"
+    CHAT = "chat"
+    ANALYSIS = "analysis"
+
+@dataclass
+class ModelSpec:
+    name: str
+    # Task classes this model may serve; empty means all of them
+    tasks: List[TaskClass] = field(default_factory=list)
+    cost_per_1k: float = 0.0
+    # Seconds; a model slower than this on average is only used as a fallback,
+    # and a single call exceeding it is abandoned for the next candidate
+    max_latency: Optional[float] = None
+
+    def serves(self, task: TaskClass) -> bool:
+        return not self.tasks or task in self.tasks
+
+class ModelStats:
+    """Exponentially weighted latency (per task class) and error rate."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.latency: Dict[TaskClass, float] = {}
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.tokens = 0
+
+    def record(self, task: TaskClass, latency: Optional[float], success: bool, tokens: int = 0):
+        self.calls += 1
+        self.tokens += tokens
+        if not success:
+            self.failures += 1
+        self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+        if latency is not None:
+            previous = self.latency.get(task)
+            self.latency[task] = latency if previous is None else previous + self.alpha * (latency - previous)
+
+class ModelRouter:
+    """
+    Picks a model for each request from the callers' task class.
+    Candidates serving the task are ranked by observed latency, inflated by
+    their recent error rate, plus a cost term. Models that are mostly failing
+    or have been slower than their `max_latency` drop to the back of the
+    list as fallbacks.
+    Models without samples for a task are tried first so they get measured.
+    """
+
+    def __init__(self, specs: List[ModelSpec], cost_weight: Optional[float] = None):
+        if not specs:
+            raise ValueError("ModelRouter needs at least one model")
+        self.specs = {spec.name: spec for spec in specs}
+        self.cost_weight = cost_weight if cost_weight is not None else float(os.getenv("LLM_ROUTER_COST_WEIGHT", "1.0"))
+        self.stats: Dict[str, ModelStats] = {spec.name: ModelStats() for spec in specs}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """
+        LLM_MODELS is a JSON list of {"name", "tasks", "cost_per_1k",
+        "max_latency"}. Without it every task goes to MODEL.
+        """
+        raw = os.getenv("LLM_MODELS", "").strip()
+        if not raw:
+            return cls([ModelSpec(os.getenv("MODEL", "llama-3.3-70b"))])
+
+        specs = []
+        for entry in json.loads(raw):
+            specs.append(ModelSpec(
+                name=entry["name"],
+                tasks=[TaskClass(t) for t in entry.get("tasks", [])],
+                cost_per_1k=float(entry.get("cost_per_1k", 0.0)),
+                max_latency=entry.get("max_latency")
+            ))
+        return cls(specs)
+
+    @property
+    def default_model(self) -> str:
+        return next(iter(self.specs))
+
+    def _score(self, spec: ModelSpec, task: TaskClass) -> float:
+        stats = self.stats[spec.name]
+        latency = stats.latency.get(task, 0.0)
+        return latency * (1 + 4 * stats.error_rate) + self.cost_weight * spec.cost_per_1k
+
+    def _degraded(self, spec: ModelSpec, task: TaskClass) -> bool:
+        stats = self.stats[spec.name]
+        if stats.error_rate > 0.5:
+            return True
+        latency = stats.latency.get(task)
+        return spec.max_latency is not None and latency is not None and latency > spec.max_latency
+
+    def candidates(self, task: TaskClass) -> List[ModelSpec]:
+        """Models to try for `task`, best first. Never empty."""
+        eligible = [spec for spec in self.specs.values() if spec.serves(task)]
+        if not eligible:
+            eligible = list(self.specs.values())
+        return sorted(eligible, key=lambda spec: (self._degraded(spec, task), self._score(spec, task)))
+
+    def record(self, model: str, task: TaskClass, latency: Optional[float], success: bool, tokens: int = 0):
+        stats = self.stats.get(model)
+        if stats is not None:
+            stats.record(task, latency, success, tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "error_rate": round(stats.error_rate, 3),
+                "tokens": stats.tokens,
+                "latency": {task.value: round(value, 3) for task, value in stats.latency.items()},
+                "cost_per_1k": self.specs[name].cost_per_1k
+            }
+            for name, stats in self.stats.items()
+        }
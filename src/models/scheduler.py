@@ -0,0 +1,158 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Dict, List, Any, Optional
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+class TokenBucket:
+    """
+    Continuously refilling budget of `rate_per_minute` units.
+    Tokens may go negative when actual usage is reconciled after the fact;
+    the debt is paid back before the next acquisition succeeds.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) after the real cost is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+class RequestScheduler:
+    """
+    Admission control for model requests.
+    Enforces requests-per-minute and tokens-per-minute budgets, bounds the
+    number of in-flight requests and releases queued work strictly by
+    priority (FIFO within a priority).
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 max_concurrent: Optional[int] = None):
+        self.rpm = rpm if rpm is not None else float(os.getenv("LLM_RPM", "30"))
+        self.tpm = tpm if tpm is not None else float(os.getenv("LLM_TPM", "60000"))
+        self.max_concurrent = max_concurrent if max_concurrent is not None else int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+
+        self.request_bucket = TokenBucket(self.rpm)
+        self.token_bucket = TokenBucket(self.tpm)
+
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.granted = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.NORMAL, tokens: int = 0):
+        """Hold one concurrency slot for the duration of a request."""
+        await self.acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority = Priority.NORMAL, tokens: int = 0):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), tokens, future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the waiter was cancelled: hand the slot back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Reconcile the token budget once the real usage is known."""
+        self.token_bucket.adjust(actual_tokens - estimated_tokens)
+
+    def throttle(self, seconds: float):
+        """Stop admitting requests for `seconds` (e.g. after a 429)."""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._dispatch()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for entry in self._queue if not entry[3].done())
+
+    def _dispatch(self):
+        while self._queue and self._active < self.max_concurrent:
+            priority, seq, tokens, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.request_bucket.wait_time(1),
+                self.token_bucket.wait_time(tokens)
+            )
+            if wait > 0:
+                self._schedule_retry(wait)
+                return
+
+            heapq.heappop(self._queue)
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(tokens)
+            self._active += 1
+            self.granted += 1
+            future.set_result(None)
+
+    def _schedule_retry(self, delay: float):
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "paused_for": max(0.0, self._paused_until - time.monotonic())
+        }
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting."""
+    return len(text) // 4 + 1
@@ -143,6 +143,14 @@ class RootSystem:
         
         return {"status": "loss_recorded", "consecutive_failures": self.consecutive_failures}
     
+    def manual_reset(self) -> Dict:
+        """Spore (you) clears a growth halt after reviewing the losses."""
+        self.consecutive_failures = 0
+        for hypha in self.hyphae_registry.values():
+            hypha.pop("today_loss", None)
+        self._log_growth_event("manual_reset", "network", 0.0)
+        return {"status": "reset", "consecutive_failures": 0}
+    
     def get_network_status(self) -> Dict:
         return {
             "network_capital": self.network_capital,
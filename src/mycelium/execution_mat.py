@@ -1,10 +1,12 @@
-﻿import asyncio
-from typing import Dict, List
+﻿from typing import Dict, List, Optional
 from datetime import datetime
 
 from mycelium.constitution import RootSystem
 from mycelium.nodes.crypto_hypha import CryptoHypha
 from mycelium.nodes.stock_hypha import StockHypha
+from finance.data_engine import FreeDataEngine
+from finance.scanner import MarketScanner
+from core.control import ControlPlane
 
 class ExecutionMycelium:
     """
@@ -12,8 +14,13 @@ class ExecutionMycelium:
     No trade happens without passing through here.
     """
     
-    def __init__(self, root: RootSystem):
+    def __init__(self, root: RootSystem, engine: Optional[FreeDataEngine] = None,
+                 scanner: Optional[MarketScanner] = None):
         self.root = root
+        # One engine for every hypha: a symbol is fetched once per cache window, not once per node
+        self.engine = engine or FreeDataEngine()
+        # ...and one scanner, so the hyphae share the provider rate limits
+        self.scanner = scanner or MarketScanner(self.engine)
         self.hyphae: Dict[str, object] = {}
         self.pending_trades = []
         self.executed_today = []
@@ -31,9 +38,9 @@ class ExecutionMycelium:
         
         # Instantiate based on specialty
         if specialty == "crypto":
-            hypha = CryptoHypha(hypha_id, capital, self.root)
+            hypha = CryptoHypha(hypha_id, capital, self.root, self.engine, self.scanner)
         elif specialty == "stock":
-            hypha = StockHypha(hypha_id, capital, self.root)
+            hypha = StockHypha(hypha_id, capital, self.root, self.engine, self.scanner)
         else:
             return {"approved": False, "reason": f"Unknown specialty: {specialty}"}
         
@@ -88,25 +95,37 @@ class ExecutionMycelium:
         
         return status
     
-    async def run_autonomous_cycles(self, interval_minutes: int = 30):
+    def get_status(self) -> Dict:
+        status = self.root.get_network_status()
+        status["active_hyphae"] = list(self.hyphae)
+        return status
+    
+    async def run_autonomous_cycles(self, interval_minutes: int = 30, control: Optional[ControlPlane] = None):
         """
         Continuous operation until constitution says stop.
         """
+        control = control or ControlPlane("mycelium", port=-1)
+        control.set_status(self.get_status)
+        control.register("reset-risk", self.root.manual_reset, "Clear the network's consecutive-failure halt")
+        
         print("🍄 MYCELIUM AUTONOMOUS MODE")
         print(f"   Cycle interval: {interval_minutes} minutes")
-        print(f"   Spawning initial hyphae...")
         
-        # Spawn initial network (Phase 1: $100)
-        await self.spawn_hypha("crypto", 30)   # $30 to crypto
-        await self.spawn_hypha("stock", 30)    # $30 to stocks
-        # $40 remains in network reserve
+        # Spawn initial network (Phase 1: $100); a restarted loop keeps its hyphae
+        if not self.hyphae:
+            print(f"   Spawning initial hyphae...")
+            await self.spawn_hypha("crypto", 30)   # $30 to crypto
+            await self.spawn_hypha("stock", 30)    # $30 to stocks
+            # $40 remains in network reserve
         
-        print(f"   Initial network spawned. 2 hyphae active.")
-        print("   Press Ctrl+C to stop, or type 'status' for network health\n")
+        print(f"   Network ready. {len(self.hyphae)} hyphae active.")
+        print("   Press Ctrl+C to stop; type status, pause, resume, reset-risk or cycle-now\n")
         
         try:
             while True:
+                await control.wait_until_running()
                 status = await self.run_nutrient_cycle()
+                control.cycle_done()
                 
                 # Check if we can spawn new hypha (growth!)
                 if status['can_spawn_new'] and status['network_capital'] > 50:
@@ -118,7 +137,7 @@ class ExecutionMycelium:
                     print(f"   🌱 NEW HYPHA SPAWNED (auto-growth)")
                 
                 print(f"\n⏰ Next cycle in {interval_minutes} minutes...")
-                await asyncio.sleep(interval_minutes * 60)
+                await control.sleep(interval_minutes * 60)
                 
         except KeyboardInterrupt:
             print("\n\n🛑 Mycelium entering dormancy...")
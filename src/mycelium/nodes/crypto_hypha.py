@@ -4,8 +4,10 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from finance.data_engine import FreeDataEngine
+from finance.scanner import MarketScanner, load_universe
 from finance.strategies.core_strategies import StrategyEngine, Signal
 from mycelium.constitution import RootSystem
+from communication.events import TradeEvent
 
 @dataclass
 class CryptoInsight:
@@ -22,14 +24,16 @@ class CryptoHypha:
     24/7 operation, high volatility tolerance.
     """
     
-    def __init__(self, hypha_id: str, capital: float, root: RootSystem):
+    def __init__(self, hypha_id: str, capital: float, root: RootSystem, engine: Optional[FreeDataEngine] = None,
+                 scanner: Optional[MarketScanner] = None):
         self.id = hypha_id
         self.capital = capital
         self.root = root
-        self.engine = FreeDataEngine()
+        self.engine = engine or FreeDataEngine()
+        self.scanner = scanner or MarketScanner(self.engine)
         self.strategies = StrategyEngine()
         
-        self.watchlist = ["bitcoin", "ethereum", "solana", "cardano"]
+        self.watchlist = load_universe().get("crypto", ["bitcoin", "ethereum", "solana", "cardano"])
         self.positions = {}
         self.today_pnl = 0.0
         self.lifetime_pnl = 0.0
@@ -45,9 +49,10 @@ class CryptoHypha:
         
         insights = []
         
-        # Fetch market data
+        # Fetch market data: batched, rate limited, open positions first
+        quotes = (await self.scanner.sweep({"crypto": self.watchlist}, held=self.positions)).for_provider("crypto")
         for symbol in self.watchlist:
-            data = await self.engine.get_crypto_price(symbol)
+            data = quotes.get(symbol)
             if not data:
                 continue
             
@@ -95,6 +100,10 @@ class CryptoHypha:
         
         self.today_pnl += expected_profit
         self.lifetime_pnl += expected_profit
+        await self.engine.bus.publish(TradeEvent(
+            agent=self.id, symbol=insight.symbol, action=insight.signal, size=trade_size,
+            price=insight.price, pnl=expected_profit
+        ))
         
         return {
             "executed": True,
@@ -1,11 +1,13 @@
 ﻿import asyncio
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime, time
 
 from finance.data_engine import FreeDataEngine
+from finance.scanner import MarketScanner, load_universe
 from finance.strategies.core_strategies import StrategyEngine
 from mycelium.constitution import RootSystem
+from communication.events import TradeEvent
 
 @dataclass
 class StockInsight:
@@ -21,15 +23,17 @@ class StockHypha:
     Respects market hours, focuses on momentum.
     """
     
-    def __init__(self, hypha_id: str, capital: float, root: RootSystem):
+    def __init__(self, hypha_id: str, capital: float, root: RootSystem, engine: Optional[FreeDataEngine] = None,
+                 scanner: Optional[MarketScanner] = None):
         self.id = hypha_id
         self.capital = capital
         self.root = root
-        self.engine = FreeDataEngine()
+        self.engine = engine or FreeDataEngine()
+        self.scanner = scanner or MarketScanner(self.engine)
         self.strategies = StrategyEngine()
         
         # Multi-market watchlist (expandable to UK, EU, Asia)
-        self.us_watchlist = ["AAPL", "MSFT", "GOOGL", "TSLA", "NVDA"]
+        self.us_watchlist = load_universe().get("stock", ["AAPL", "MSFT", "GOOGL", "TSLA", "NVDA"])
         self.uk_watchlist = []  # Expand when ready
         self.eu_watchlist = []  # Expand when ready
         
@@ -61,8 +65,10 @@ class StockHypha:
         
         insights = []
         
+        # Concurrent, rate limited sweep; open positions first
+        quotes = (await self.scanner.sweep({"stock": self.us_watchlist}, held=self.positions)).for_provider("stock")
         for symbol in self.us_watchlist:
-            data = await self.engine.get_stock_price(symbol)
+            data = quotes.get(symbol)
             if not data:
                 continue
             
@@ -95,6 +101,10 @@ class StockHypha:
         result = self.root.record_profit(self.id, expected_profit)
         
         self.today_pnl += expected_profit
+        await self.engine.bus.publish(TradeEvent(
+            agent=self.id, symbol=insight.symbol, action=insight.signal, size=trade_size,
+            price=insight.price, pnl=expected_profit
+        ))
         
         return {
             "executed": True,
@@ -0,0 +1,58 @@
+from dataclasses import asdict
+from typing import Dict, Any, Optional
+
+from tools.registry import Tool, ToolRegistry
+from finance.data_engine import FreeDataEngine, MarketData
+from finance.risk_manager import RiskManager
+from mycelium.constitution import RootSystem
+
+SYMBOL_SCHEMA = {
+    "type": "object",
+    "properties": {"symbol": {"type": "string"}},
+    "required": ["symbol"]
+}
+
+def _quote(data: Optional[MarketData]) -> Dict[str, Any]:
+    if data is None:
+        return {"error": "No data available for that symbol"}
+    return asdict(data)
+
+def build_finance_tools(data_engine: FreeDataEngine, risk_manager: RiskManager,
+                        root: Optional[RootSystem] = None) -> ToolRegistry:
+    """Live-data tools for the financial assistant."""
+    registry = ToolRegistry()
+
+    async def get_crypto_quote(symbol: str) -> Dict[str, Any]:
+        return _quote(await data_engine.get_crypto_price(symbol))
+
+    async def get_stock_quote(symbol: str) -> Dict[str, Any]:
+        return _quote(await data_engine.get_stock_price(symbol))
+
+    registry.register(Tool(
+        name="get_crypto_quote",
+        description="Current USD price, 24h change and volume for a cryptocurrency by CoinGecko id (e.g. 'bitcoin').",
+        handler=get_crypto_quote,
+        parameters=SYMBOL_SCHEMA,
+        cache_ttl=30
+    ))
+    registry.register(Tool(
+        name="get_stock_quote",
+        description="Current price, daily change and volume for a stock ticker (e.g. 'AAPL').",
+        handler=get_stock_quote,
+        parameters=SYMBOL_SCHEMA,
+        cache_ttl=30
+    ))
+    registry.register(Tool(
+        name="get_risk_status",
+        description="Today's P&L, loss limit, open positions and circuit breaker state of the risk manager.",
+        handler=risk_manager.get_status,
+        timeout=2
+    ))
+    if root is not None:
+        registry.register(Tool(
+            name="get_network_status",
+            description="Capital, spore bank and per-hypha status of the trading network.",
+            handler=root.get_network_status,
+            timeout=2
+        ))
+    return registry
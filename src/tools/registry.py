@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from models.cerebras_client import Message, ToolCall
+
+Handler = Callable[..., Union[Any, Awaitable[Any]]]
+
+# JSON Schema type name -> accepted Python types
+SCHEMA_TYPES = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,)
+}
+
+class ToolError(Exception):
+    """A tool call that cannot be run: unknown tool or bad arguments."""
+
+@dataclass
+class Tool:
+    name: str
+    description: str
+    handler: Handler
+    # JSON Schema for the keyword arguments of `handler`
+    parameters: Dict[str, Any] = field(default_factory=lambda: {"type": "object", "properties": {}})
+    timeout: Optional[float] = None
+    # Seconds an identical call's result is reused; 0 disables caching
+    cache_ttl: float = 0.0
+
+    def schema(self) -> Dict[str, Any]:
+        """OpenAI function-calling declaration."""
+        return {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": self.parameters}
+        }
+
+    def validate(self, arguments: Dict[str, Any]):
+        properties = self.parameters.get("properties", {})
+        for name in self.parameters.get("required", []):
+            if name not in arguments:
+                raise ToolError(f"{self.name}: missing argument '{name}'")
+        for name, value in arguments.items():
+            if name not in properties:
+                raise ToolError(f"{self.name}: unexpected argument '{name}'")
+            expected = SCHEMA_TYPES.get(properties[name].get("type"))
+            # bool is an int subclass; don't let True pass as a number
+            if expected and (not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected)):
+                raise ToolError(f"{self.name}: '{name}' must be {properties[name]['type']}")
+            allowed = properties[name].get("enum")
+            if allowed is not None and value not in allowed:
+                raise ToolError(f"{self.name}: '{name}' must be one of {allowed}")
+
+class ToolRegistry:
+    """
+    Tools an agent can expose to the model.
+    All calls from one model turn run concurrently, each under its own
+    timeout. Results of cacheable tools are reused for `cache_ttl` seconds,
+    and identical calls already in flight are shared rather than repeated.
+    Failures are returned to the model as an error result, never raised.
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None):
+        self.default_timeout = default_timeout if default_timeout is not None else float(os.getenv("TOOL_TIMEOUT", "10"))
+        self.tools: Dict[str, Tool] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        # Shared calls run in their own task, so cancelling one waiter leaves the rest
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        self.calls = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def register(self, tool: Tool) -> Tool:
+        if tool.name in self.tools:
+            raise ValueError(f"Tool already registered: {tool.name}")
+        self.tools[tool.name] = tool
+        return tool
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [tool.schema() for tool in self.tools.values()]
+
+    async def execute_all(self, calls: List[ToolCall]) -> List[Message]:
+        """Run one turn's tool calls concurrently; one "tool" message per call, in order."""
+        results = await asyncio.gather(*[self.execute(call) for call in calls])
+        return [Message(role="tool", content=result, tool_call_id=call.id) for call, result in zip(calls, results)]
+
+    async def execute(self, call: ToolCall) -> str:
+        """Run a single call and return its JSON-encoded result."""
+        self.calls += 1
+        try:
+            tool = self.tools.get(call.name)
+            if tool is None:
+                raise ToolError(f"Unknown tool: {call.name}")
+            try:
+                arguments = json.loads(call.arguments or "{}")
+            except ValueError:
+                raise ToolError(f"{call.name}: arguments are not valid JSON")
+            if not isinstance(arguments, dict):
+                raise ToolError(f"{call.name}: arguments must be an object")
+            tool.validate(arguments)
+            return await self._run_cached(tool, arguments)
+        except ToolError as e:
+            self.errors += 1
+            return json.dumps({"error": str(e)})
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return json.dumps({"error": f"{call.name} timed out"})
+        except Exception as e:
+            self.errors += 1
+            return json.dumps({"error": f"{call.name} failed: {e}"})
+
+    async def _run_cached(self, tool: Tool, arguments: Dict[str, Any]) -> str:
+        key = (tool.name, json.dumps(arguments, sort_keys=True))
+        now = time.monotonic()
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self.cache_hits += 1
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.cache_hits += 1
+        else:
+            task = asyncio.get_running_loop().create_task(self._run(tool, arguments, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    async def _run(self, tool: Tool, arguments: Dict[str, Any], key: Tuple[str, str]) -> str:
+        result = await asyncio.wait_for(self._invoke(tool, arguments), tool.timeout or self.default_timeout)
+        encoded = json.dumps(result, default=str)
+        if tool.cache_ttl > 0:
+            if len(self._cache) >= 1024:
+                now = time.monotonic()
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[key] = (time.monotonic() + tool.cache_ttl, encoded)
+        return encoded
+
+    def _finished(self, key: Tuple[str, str], task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Waiters get the exception; don't warn if they were all cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _invoke(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        result = tool.handler(**arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tools": list(self.tools),
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "timeouts": self.timeouts,
+            "errors": self.errors
+        }
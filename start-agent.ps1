@@ -2,4 +2,4 @@
 cd C:\atomic-agents
 .\venv\Scripts\Activate.ps1
 $env:PYTHONPATH = "C:\atomic-agents\src"
-python -m src.main
+python -m launcher blitz
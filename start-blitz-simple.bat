@@ -1,5 +1,5 @@
 @echo off
 echo ?? FRICTIONLESS BLITZ
 cd C:\atomic-agents\src
-..\venv\Scripts\python.exe main.py
+..\venv\Scripts\python.exe launcher.py blitz
 pause
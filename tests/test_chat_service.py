@@ -0,0 +1,76 @@
+import os
+import sys
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from core.agent import AIChatbot
+from core.chat_service import ChatService
+from core.session_store import SessionStore
+
+
+def _store(tmp_path, **kwargs):
+    return SessionStore(lambda sid: AIChatbot(agent_id=sid), db_path=str(tmp_path / "sessions.sqlite3"), **kwargs)
+
+
+@pytest.fixture
+def fake_turns(monkeypatch):
+    active = {}
+    peak = {}
+
+    async def fake_process(self, user_input, priority=None):
+        active[self.agent_id] = active.get(self.agent_id, 0) + 1
+        peak[self.agent_id] = max(peak.get(self.agent_id, 0), active[self.agent_id])
+        await asyncio.sleep(0.02)
+        active[self.agent_id] -= 1
+        return {"success": True, "response": user_input.upper(), "agent_id": self.agent_id}
+
+    monkeypatch.setattr(AIChatbot, "_process", fake_process)
+    return peak
+
+
+@pytest.mark.asyncio
+async def test_turns_in_one_session_are_serialized(fake_turns, tmp_path):
+    service = ChatService(max_inflight=100, store=_store(tmp_path))
+    async with TestClient(TestServer(service.build_app())) as client:
+        async def send(session, text):
+            resp = await client.post(f"/sessions/{session}/messages", json={"message": text})
+            return await resp.json()
+
+        results = await asyncio.gather(*[send(f"s{i % 3}", f"m{i}") for i in range(12)])
+
+    assert all(r["success"] for r in results)
+    assert service.store.get_stats()["hot"] == 3
+    assert max(fake_turns.values()) == 1
+
+
+@pytest.mark.asyncio
+async def test_overload_is_shed_with_503(fake_turns, tmp_path):
+    service = ChatService(max_inflight=2, store=_store(tmp_path))
+    async with TestClient(TestServer(service.build_app())) as client:
+        responses = await asyncio.gather(*[
+            client.post(f"/sessions/s{i}/messages", json={"message": "hi"}) for i in range(6)
+        ])
+        statuses = sorted(r.status for r in responses)
+
+    assert statuses.count(200) >= 2
+    assert 503 in statuses
+    assert service.rejected == statuses.count(503)
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_spill_to_disk_and_rehydrate(tmp_path):
+    store = _store(tmp_path, max_hot_sessions=2)
+    for i in range(5):
+        async with store.session(f"s{i}") as agent:
+            agent.memory.add("user", f"hello from s{i}")
+
+    stats = store.get_stats()
+    assert stats["hot"] == 2 and stats["evictions"] == 3
+
+    async with store.session("s0") as agent:
+        assert [m.content for m in agent.memory.turns] == ["hello from s0"]
+    assert store.get_stats()["rehydrations"] == 1
+    store.close()
@@ -0,0 +1,62 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.agent import AIChatbot
+from models.client_pool import ClientPool
+import models.client_pool as client_pool
+
+
+async def _start_fake_llm(peers):
+    async def completions(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({
+            "choices": [{"message": {"role": "assistant", "content": "pong"}}],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 1},
+            "model": "fake"
+        })
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", completions)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_session_and_client():
+    pool = ClientPool()
+    assert pool.session() is pool.session()
+    await pool.close()
+    assert pool.get_stats()["active"] is False
+    pool.session()
+    assert pool.sessions_created == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_agents_share_keepalive_connection(monkeypatch, tmp_path):
+    peers = set()
+    server = await _start_fake_llm(peers)
+    monkeypatch.setenv("API_KEY", "dummy")
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    monkeypatch.setenv("BASE_URL", str(server.make_url("")).rstrip("/"))
+    monkeypatch.setattr(client_pool, "_shared_pool", ClientPool())
+
+    try:
+        agents = [AIChatbot(agent_id=f"a{i}") for i in range(3)]
+        for agent in agents:
+            result = await agent.process("ping")
+            assert result["success"] is True
+            assert result["response"] == "pong"
+
+        assert len(peers) == 1
+        assert client_pool.get_client_pool().sessions_created == 1
+    finally:
+        await client_pool.close_client_pool()
+        await server.close()
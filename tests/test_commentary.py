@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+from datetime import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from finance.commentary import SignalCommentator, SignalDecision
+from finance.strategies.core_strategies import Signal, StrategyType
+from models.client_pool import ClientPool
+import models.client_pool as client_pool
+
+
+def _signal(symbol, action="buy", confidence=0.7):
+    return Signal(symbol, StrategyType.MOMENTUM, action, confidence, 0.03, 95.0, 110.0, datetime.now())
+
+
+@pytest.mark.asyncio
+async def test_one_batched_request_per_cycle_then_cache(monkeypatch, tmp_path):
+    requests = []
+
+    async def completions(request):
+        body = await request.json()
+        lines = body["messages"][-1]["content"].splitlines()
+        requests.append(lines)
+        answer = {line.split("|")[0]: f"Explained {line.split('|')[1]}" for line in lines}
+        return web.json_response({
+            "choices": [{"message": {"role": "assistant", "content": json.dumps(answer)}}],
+            "usage": {}, "model": "fake"
+        })
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", completions)
+    server = TestServer(app)
+    await server.start_server()
+
+    monkeypatch.setenv("API_KEY", "dummy")
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    monkeypatch.setenv("BASE_URL", str(server.make_url("")).rstrip("/"))
+    monkeypatch.setattr(client_pool, "_shared_pool", ClientPool())
+    try:
+        commentator = SignalCommentator(log_path=str(tmp_path / "commentary.jsonl"))
+        cycle = [
+            SignalDecision(_signal("BTC"), executed=True),
+            SignalDecision(_signal("ETH", "sell"), executed=False, reason="Max open positions (5) reached"),
+        ]
+        commentator.submit(cycle)
+        await commentator.drain()
+
+        assert len(requests) == 1 and len(requests[0]) == 2
+        assert "blocked: Max open positions" in requests[0][1]
+        assert [e["explanation"] for e in commentator.latest()] == ["Explained BUY BTC", "Explained SELL ETH"]
+
+        # Same setups next cycle (confidence within rounding): served from cache, no request
+        commentator.submit([SignalDecision(_signal("BTC", confidence=0.71), executed=True)])
+        await commentator.drain()
+        assert len(requests) == 1
+        assert commentator.latest(1, "btc")[0]["cached"] is True
+        assert len((tmp_path / "commentary.jsonl").read_text().splitlines()) == 2
+    finally:
+        await client_pool.close_client_pool()
+        await server.close()
+
+
+def test_parse_falls_back_to_numbered_lines():
+    parsed = SignalCommentator._parse("Sure!\n0: Momentum was strong.\n1. : Blocked by limits.")
+    assert parsed["0"] == "Momentum was strong."
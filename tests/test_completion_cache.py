@@ -0,0 +1,48 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from models.cerebras_client import CompletionResponse
+from models.completion_cache import CompletionCache
+
+
+def _payload(text):
+    return {"model": "m", "messages": [{"role": "user", "content": text}], "max_tokens": 10, "temperature": 0.7}
+
+
+def test_key_is_canonical():
+    a = {"model": "m", "temperature": 0.7}
+    b = {"temperature": 0.7, "model": "m"}
+    assert CompletionCache.make_key(a) == CompletionCache.make_key(b)
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    key = CompletionCache.make_key(_payload("hello"))
+
+    cache = CompletionCache(db_path=db)
+    assert await cache.get(key) is None
+    await cache.put(key, CompletionResponse(content="hi", usage={"total_tokens": 5}, model="m"))
+    assert (await cache.get(key)).content == "hi"
+    assert cache.memory_hits == 1 and cache.misses == 1
+    cache.close()
+
+    restarted = CompletionCache(db_path=db)
+    hit = await restarted.get(key)
+    assert hit.content == "hi" and hit.usage == {"total_tokens": 5}
+    assert restarted.disk_hits == 1
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl(tmp_path):
+    cache = CompletionCache(max_entries=2, ttl_seconds=0, db_path=str(tmp_path / "c.sqlite3"))
+    for text in ["a", "b", "c"]:
+        await cache.put(text, CompletionResponse(content=text, usage={}, model="m"))
+    assert cache.evictions == 1
+    # ttl of zero: everything is already stale
+    assert await cache.get("c") is None
+    cache.close()
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from core.control import ControlPlane
+from mycelium.constitution import RootSystem
+
+
+async def _ask(port: int, *commands: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = []
+    for command in commands:
+        writer.write(command.encode() + b"\n")
+        await writer.drain()
+        replies.append(json.loads(await reader.readline()))
+    writer.close()
+    return replies
+
+
+@pytest.mark.asyncio
+async def test_dispatch_builtins_and_unknown():
+    control = ControlPlane("test", port=-1)
+    control.set_status(lambda: {"value": 42})
+
+    status = await control.dispatch("STATUS\n")
+    assert status["ok"] and status["result"]["detail"] == {"value": 42}
+    assert status["result"]["paused"] is False
+
+    unknown = await control.dispatch("launch")
+    assert not unknown["ok"] and "status" in unknown["commands"]
+
+    control.register("boom", lambda: 1 / 0)
+    assert not (await control.dispatch("boom"))["ok"]
+
+
+@pytest.mark.asyncio
+async def test_cycle_now_cuts_the_interval_short():
+    control = ControlPlane("test", port=-1)
+    sleeper = asyncio.create_task(control.sleep(3600))
+    await asyncio.sleep(0.01)
+    assert not sleeper.done()
+    await control.dispatch("cycle-now")
+    await asyncio.wait_for(sleeper, 1)
+
+
+@pytest.mark.asyncio
+async def test_cycle_now_during_a_cycle_is_not_lost():
+    control = ControlPlane("test", port=-1)
+    await control.dispatch("cycle-now")
+    await asyncio.wait_for(control.sleep(3600), 1)
+    # Consumed: the next wait runs its full interval
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(control.sleep(3600), 0.05)
+
+
+@pytest.mark.asyncio
+async def test_pause_holds_the_loop_until_resume():
+    control = ControlPlane("test", port=-1)
+    cycles = []
+
+    async def loop():
+        while len(cycles) < 3:
+            await control.wait_until_running()
+            cycles.append(1)
+            control.cycle_done()
+            await control.sleep(0.01)
+
+    await control.dispatch("pause")
+    task = asyncio.create_task(loop())
+    await asyncio.sleep(0.05)
+    assert cycles == []
+    assert (await control.dispatch("status"))["result"]["paused"] is True
+
+    await control.dispatch("resume")
+    await asyncio.wait_for(task, 1)
+    assert control.cycles == 3
+
+
+@pytest.mark.asyncio
+async def test_tcp_endpoint_drives_a_running_loop():
+    control = ControlPlane("test", host="127.0.0.1", port=0, token="s3cret")
+    root = RootSystem()
+    root.consecutive_failures = 3
+    control.register("reset-risk", root.manual_reset)
+    await control.start()
+    try:
+        assert control.port > 0
+        sleeper = asyncio.create_task(control.sleep(3600))
+        auth, status, reset, cycle = await _ask(control.port, "auth s3cret", "status", "reset-risk", "cycle-now")
+        assert auth["ok"]
+        assert status["result"]["agent"] == "test"
+        assert reset["ok"] and root.consecutive_failures == 0
+        assert cycle["ok"]
+        await asyncio.wait_for(sleeper, 1)
+    finally:
+        await control.stop()
+
+
+@pytest.mark.asyncio
+async def test_tcp_state_changes_need_the_token():
+    root = RootSystem()
+    root.consecutive_failures = 3
+    for token in ("", "s3cret"):
+        control = ControlPlane("test", host="127.0.0.1", port=0, token=token)
+        control.register("reset-risk", root.manual_reset)
+        await control.start()
+        try:
+            status, pause, reset, auth = await _ask(control.port, "status", "pause", "reset-risk", "auth wrong")
+            assert status["ok"]
+            assert not pause["ok"] and not control.paused
+            assert not reset["ok"] and root.consecutive_failures == 3
+            assert not auth["ok"]
+        finally:
+            await control.stop()
+
+
+@pytest.mark.asyncio
+async def test_http_requests_are_refused_before_any_command():
+    control = ControlPlane("test", host="127.0.0.1", port=0, token="s3cret")
+    ran = []
+    control.register("reset-risk", lambda: ran.append("reset-risk"))
+    control.register("status", lambda: ran.append("status"), read_only=True)
+    await control.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", control.port)
+        body = b"auth s3cret\nreset-risk\nstatus\n"
+        writer.write(b"POST / HTTP/1.1\r\nHost: 127.0.0.1:8765\r\nContent-Type: text/plain\r\n"
+                     b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        # Dropped without a reply
+        assert await asyncio.wait_for(reader.read(), 1) == b""
+        writer.close()
+        assert ran == [] and not control.paused
+    finally:
+        await control.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_open_connections():
+    control = ControlPlane("test", host="127.0.0.1", port=0)
+    await control.start()
+    reader, writer = await asyncio.open_connection("127.0.0.1", control.port)
+    writer.write(b"status\n")
+    await writer.drain()
+    assert json.loads(await reader.readline())["ok"]
+    await asyncio.wait_for(control.stop(), 2)
+    assert control._clients == {}
+    assert await asyncio.wait_for(reader.read(), 1) == b""
+    writer.close()
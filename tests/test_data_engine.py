@@ -0,0 +1,123 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import models.client_pool as client_pool
+from models.client_pool import ClientPool
+from communication.bus import EventBus
+from finance.data_engine import FreeDataEngine
+from finance.market_cache import QuoteCache
+from mycelium.constitution import RootSystem
+from mycelium.nodes.crypto_hypha import CryptoHypha
+
+PRICES = {
+    "bitcoin": {"usd": 60000.0, "usd_24h_change": 1.5, "usd_24h_vol": 1e10},
+    "ethereum": {"usd": 3000.0, "usd_24h_change": -0.5, "usd_24h_vol": 5e9},
+    "solana": {"usd": 150.0, "usd_24h_change": None, "usd_24h_vol": None},
+    "cardano": {"usd": 0.5},
+}
+
+
+async def _coingecko(requests):
+    async def simple_price(request):
+        ids = request.query["ids"].split(",")
+        requests.append(ids)
+        return web.json_response({i: PRICES[i] for i in ids if i in PRICES})
+
+    app = web.Application()
+    app.router.add_get("/api/v3/simple/price", simple_price)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    pool = ClientPool()
+    monkeypatch.setattr(client_pool, "_shared_pool", pool)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_batched_fetch_fills_cache_per_symbol(pool):
+    requests = []
+    server = await _coingecko(requests)
+    url = str(server.make_url("/api/v3"))
+    try:
+        engine = FreeDataEngine(bus=EventBus(), coingecko_url=url, batch_size=3, quote_cache=QuoteCache())
+
+        quotes = await engine.get_crypto_prices(["bitcoin", "ethereum", "solana", "cardano", "nosuchcoin", "bitcoin"])
+        # Five unique ids in chunks of three: two requests
+        assert sorted(len(ids) for ids in requests) == [2, 3]
+        assert set(quotes) == {"bitcoin", "ethereum", "solana", "cardano"}
+        assert quotes["solana"].change_24h == 0 and quotes["cardano"].volume == 0
+        assert quotes["bitcoin"].symbol == "BITCOIN"
+
+        # Served from the per-symbol cache, one coin at a time
+        assert (await engine.get_crypto_price("ethereum")).price == 3000.0
+        assert len(requests) == 2
+        # Only the uncached coin goes out
+        await engine.get_crypto_prices(["bitcoin", "nosuchcoin"])
+        assert requests[-1] == ["nosuchcoin"]
+        # All over the one pooled session
+        assert pool.sessions_created == 1
+    finally:
+        await pool.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_multiple_assets_uses_one_crypto_call(pool):
+    requests = []
+    server = await _coingecko(requests)
+    url = str(server.make_url("/api/v3"))
+    try:
+        engine = FreeDataEngine(bus=EventBus(), coingecko_url=url, quote_cache=QuoteCache())
+
+        assets = await engine.get_multiple_assets(["bitcoin", "ethereum", "solana"], ["AAPL", "MSFT"])
+        assert requests == [["bitcoin", "ethereum", "solana"]]
+        assert set(assets) == {"BITCOIN", "ETHEREUM", "SOLANA", "AAPL", "MSFT"}
+    finally:
+        await pool.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_serves_stale_cache(pool):
+    requests = []
+    server = await _coingecko(requests)
+    url = str(server.make_url("/api/v3"))
+    try:
+        # ttl=0: every read goes upstream
+        engine = FreeDataEngine(bus=EventBus(), coingecko_url=url, quote_cache=QuoteCache(ttl=0))
+        await engine.get_crypto_prices(["bitcoin"])
+
+        engine.coingecko_url = "http://127.0.0.1:1/api/v3"
+        stale = await engine.get_crypto_price("bitcoin")
+        assert stale is not None and stale.price == 60000.0
+        assert await engine.get_crypto_price("ethereum") is None
+        assert engine.quotes.stale_served == 1 and engine.quotes.errors == 2
+    finally:
+        await pool.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_hypha_fetches_its_watchlist_in_one_call(pool):
+    requests = []
+    server = await _coingecko(requests)
+    url = str(server.make_url("/api/v3"))
+    try:
+        engine = FreeDataEngine(bus=EventBus(), coingecko_url=url, quote_cache=QuoteCache())
+        hypha = CryptoHypha("crypto_1", 30, RootSystem(), engine)
+        await hypha.gather_nutrients()
+        assert requests == [["bitcoin", "ethereum", "solana", "cardano"]]
+    finally:
+        await pool.close()
+        await server.close()
@@ -0,0 +1,159 @@
+import os
+import sys
+import asyncio
+import dataclasses
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from communication.bus import EventBus, OverflowPolicy, topic_matches, topic_segment
+from communication.events import Tick, TradeEvent, Alert
+from finance.data_engine import FreeDataEngine
+from finance.market_cache import QuoteCache
+from mycelium.constitution import RootSystem
+from mycelium.execution_mat import ExecutionMycelium
+
+
+def test_topic_patterns():
+    assert topic_matches("market.tick.BTC", "market.tick.BTC")
+    assert topic_matches("market.tick.*", "market.tick.BTC")
+    assert not topic_matches("market.*", "market.tick.BTC")
+    assert topic_matches("market.#", "market.tick.BTC")
+    assert topic_matches("#", "alert.critical.risk_manager")
+    assert topic_matches("trade.#", "trade")
+    assert not topic_matches("market.tick.ETH", "market.tick.BTC")
+
+
+@pytest.mark.asyncio
+async def test_dotted_symbols_stay_one_topic_segment():
+    bus = EventBus()
+    every = bus.subscribe("market.tick.*")
+    one = bus.subscribe(f"market.tick.{topic_segment('BRK.B')}")
+    await bus.publish(Tick(symbol="BRK.B", price=1.0))
+    await bus.publish(Tick(symbol="BTC", price=2.0))
+    assert Tick(symbol="BRK.B", price=1.0).topic == "market.tick.BRK_B"
+    assert len(every) == 2 and len(one) == 1
+    # The event keeps its real symbol
+    assert (await one.get()).symbol == "BRK.B"
+
+
+@pytest.mark.asyncio
+async def test_fan_out_passes_the_same_frozen_object():
+    bus = EventBus()
+    ticks = bus.subscribe("market.tick.*")
+    everything = bus.subscribe("#")
+    trades = bus.subscribe("trade.#")
+
+    tick = Tick(symbol="BTC", price=50000.0)
+    assert await bus.publish(tick) == 2
+    assert await ticks.get() is tick
+    assert await everything.get() is tick
+    assert len(trades) == 0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        tick.price = 1.0
+
+
+@pytest.mark.asyncio
+async def test_drop_policies_bound_the_queue():
+    bus = EventBus()
+    oldest = bus.subscribe("market.#", maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+    newest = bus.subscribe("market.#", maxsize=2, policy=OverflowPolicy.DROP_NEWEST)
+    for price in (1.0, 2.0, 3.0):
+        await bus.publish(Tick(symbol="BTC", price=price))
+
+    assert [oldest.get_nowait().price, oldest.get_nowait().price] == [2.0, 3.0]
+    assert [newest.get_nowait().price, newest.get_nowait().price] == [1.0, 2.0]
+    assert oldest.dropped == newest.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_the_consumer():
+    bus = EventBus()
+    sub = bus.subscribe("trade.#", maxsize=1, policy=OverflowPolicy.BLOCK)
+    await bus.publish(TradeEvent(agent="a", symbol="BTC", action="buy", size=1))
+
+    second = asyncio.create_task(bus.publish(TradeEvent(agent="a", symbol="ETH", action="buy", size=1)))
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    assert (await sub.get()).symbol == "BTC"
+    await asyncio.wait_for(second, 1)
+    assert (await sub.get()).symbol == "ETH"
+    assert sub.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_publish_nowait_never_blocks_the_caller():
+    bus = EventBus()
+    sub = bus.subscribe("alert.#", maxsize=1, policy=OverflowPolicy.BLOCK)
+    bus.publish_nowait(Alert(source="x", level="critical", message="one"))
+    bus.publish_nowait(Alert(source="x", level="critical", message="two"))
+    assert (await sub.get()).message == "one"
+    assert (await asyncio.wait_for(sub.get(), 1)).message == "two"
+
+
+@pytest.mark.asyncio
+async def test_parked_events_are_kept_and_delivered_in_order():
+    bus = EventBus()
+    sub = bus.subscribe("alert.#", maxsize=1, policy=OverflowPolicy.BLOCK)
+    for i in range(5):
+        bus.publish_nowait(Alert(source="x", level="critical", message=str(i)))
+    # An awaited publish queues behind the parked ones
+    last = asyncio.create_task(bus.publish(Alert(source="x", level="critical", message="5")))
+    await asyncio.sleep(0.01)
+    assert sub.get_stats()["parked"] == 5 and not last.done()
+
+    received = [(await asyncio.wait_for(sub.get(), 1)).message for _ in range(6)]
+    assert received == ["0", "1", "2", "3", "4", "5"]
+    await asyncio.wait_for(last, 1)
+    assert sub.dropped == 0 and sub.get_stats()["parked"] == 0
+
+    bus.publish_nowait(Alert(source="x", level="critical", message="6"))
+    bus.publish_nowait(Alert(source="x", level="critical", message="7"))
+    sub.close()
+    assert sub.get_stats()["parked"] == 0
+
+
+@pytest.mark.asyncio
+async def test_close_drains_then_stops_iteration():
+    bus = EventBus()
+    sub = bus.subscribe("#")
+    await bus.publish(Tick(symbol="BTC", price=1.0))
+    sub.close()
+    assert await bus.publish(Tick(symbol="BTC", price=2.0)) == 0
+
+    received = [tick.price async for tick in sub]
+    assert received == [1.0]
+
+
+@pytest.mark.asyncio
+async def test_waiting_consumer_is_woken():
+    bus = EventBus()
+    sub = bus.subscribe("market.tick.BTC")
+    waiter = asyncio.create_task(sub.get())
+    await asyncio.sleep(0)
+    await bus.publish(Tick(symbol="BTC", price=3.0))
+    assert (await asyncio.wait_for(waiter, 1)).price == 3.0
+
+
+@pytest.mark.asyncio
+async def test_data_engine_publishes_ticks():
+    bus = EventBus()
+    sub = bus.subscribe("market.tick.*")
+    engine = FreeDataEngine(bus=bus, quote_cache=QuoteCache())
+    await engine.get_stock_price("AAPL")
+    # Served from cache: no second tick
+    await engine.get_stock_price("AAPL")
+    tick = sub.get_nowait()
+    assert tick.symbol == "AAPL" and tick.source == "mock_data"
+    assert sub.get_nowait() is None
+
+
+@pytest.mark.asyncio
+async def test_hyphae_share_one_engine(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data/mycelium/growth_logs")
+    mat = ExecutionMycelium(RootSystem(), FreeDataEngine(bus=EventBus()))
+    await mat.spawn_hypha("crypto", 30)
+    await mat.spawn_hypha("stock", 30)
+    assert all(h.engine is mat.engine for h in mat.hyphae.values())
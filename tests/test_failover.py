@@ -0,0 +1,108 @@
+import os
+import sys
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from models.cerebras_client import CerebrasClient, Message
+from models.endpoints import CircuitBreaker, CircuitState, parse_retry_after
+
+
+async def _server(status=200, delay=0.0, calls=None, headers=None):
+    async def completions(request):
+        if calls is not None:
+            calls.append(request.url.port)
+        await asyncio.sleep(delay)
+        if status != 200:
+            return web.json_response({"error": "nope"}, status=status, headers=headers)
+        return web.json_response({
+            "choices": [{"message": {"role": "assistant", "content": f"from {request.url.port}"}}],
+            "usage": {}, "model": "fake"
+        })
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", completions)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def _url(server):
+    return str(server.make_url("")).rstrip("/")
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv("API_KEY", "dummy")
+    return monkeypatch
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_healthy_endpoint(env):
+    bad = await _server(status=503)
+    good = await _server()
+    env.setenv("BASE_URLS", f"{_url(bad)},{_url(good)}")
+    try:
+        async with CerebrasClient() as client:
+            response = await client.complete([Message("user", "hi")])
+        assert response.content == f"from {good.port}"
+    finally:
+        await bad.close()
+        await good.close()
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(env):
+    calls = []
+    server = await _server(status=400, calls=calls)
+    env.setenv("BASE_URLS", _url(server))
+    try:
+        async with CerebrasClient() as client:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.complete([Message("user", "hi")])
+        assert len(calls) == 1
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_takes_the_faster_answer(env):
+    slow = await _server(delay=1.0)
+    fast = await _server()
+    env.setenv("BASE_URLS", f"{_url(slow)},{_url(fast)}")
+    env.setenv("LLM_HEDGE", "true")
+    env.setenv("LLM_HEDGE_DELAY", "0.05")
+    env.setenv("LLM_HEDGE_MIN_DELAY", "0.05")
+    try:
+        async with CerebrasClient() as client:
+            start = asyncio.get_running_loop().time()
+            response = await client.complete([Message("user", "hi")])
+            elapsed = asyncio.get_running_loop().time() - start
+        assert response.content == f"from {fast.port}"
+        assert elapsed < 0.5
+        assert client.hedges_won == 1
+    finally:
+        await slow.close()
+        await fast.close()
+
+
+def test_breaker_opens_and_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    breaker.on_attempt()
+    assert breaker.state == CircuitState.HALF_OPEN and not breaker.available()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
@@ -0,0 +1,64 @@
+import os
+import sys
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import launcher
+from bench.startup import parse_importtime, measure_import
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _modules_after(code: str) -> set:
+    result = subprocess.run(
+        [sys.executable, "-c", code + "; import sys; print('\\n'.join(sys.modules))"],
+        capture_output=True, text=True, cwd=SRC_DIR, env=dict(os.environ, PYTHONPATH=SRC_DIR), check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_launcher_import_is_stdlib_only():
+    modules = _modules_after("import launcher")
+    for heavy in ("aiohttp", "dotenv", "asyncio", "core.agent", "finance.super_agent", "numpy"):
+        assert heavy not in modules
+
+
+def test_parsing_a_subcommand_does_not_import_it():
+    modules = _modules_after("import launcher; launcher.build_parser().parse_args(['finance', '--interval', '5'])")
+    assert "finance.super_agent" not in modules
+
+
+def test_subcommands_and_intervals():
+    parser = launcher.build_parser()
+    assert parser.parse_args(["finance"]).interval == 60
+    assert parser.parse_args(["trend-hunter", "--interval", "2"]).interval == 2
+    assert parser.parse_args(["blitz"]).command == "blitz"
+    with pytest.raises(SystemExit):
+        parser.parse_args([])
+    with pytest.raises(SystemExit):
+        parser.parse_args(["blitz", "--interval", "3"])
+
+
+def test_every_subsystem_module_imports():
+    for name, spec in launcher.SUBSYSTEMS.items():
+        __import__(spec["module"])
+
+
+def test_parse_importtime():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:        50 |         50 |     _io",
+        "import time:       120 |        170 |   io",
+        "import time:       300 |        470 | launcher",
+    ])
+    rows = parse_importtime(stderr)
+    assert [(r["module"], r["depth"]) for r in rows] == [("_io", 2), ("io", 1), ("launcher", 0)]
+    assert rows[-1]["cumulative_us"] == 470
+
+
+def test_measure_import_reports_children():
+    report = measure_import("launcher")
+    assert report["cumulative_ms"] > 0
+    assert "argparse" in [h["module"] for h in report["heaviest"]]
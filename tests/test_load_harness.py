@@ -0,0 +1,36 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from bench.llm_load import run_load, percentile
+from models.fake_server import FakeLLMServer
+
+
+def test_percentile():
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([float(i) for i in range(101)], 99) == 99.0
+    assert percentile([], 95) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream", [False, True])
+async def test_load_run_against_fake_server(monkeypatch, tmp_path, stream):
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    monkeypatch.setenv("LLM_RPM", "100000")
+    monkeypatch.setenv("LLM_MAX_CONCURRENT", "16")
+    monkeypatch.setenv("API_KEY", "dummy")
+    # run_load points BASE_URL at the fake server; restore it afterwards
+    monkeypatch.setenv("BASE_URL", "http://unused.invalid")
+
+    server = FakeLLMServer(latency_ms=5, jitter_ms=1, reply_tokens=5, tokens_per_second=1000, seed=1)
+    report = await run_load(agents=8, turns=2, stream=stream, server=server)
+
+    assert report["turns_ok"] == 16 and report["turns_failed"] == 0
+    assert report["server"]["requests"] == 16
+    assert report["client"]["sessions_created"] == 1
+    assert report["server"]["connections"] <= 8
+    if stream:
+        assert report["ttft_ms"]["p50"] is not None
@@ -0,0 +1,113 @@
+import os
+import sys
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from communication.bus import EventBus
+from finance.data_engine import FreeDataEngine
+from finance.market_cache import QuoteCache
+
+
+class Upstream:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.fail = False
+        self.version = 0
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        self.version += 1
+        return {key: f"{key}@{self.version}" for key in keys if key != "missing"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_request():
+    cache = QuoteCache(ttl=60)
+    upstream = Upstream(delay=0.02)
+    results = await asyncio.gather(
+        cache.get_many(["a", "b"], upstream),
+        cache.get_many(["b", "c"], upstream),
+        cache.get("a", upstream),
+    )
+    # "b" and "a" were in flight already: only "c" needed a second call
+    assert upstream.calls == [["a", "b"], ["c"]]
+    assert results[0] == {"a": "a@1", "b": "b@1"}
+    assert results[1] == {"b": "b@1", "c": "c@2"}
+    assert results[2] == "a@1"
+    assert cache.coalesced == 2
+
+
+@pytest.mark.asyncio
+async def test_warm_keys_are_hits():
+    cache = QuoteCache(ttl=60)
+    upstream = Upstream()
+    await cache.get_many(["a", "b"], upstream)
+    assert await cache.get_many(["a", "b"], upstream) == {"a": "a@1", "b": "b@1"}
+    assert len(upstream.calls) == 1
+    assert cache.get_stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_refresh_ahead_serves_cached_and_refreshes_in_background():
+    cache = QuoteCache(ttl=0.1, refresh_ahead=0.5)
+    upstream = Upstream()
+    await cache.get("a", upstream)
+    await asyncio.sleep(0.06)
+
+    # Still fresh: answered from cache, refreshed behind the caller's back
+    assert await cache.get("a", upstream) == "a@1"
+    await cache.drain()
+    assert upstream.calls == [["a"], ["a"]]
+    assert cache.refreshes == 1
+    assert await cache.get("a", upstream) == "a@2"
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_upstream_fails():
+    cache = QuoteCache(ttl=0.01, stale_ttl=60)
+    upstream = Upstream()
+    await cache.get("a", upstream)
+    await asyncio.sleep(0.02)
+
+    upstream.fail = True
+    assert await cache.get("a", upstream) == "a@1"
+    assert await cache.get("never-seen", upstream) is None
+    assert cache.stale_served == 1 and cache.errors == 2
+
+
+@pytest.mark.asyncio
+async def test_too_stale_is_dropped():
+    cache = QuoteCache(ttl=0.01, stale_ttl=0.02)
+    upstream = Upstream()
+    await cache.get("a", upstream)
+    await asyncio.sleep(0.03)
+    upstream.fail = True
+    assert await cache.get("a", upstream) is None
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    cache = QuoteCache(ttl=60, max_entries=2)
+    upstream = Upstream()
+    await cache.get_many(["a", "b"], upstream)
+    await cache.get("a", upstream)          # a is now most recent
+    await cache.get("c", upstream)          # evicts b
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None and cache.peek("c") is not None
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_engines_share_one_cache():
+    cache = QuoteCache(ttl=60)
+    first = FreeDataEngine(bus=EventBus(), quote_cache=cache)
+    second = FreeDataEngine(bus=EventBus(), quote_cache=cache)
+    a, b = await asyncio.gather(first.get_stock_price("AAPL"), second.get_stock_price("aapl"))
+    assert a is b
+    assert cache.misses == 1
@@ -0,0 +1,45 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from core.memory import ConversationMemory
+
+
+def test_prompt_fits_budget_and_pins_system():
+    memory = ConversationMemory("be brief", context_budget=300, reserve_tokens=100)
+    for i in range(40):
+        memory.add("user", f"message number {i} " + "x" * 40)
+
+    prompt = memory.build_prompt()
+    assert prompt[0].role == "system" and prompt[0].content == "be brief"
+    assert prompt[-1].content.startswith("message number 39")
+    assert sum(len(m.content) // 4 + 5 for m in prompt) <= 300 - 100 + 10
+    assert len(prompt) < 41
+
+
+def test_max_turns_caps_resident_history():
+    memory = ConversationMemory("sys", max_turns=5)
+    for i in range(20):
+        memory.add("user", str(i))
+    assert [m.content for m in memory.turns] == ["15", "16", "17", "18", "19"]
+
+
+@pytest.mark.asyncio
+async def test_old_turns_are_folded_into_summary():
+    calls = []
+
+    async def summarizer(summary, turns):
+        calls.append(len(turns))
+        return "user counted upwards"
+
+    memory = ConversationMemory("sys", context_budget=400, reserve_tokens=100, summarizer=summarizer)
+    for i in range(30):
+        memory.add("user", f"count {i} " + "y" * 60)
+        await memory.wait_for_compaction()
+
+    assert calls and memory.summary == "user counted upwards"
+    assert memory.turns[-1].content.startswith("count 29")
+    assert len(memory.turns) < 30
+    assert memory.build_prompt()[1].content.endswith("user counted upwards")
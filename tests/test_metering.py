@@ -0,0 +1,47 @@
+import os
+import sys
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from models.metering import UsageMeter, Budget, BudgetExceededError
+from models.scheduler import Priority
+
+
+@pytest.mark.asyncio
+async def test_aggregates_per_agent_and_model_and_flushes(tmp_path):
+    meter = UsageMeter(window_seconds=60, flush_interval=3600, path=str(tmp_path), budgets={})
+    meter.record("a", "small", {"prompt_tokens": 10, "completion_tokens": 5}, 0.2)
+    meter.record("a", "large", {"prompt_tokens": 20, "completion_tokens": 30}, 0.8)
+    meter.record("b", "small", {}, 1.0, success=False)
+
+    stats = meter.get_stats()
+    assert stats["agents"]["a"]["prompt_tokens"] == 30
+    assert stats["agents"]["a"]["completion_tokens"] == 35
+    assert stats["agents"]["b"]["errors"] == 1
+    assert stats["models"]["small"]["requests"] == 2
+
+    await meter.flush()
+    [log] = list(tmp_path.iterdir())
+    rows = [json.loads(line) for line in log.read_text().splitlines()]
+    assert {(r["agent_id"], r["model"]) for r in rows} == {("a", "small"), ("a", "large"), ("b", "small")}
+    assert meter.get_stats()["pending_windows"] == 0
+
+
+@pytest.mark.asyncio
+async def test_soft_budget_demotes_and_hard_budget_rejects(tmp_path):
+    budgets = {"*": Budget(window=3600, soft=100, hard=200)}
+    meter = UsageMeter(path=str(tmp_path), budgets=budgets, soft_delay=0)
+
+    assert await meter.admit("loop", Priority.INTERACTIVE) == Priority.INTERACTIVE
+    meter.record("loop", "m", {"total_tokens": 150}, 0.1)
+    assert await meter.admit("loop", Priority.INTERACTIVE) == Priority.BACKGROUND
+
+    meter.record("loop", "m", {"total_tokens": 60}, 0.1)
+    with pytest.raises(BudgetExceededError):
+        await meter.admit("loop", Priority.NORMAL)
+
+    # Other agents have their own allowance
+    assert await meter.admit("other", Priority.NORMAL) == Priority.NORMAL
+    assert meter.get_stats()["rejected"] == 1
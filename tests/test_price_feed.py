@@ -0,0 +1,129 @@
+import os
+import sys
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import models.client_pool as client_pool
+from models.client_pool import ClientPool
+from communication.bus import EventBus
+from finance.price_feed import PriceFeed, TickDecoder, WebSocketPriceFeed
+from finance.replay_server import ReplayServer, synthetic_ticks, save_ticks, load_ticks
+from finance.strategies.core_strategies import StrategyEngine, StrategyType
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    pool = ClientPool()
+    monkeypatch.setattr(client_pool, "_shared_pool", pool)
+    return pool
+
+
+async def _until(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_decoder_handles_split_and_batched_frames():
+    decoder = TickDecoder()
+    assert decoder.feed('{"seq": 1, "symbol": "A", "price": 1}\n{"seq": 2, "sym') == [{"seq": 1, "symbol": "A", "price": 1}]
+    assert decoder.feed('bol": "B", "price": 2}\n') == [{"seq": 2, "symbol": "B", "price": 2}]
+    # One record without a trailing newline is not held back
+    assert decoder.feed('{"seq": 3, "symbol": "C", "price": 3}') == [{"seq": 3, "symbol": "C", "price": 3}]
+    assert len(decoder.feed('[{"seq": 4}, {"seq": 5}]\n')) == 2
+    # UTF-8 split across binary frames
+    encoded = '{"symbol": "É", "price": 1}\n'.encode("utf-8")
+    cut = encoded.index(b"\xc3") + 1
+    assert decoder.feed(encoded[:cut]) == []
+    assert decoder.feed(encoded[cut:])[0]["symbol"] == "É"
+    assert decoder.feed("not json\n") == [] and decoder.errors == 1
+
+
+def test_price_feed_is_abstract():
+    with pytest.raises(TypeError):
+        PriceFeed(["bitcoin"], bus=EventBus())
+
+
+def test_recordings_round_trip(tmp_path):
+    path = str(tmp_path / "ticks" / "session.jsonl")
+    save_ticks(path, [{"symbol": "BITCOIN", "price": 1.0, "ts": 1.0}, {"symbol": "BITCOIN", "price": 2.0, "ts": 2.0}])
+    ticks = load_ticks(path)
+    assert [t["seq"] for t in ticks] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_feed_resumes_after_dropped_connection(pool):
+    ticks = synthetic_ticks(["bitcoin", "ethereum"], count=40, interval=1.0)
+    server = ReplayServer(ticks, speed=200, batch=3, port=0)
+    url = await server.start()
+    bus = EventBus()
+    published = bus.subscribe("market.tick.#", maxsize=1000)
+    feed = WebSocketPriceFeed(url, ["bitcoin", "ethereum"], bus=bus, reconnect_base=0.01, heartbeat=0)
+    seen = []
+    dropped = []
+
+    async def sink(tick):
+        seen.append(tick)
+        if len(seen) == 15 and not dropped:
+            dropped.append(True)
+            await server.drop_connections()
+
+    feed.add_sink(sink)
+    task = asyncio.get_running_loop().create_task(feed.run())
+    try:
+        await _until(lambda: len(seen) >= len(ticks))
+        assert feed.connections >= 2 and feed.reconnects >= 1
+        assert feed.last_seq == len(ticks)
+        # Every recorded tick exactly once, in order, across the reconnect
+        assert [(t.symbol, t.price) for t in seen] == [(t["symbol"], t["price"]) for t in ticks]
+        assert len(published) == len(ticks)
+        assert seen[0].source == "stream" and feed.is_live("bitcoin")
+    finally:
+        await feed.stop()
+        await asyncio.wait_for(task, 5)
+        await server.stop()
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_feed_only_receives_subscribed_symbols(pool):
+    ticks = synthetic_ticks(["bitcoin", "ethereum", "solana"], count=10)
+    server = ReplayServer(ticks, speed=0, port=0)
+    url = await server.start()
+    feed = WebSocketPriceFeed(url, ["solana"], bus=EventBus(), heartbeat=0)
+    seen = []
+
+    async def sink(tick):
+        seen.append(tick.symbol)
+
+    feed.add_sink(sink)
+    task = asyncio.get_running_loop().create_task(feed.run())
+    try:
+        await _until(lambda: len(seen) >= 10)
+        await asyncio.sleep(0.05)
+        assert seen == ["SOLANA"] * 10
+        assert feed.connected and feed.reconnects == 0
+    finally:
+        await feed.stop()
+        await asyncio.wait_for(task, 5)
+        await server.stop()
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_streamed_ticks_warm_up_trend_following():
+    engine = StrategyEngine()
+    signals = []
+    for i in range(60):
+        signals = await engine.on_tick("BITCOIN", 100.0 * (1.002 ** i))
+    assert len(engine.price_history["BITCOIN"]) == 60
+    assert StrategyType.TREND_FOLLOWING in {s.strategy for s in signals}
+
+    # A polled price for a streaming symbol is evaluated without being recorded twice
+    await engine.analyze("BITCOIN", 120.0, {}, record=False)
+    assert len(engine.price_history["BITCOIN"]) == 60
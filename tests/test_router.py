@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from models.cerebras_client import CerebrasClient, Message
+from models.router import ModelRouter, ModelSpec, TaskClass
+
+
+def _router():
+    return ModelRouter([
+        ModelSpec("small", tasks=[TaskClass.CLASSIFY, TaskClass.SUMMARIZE], cost_per_1k=0.1, max_latency=1.0),
+        ModelSpec("large", cost_per_1k=0.8),
+    ], cost_weight=1.0)
+
+
+def test_routes_by_task_class():
+    router = _router()
+    assert [s.name for s in router.candidates(TaskClass.CLASSIFY)] == ["small", "large"]
+    assert [s.name for s in router.candidates(TaskClass.ANALYSIS)] == ["large"]
+
+
+def test_slow_or_failing_model_becomes_fallback():
+    router = _router()
+    for _ in range(5):
+        router.record("small", TaskClass.CLASSIFY, 2.5, True)
+        router.record("large", TaskClass.CLASSIFY, 0.4, True)
+    assert [s.name for s in router.candidates(TaskClass.CLASSIFY)] == ["large", "small"]
+
+    router = _router()
+    for _ in range(5):
+        router.record("small", TaskClass.SUMMARIZE, 0.3, False)
+        router.record("large", TaskClass.SUMMARIZE, 0.5, True)
+    assert router.candidates(TaskClass.SUMMARIZE)[0].name == "large"
+
+
+def test_defaults_to_single_model(monkeypatch):
+    monkeypatch.delenv("LLM_MODELS", raising=False)
+    monkeypatch.setenv("MODEL", "only-model")
+    router = ModelRouter.from_env()
+    assert router.default_model == "only-model"
+    assert [s.name for s in router.candidates(TaskClass.CLASSIFY)] == ["only-model"]
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_to_next_model(monkeypatch):
+    seen = []
+
+    async def completions(request):
+        body = await request.json()
+        seen.append(body["model"])
+        if body["model"] == "small":
+            return web.json_response({"error": "overloaded"}, status=503)
+        return web.json_response({
+            "choices": [{"message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"total_tokens": 12}, "model": body["model"]
+        })
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", completions)
+    server = TestServer(app)
+    await server.start_server()
+
+    monkeypatch.setenv("API_KEY", "dummy")
+    monkeypatch.setenv("BASE_URLS", str(server.make_url("")).rstrip("/"))
+    monkeypatch.setenv("LLM_MAX_ATTEMPTS", "1")
+    monkeypatch.setenv("LLM_MODELS", json.dumps([
+        {"name": "small", "tasks": ["classify"], "cost_per_1k": 0.1},
+        {"name": "large", "cost_per_1k": 0.8}
+    ]))
+    try:
+        async with CerebrasClient() as client:
+            response = await client.complete([Message("user", "label this")], task=TaskClass.CLASSIFY)
+            assert response.model == "large"
+            assert seen == ["small", "large"]
+            stats = client.router.get_stats()
+            assert stats["small"]["failures"] == 1
+            assert stats["large"]["tokens"] == 12
+    finally:
+        await server.close()
@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import core.safety as safety_module
+from core.safety import SystemSafety, PolicySet, set_policy_set, watch_policy_file
+from bench.safety_bench import legacy_check, make_output, run_bench
+
+SAMPLES = [
+    "Here is the config: password = hunter2",
+    "Run rm -rf / to clean up",
+    "DELETE FROM users WHERE 1=1",
+    "import os; os.system('ls') then eval it",
+    "A perfectly normal answer about the keynote and the format of the report.",
+    "Delete the draft and drop me a line",
+    make_output(4096),
+    make_output(4096, "token: abc", "end"),
+]
+
+
+@pytest.fixture(autouse=True)
+def default_policies(monkeypatch):
+    monkeypatch.delenv("SAFETY_POLICY_FILE", raising=False)
+    monkeypatch.setattr(safety_module, "_active_policies", None)
+
+
+def test_verdicts_match_the_legacy_engine():
+    safety = SystemSafety()
+    policies = PolicySet.from_specs(SystemSafety.DEFAULT_POLICIES).policies
+    for text in SAMPLES:
+        expected = legacy_check(policies, text)
+        result = safety.check(text, "output")
+        assert (result["allowed"], result["max_risk"]) == (expected["allowed"], expected["max_risk"]), text
+
+
+def test_non_ascii_text_is_not_skipped_by_the_ascii_anchors():
+    # U+017F and U+212A case-fold onto 's' and 'k' under (?i) but not under str.lower()
+    variants = ["paſsword=hunter2", "ſecret: abc", "api_\u212aey = abc", "ſubprocess.call then eval(x)",
+                "Für die Konfiguration: password = hunter2", "Überblick über den Markt"]
+    safety = SystemSafety()
+    policies = PolicySet.from_specs(SystemSafety.DEFAULT_POLICIES).policies
+    for text in variants:
+        expected = legacy_check(policies, text)
+        result = safety.check(text, "output")
+        assert (result["allowed"], result["max_risk"]) == (expected["allowed"], expected["max_risk"]), text
+    assert safety.check("paſsword=hunter2", "output")["allowed"] is False
+
+
+def test_early_exit_still_reports_the_highest_risk():
+    specs = [
+        {"name": "shell", "pattern": r"rm -rf", "risk": "HIGH", "action": "block"},
+        {"name": "leak", "pattern": r"password=\S+", "risk": "CRITICAL", "action": "flag"},
+    ]
+    policies = PolicySet.from_specs(specs)
+    text = "rm -rf / and password=hunter2"
+    result = SystemSafety(policies=policies).check(text, "output")
+    assert result["allowed"] is False
+    assert result["max_risk"] == legacy_check(policies.policies, text)["max_risk"] == "CRITICAL"
+
+
+def test_combined_matcher_finds_every_policy_and_runs_the_rest_alone():
+    safety = SystemSafety()
+    result = safety.check("import os; password=x then exec it", "output")
+    assert {v["policy"] for v in result["violations"]} == {"code_injection", "credential_exposure"}
+
+    specs = SystemSafety.DEFAULT_POLICIES + [
+        {"name": "repeated_word", "pattern": r"(?i)\b(\w+) \1\b", "risk": "LOW", "action": "flag"}
+    ]
+    policies = PolicySet.from_specs(specs)
+    assert policies.scoped[-1] is None and None not in policies.scoped[:-1]
+    for text in SAMPLES + ["the the market", "The the DROP TABLE x"]:
+        expected = legacy_check(policies.policies, text)
+        result = SystemSafety(policies=policies).check(text, "output")
+        assert (result["allowed"], result["max_risk"]) == (expected["allowed"], expected["max_risk"]), text
+
+
+def test_stops_at_first_blocking_policy():
+    result = SystemSafety().check("password=x; rm -rf /; DROP TABLE t", "input")
+    assert result["allowed"] is False
+    assert len(result["violations"]) == 1
+
+
+def test_stream_scanner_sees_matches_longer_than_the_overlap():
+    cases = [("DELETE FROM users " + "x" * 400 + " WHERE 1=1\n", "database_destruction"),
+             ("import os " + "y" * 400 + " then exec it\n", "code_injection")]
+    for text, policy in cases:
+        scanner = SystemSafety().stream_scanner("output")
+        results = [scanner.feed(text[i:i + 20]) for i in range(0, len(text), 20)]
+        seen = {v["policy"] for r in results if r is not None for v in r["violations"]}
+        assert policy in seen, text
+
+
+def test_policy_file_and_hot_swap(tmp_path):
+    path = tmp_path / "policies.json"
+    path.write_text(json.dumps({"include_defaults": False, "policies": [
+        {"name": "ticker_spam", "pattern": r"(?i)\bto the moon\b", "risk": "CRITICAL", "anchors": ["moon"]}
+    ]}))
+    safety = SystemSafety()
+    assert safety.check("BTC to the moon", "output")["allowed"] is True
+
+    set_policy_set(PolicySet.from_file(str(path)))
+    assert safety.check("BTC to the moon", "output")["allowed"] is False
+    # Defaults were excluded by the file
+    assert safety.check("password=x", "input")["allowed"] is True
+
+
+@pytest.mark.asyncio
+async def test_watcher_reloads_changed_file_and_keeps_old_set_on_error(tmp_path, monkeypatch):
+    path = tmp_path / "policies.json"
+    path.write_text(json.dumps({"policies": []}))
+    monkeypatch.setenv("SAFETY_POLICY_FILE", str(path))
+    safety = SystemSafety()
+    assert safety.check("wen lambo", "output")["allowed"] is True
+
+    watcher = asyncio.create_task(watch_policy_file(interval=0.01))
+    await asyncio.sleep(0.05)
+    try:
+        path.write_text(json.dumps({"policies": [{"name": "lambo", "pattern": "lambo", "risk": "critical"}]}))
+        os.utime(path, (1, 1))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not safety.check("wen lambo", "output")["allowed"]:
+                break
+        assert safety.check("wen lambo", "output")["allowed"] is False
+
+        path.write_text(json.dumps({"policies": [{"name": "broken", "pattern": "(", "risk": "critical"}]}))
+        os.utime(path, (2, 2))
+        await asyncio.sleep(0.1)
+        assert safety.check("wen lambo", "output")["allowed"] is False
+    finally:
+        watcher.cancel()
+
+
+def test_bench_compiled_engine_beats_legacy_on_anchored_miss():
+    report = run_bench([2048], iterations=20)
+    rows = {row["case"]: row for row in report["results"]}
+    assert set(rows) == {"clean", "credential_at_end", "drop_table_at_start"}
+    assert all(row["compiled_us"] > 0 for row in rows.values())
+    # Clean text misses every anchor, so no regex runs at all
+    assert rows["clean"]["compiled_us"] < rows["clean"]["legacy_us"]
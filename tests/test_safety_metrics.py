@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import core.safety as safety_module
+from core.safety import SystemSafety
+from core.safety_metrics import SafetyMetrics, LatencyHistogram
+
+
+@pytest.fixture(autouse=True)
+def default_policies(monkeypatch):
+    monkeypatch.delenv("SAFETY_POLICY_FILE", raising=False)
+    monkeypatch.setattr(safety_module, "_active_policies", None)
+
+
+def make_safety(tmp_path, sample_rate=1.0):
+    metrics = SafetyMetrics(sample_rate=sample_rate, audit_path=str(tmp_path / "audit.jsonl"), flush_delay=60)
+    return SystemSafety(metrics=metrics), metrics
+
+
+def test_counters_split_prefilter_skips_from_evaluations(tmp_path):
+    safety, metrics = make_safety(tmp_path)
+    safety.check("A plain answer about the weekly report.", "output")
+    safety.check("Set password = hunter2 in the config", "output")
+
+    stats = metrics.get_stats()
+    assert stats["checks"] == 2
+    credential = stats["policies"]["credential_exposure"]
+    # Skipped on the clean text, evaluated and matched on the second
+    assert credential["skipped_by_prefilter"] == 1
+    assert credential["evaluated"] == 1
+    assert credential["matched"] == 1
+    # The clean check scanned every policy (no early exit)
+    assert sum(c["evaluated"] + c["skipped_by_prefilter"] for c in stats["policies"].values()) >= len(safety.policies)
+    assert stats["latency"]["output"]["count"] == 2
+
+
+def test_blocks_are_counted(tmp_path):
+    safety, metrics = make_safety(tmp_path)
+    assert not safety.check("please run rm -rf / now", "output")["allowed"]
+    assert metrics.blocks == 1
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram(bounds=(10, 100, 1000))
+    for micros in [5] * 90 + [50] * 9 + [5000]:
+        histogram.observe(micros)
+    assert histogram.percentile(50) == 10.0
+    assert histogram.percentile(99) == 100.0
+    assert histogram.percentile(100) == 5000
+    data = histogram.to_dict()
+    assert data["buckets"] == {"le_10us": 90, "le_100us": 9, "le_1000us": 0, "inf": 1}
+
+
+def test_audit_excerpt_masks_matched_text(tmp_path):
+    safety, metrics = make_safety(tmp_path)
+    safety.check("Config follows. password = hunter2 and nothing else", "output")
+    entry = metrics.recent[-1]
+    assert entry["policies"] == ["credential_exposure"]
+    assert "hunter2" not in entry["excerpt"]
+    assert "[credential_exposure]" in entry["excerpt"]
+    assert entry["excerpt"].startswith("Config follows.")
+
+
+def test_audit_excerpt_masks_every_match_in_the_window(tmp_path):
+    safety, metrics = make_safety(tmp_path)
+    safety.check("config: password = hunter2 and api_key = SECRET123 ok; then rm -rf /tmp/x", "output")
+    excerpt = metrics.recent[-1]["excerpt"]
+    assert "hunter2" not in excerpt and "SECRET123" not in excerpt
+    assert excerpt.count("[credential_exposure]") == 2
+    # A policy the check stopped before is still masked in the excerpt
+    assert "rm -rf" not in excerpt and "[destructive_command]" in excerpt
+
+
+def test_overlapping_hits_stay_masked():
+    content = "xx SECRET-TOKEN yy"
+    hits = [{"policy": "a", "start": 3, "end": 9}, {"policy": "b", "start": 5, "end": 15}]
+    excerpt = SafetyMetrics._excerpt(content, hits)
+    assert excerpt == "xx [a] yy"
+
+
+def test_sampling_rate_zero_records_nothing(tmp_path):
+    safety, metrics = make_safety(tmp_path, sample_rate=0.0)
+    safety.check("password = hunter2", "output")
+    assert metrics.matched["credential_exposure"] == 1
+    assert not metrics.recent
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_audit_file(tmp_path):
+    safety, metrics = make_safety(tmp_path)
+    safety.check("password = hunter2", "output")
+    safety.check("DROP TABLE users;", "input")
+    await metrics.flush()
+
+    with open(tmp_path / "audit.jsonl") as f:
+        entries = [json.loads(line) for line in f]
+    assert [e["context"] for e in entries] == ["output", "input"]
+    assert entries[1]["action"] == "block"
+    assert metrics.get_stats()["audit"]["pending"] == 0
+
+
+def test_false_positive_marking(tmp_path):
+    safety, metrics = make_safety(tmp_path)
+    safety.check("the token: is in the other drawer", "output")
+    audit_id = metrics.recent[-1]["id"]
+
+    assert metrics.mark_false_positive(audit_id)
+    # Marking twice does not double count
+    assert not metrics.mark_false_positive(audit_id)
+    assert not metrics.mark_false_positive(9999)
+    assert metrics.get_stats()["policies"]["credential_exposure"]["false_positives"] == 1
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import asyncio
+from datetime import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from communication.bus import EventBus
+from finance.data_engine import FreeDataEngine, MarketData
+from finance.market_cache import QuoteCache
+from finance.scanner import MarketScanner, Provider, load_universe
+
+
+def _quote(symbol, change=0.0):
+    return MarketData(symbol=symbol.upper(), price=1.0, change_24h=change, volume=0.0,
+                      timestamp=datetime.now(), source="test")
+
+
+def _engine():
+    return FreeDataEngine(bus=EventBus(), quote_cache=QuoteCache())
+
+
+class FakeProvider:
+    def __init__(self, changes=None, delay=0.0, in_flight=None):
+        self.changes = changes or {}
+        self.delay = delay
+        self.calls = []
+        # Shared between providers to observe the global limit
+        self.in_flight = in_flight if in_flight is not None else {"now": 0, "peak": 0}
+
+    async def fetch(self, symbols):
+        self.calls.append((time.monotonic(), list(symbols)))
+        self.in_flight["now"] += 1
+        self.in_flight["peak"] = max(self.in_flight["peak"], self.in_flight["now"])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight["now"] -= 1
+        return {s: _quote(s, self.changes.get(s, 0.0)) for s in symbols}
+
+
+@pytest.mark.asyncio
+async def test_held_then_volatile_then_stalest_first():
+    fake = FakeProvider(changes={"C": 9.0, "D": -12.0})
+    scanner = MarketScanner(_engine(), providers=[Provider("x", fake.fetch, rate_per_minute=6000)],
+                            max_concurrent=1, volatile_change=5)
+    universe = {"x": ["A", "B", "C", "D", "E"]}
+
+    first = await scanner.sweep(universe)
+    assert [symbol for _, symbol in first.quotes] == ["A", "B", "C", "D", "E"]
+
+    # Held before movers, bigger mover first; the rest in list order
+    plan = scanner.plan(universe, held=["e"])
+    assert [symbols[0] for _, symbols in plan] == ["E", "D", "C", "A", "B"]
+
+    await scanner.sweep({"x": ["A"]})
+    assert [symbols[0] for _, symbols in scanner.plan({"x": ["A", "B"]})] == ["B", "A"]
+
+
+@pytest.mark.asyncio
+async def test_batches_follow_priority_per_provider():
+    fake = FakeProvider()
+    scanner = MarketScanner(_engine(), providers=[Provider("x", fake.fetch, rate_per_minute=6000, batch_size=2)])
+    plan = scanner.plan({"x": ["A", "B", "C", "D", "E", "A"]}, held=["D"])
+    assert plan == [("x", ["D", "A"]), ("x", ["B", "C"]), ("x", ["E"])]
+    snapshot = await scanner.sweep({"x": ["A", "B", "C", "D", "E"]})
+    assert len(fake.calls) == 3 and len(snapshot.quotes) == 5
+
+
+@pytest.mark.asyncio
+async def test_provider_rate_limit_and_global_concurrency():
+    in_flight = {"now": 0, "peak": 0}
+    slow = FakeProvider(delay=0.05, in_flight=in_flight)
+    paced = FakeProvider(delay=0.05, in_flight=in_flight)
+    scanner = MarketScanner(_engine(), max_concurrent=3, providers=[
+        Provider("slow", slow.fetch, rate_per_minute=60000),
+        Provider("paced", paced.fetch, rate_per_minute=600, burst=1),
+    ])
+    snapshot = await scanner.sweep({"slow": [f"S{i}" for i in range(12)], "paced": ["P1", "P2", "P3"]})
+    assert len(snapshot.quotes) == 15 and not snapshot.failed
+
+    # 600/min with no burst: one request every 0.1s
+    times = [t for t, _ in paced.calls]
+    assert all(b - a >= 0.09 for a, b in zip(times, times[1:]))
+    assert in_flight["peak"] == 3
+    assert scanner.get_stats()["providers"]["paced"]["rate_wait_s"] > 0
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_errors_fail_only_their_request():
+    slow = FakeProvider(delay=1.0)
+
+    async def broken(symbols):
+        raise RuntimeError("upstream down")
+
+    fast = FakeProvider()
+    scanner = MarketScanner(_engine(), timeout=0.05, providers=[
+        Provider("slow", slow.fetch, rate_per_minute=6000),
+        Provider("broken", broken, rate_per_minute=6000),
+        Provider("fast", fast.fetch, rate_per_minute=6000),
+    ])
+    snapshot = await scanner.sweep({"slow": ["A"], "broken": ["B"], "fast": ["C"]})
+    assert list(snapshot.assets()) == ["C"]
+    assert set(snapshot.failed) == {("slow", "A"), ("broken", "B")}
+    stats = scanner.get_stats()["providers"]
+    assert stats["slow"]["timeouts"] == 1 and stats["broken"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_skips_and_skipped_symbols_go_first_next_time():
+    fake = FakeProvider()
+    scanner = MarketScanner(_engine(), providers=[Provider("x", fake.fetch, rate_per_minute=60, burst=2)])
+    snapshot = await scanner.sweep({"x": ["A", "B", "C", "D"]}, deadline=0.2)
+    assert [s for _, s in snapshot.quotes] == ["A", "B"]
+    assert snapshot.skipped == [("x", "C"), ("x", "D")]
+    assert [symbols[0] for _, symbols in scanner.plan({"x": ["A", "B", "C", "D"]})][:2] == ["C", "D"]
+
+
+@pytest.mark.asyncio
+async def test_warm_sweep_is_served_from_the_quote_cache(monkeypatch):
+    monkeypatch.setenv("SCANNER_STOCK_RPM", "6")
+    scanner = MarketScanner(_engine())
+    universe = {"stock": [f"S{i}" for i in range(6)]}
+    first = await scanner.sweep(universe)
+    assert len(first.quotes) == 6 and first.cached == 0
+    tokens = scanner.limiters["stock"].tokens
+
+    # The burst is spent (one token per 10s); fresh quotes need none
+    assert scanner.plan(universe) == []
+    second = await scanner.sweep(universe, deadline=0.2)
+    assert len(second.quotes) == 6 and second.cached == 6 and not second.skipped
+    assert scanner.get_stats()["providers"]["stock"]["requests"] == 6
+    assert scanner.limiters["stock"].tokens == pytest.approx(tokens, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_default_providers_use_the_data_engine(tmp_path):
+    scanner = MarketScanner(_engine())
+    snapshot = await scanner.sweep({"stock": ["AAPL", "MSFT"], "unknown": ["X"]})
+    assert set(snapshot.assets()) == {"AAPL", "MSFT"}
+    assert snapshot.get("stock", "AAPL").source == "mock_data"
+
+    path = tmp_path / "universe.json"
+    path.write_text('{"crypto": ["bitcoin"], "stock": ["AAPL", "NVDA"]}')
+    assert load_universe(str(path)) == {"crypto": ["bitcoin"], "stock": ["AAPL", "NVDA"]}
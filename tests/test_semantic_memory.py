@@ -0,0 +1,69 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pytest
+
+from core.memory import ConversationMemory
+from core.semantic_memory import SemanticMemory
+
+TOPICS = ["weather in lisbon", "python packaging", "chess openings", "sourdough baking",
+          "marathon training", "jazz piano", "tax deadlines", "garden tomatoes"]
+
+
+def _fill(store, count):
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)]
+        store.add("user", f"note {i} about {topic} number {i % 13}")
+
+
+def test_exact_search_finds_relevant_turn_and_survives_reopen(tmp_path):
+    store = SemanticMemory(str(tmp_path), dim=128, min_score=0.1)
+    _fill(store, 40)
+    store.add("user", "my portfolio stop loss for bitcoin is 8 percent")
+    _fill(store, 40)
+
+    [(score, role, content)] = store.search("what stop loss did I set on bitcoin", k=1)
+    assert "stop loss" in content and role == "user"
+
+    reopened = SemanticMemory(str(tmp_path))
+    assert len(reopened) == 81
+    assert reopened.search("bitcoin stop loss", k=1)[0][2] == content
+    # The newest rows can be excluded (they are already in the prompt)
+    assert all("note 79 " not in c for _, _, c in reopened.search("note 79 about", exclude_last=1, k=3))
+
+
+def test_ivf_index_agrees_with_exact_search(tmp_path):
+    store = SemanticMemory(str(tmp_path / "ivf"), dim=128, ivf_min=400, nprobe=6, min_score=0.0)
+    exact = SemanticMemory(str(tmp_path / "exact"), dim=128, ivf_min=10**9, min_score=0.0)
+    for s in (store, exact):
+        _fill(s, 1200)
+
+    assert store.get_stats()["index"] == "ivf"
+    assert exact.get_stats()["index"] == "exact"
+    for query in ("chess openings number 5", "sourdough baking", "tax deadlines number 2"):
+        # Many notes tie on score, so compare the best score rather than the row
+        assert store.search(query, k=1)[0][0] == pytest.approx(exact.search(query, k=1)[0][0])
+
+    # Index and inverted lists are persisted with the vectors
+    reopened = SemanticMemory(str(tmp_path / "ivf"))
+    assert reopened.get_stats()["clusters"] == store.get_stats()["clusters"]
+    assert sum(len(rows) for rows in reopened._lists) == 1200
+    assert np.array_equal(reopened.centroids, store.centroids)
+
+
+def test_build_prompt_injects_recalled_turns(tmp_path):
+    recall = SemanticMemory(str(tmp_path), dim=128, min_score=0.1)
+    memory = ConversationMemory("sys", context_budget=400, reserve_tokens=100, recall=recall, recall_tokens=60)
+    memory.add("user", "remember that my risk limit per trade is two percent")
+    memory.add("assistant", "noted")
+    for i in range(30):
+        memory.add("user", f"filler message {i} about something unrelated entirely")
+    memory.add("user", "what is my risk limit per trade")
+
+    prompt = memory.build_prompt()
+    contents = [m.content for m in prompt]
+    assert not any(c == "remember that my risk limit per trade is two percent" for c in contents)
+    recalled = [c for c in contents if c.startswith("Relevant earlier conversation:")]
+    assert recalled and "two percent" in recalled[0]
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.agent import AIChatbot, AgentState
+from models.client_pool import ClientPool
+import models.client_pool as client_pool
+
+
+async def _start_sse_server(chunks):
+    async def completions(request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for chunk in chunks:
+            event = {"choices": [{"delta": {"content": chunk}}]}
+            await response.write(f"data: {json.dumps(event)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", completions)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest.fixture
+def fake_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("API_KEY", "dummy")
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    monkeypatch.setattr(client_pool, "_shared_pool", ClientPool())
+
+
+async def _collect(agent, text):
+    return [event async for event in agent.process_stream(text)]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_deltas_then_done(monkeypatch, fake_env):
+    server = await _start_sse_server(["Hel", "lo ", "world"])
+    monkeypatch.setenv("BASE_URL", str(server.make_url("")).rstrip("/"))
+    try:
+        agent = AIChatbot(agent_id="s1")
+        events = await _collect(agent, "hi")
+        deltas = "".join(e["content"] for e in events if e["type"] == "delta")
+        assert deltas == "Hello world"
+        assert events[-1]["type"] == "done"
+        assert agent.conversation_history[-1].content == "Hello world"
+    finally:
+        await client_pool.close_client_pool()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_aborts_on_blocked_output(monkeypatch, fake_env):
+    chunks = ["Sure.\n", "password=hunter2\n"] + ["filler " * 20 + "\n"] * 50
+    server = await _start_sse_server(chunks)
+    monkeypatch.setenv("BASE_URL", str(server.make_url("")).rstrip("/"))
+    try:
+        agent = AIChatbot(agent_id="s2")
+        events = await _collect(agent, "hi")
+        assert events[-1]["error"] == "Output safety violation"
+        assert not any("hunter2" in e.get("content", "") for e in events)
+        assert agent.state == AgentState.SAFETY_BLOCKED
+    finally:
+        await client_pool.close_client_pool()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_aborts_on_a_match_longer_than_the_overlap(monkeypatch, fake_env):
+    text = "DELETE FROM users " + "x" * 400 + " WHERE 1=1 " + "z" * 200
+    chunks = [text[i:i + 20] for i in range(0, len(text), 20)]
+    server = await _start_sse_server(chunks)
+    monkeypatch.setenv("BASE_URL", str(server.make_url("")).rstrip("/"))
+    try:
+        agent = AIChatbot(agent_id="s3")
+        events = await _collect(agent, "hi")
+        assert events[-1]["error"] == "Output safety violation"
+        # Caught by a windowed scan, not only by the final check
+        assert "WHERE" not in "".join(e.get("content", "") for e in events)
+    finally:
+        await client_pool.close_client_pool()
+        await server.close()
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+from core.supervisor import Supervisor, AgentSpec
+
+
+def make_supervisor(**kwargs):
+    options = dict(max_concurrent=2, cpu_window=3600, backoff_base=0.01, backoff_max=0.05,
+                   stable_after=3600, port=-1)
+    options.update(kwargs)
+    return Supervisor(**options)
+
+
+def looping_agent(cycles, work=None, interval=0.0):
+    async def run(control):
+        while True:
+            await control.wait_until_running()
+            if work:
+                await work()
+            cycles.append(control.name)
+            control.cycle_done()
+            await control.sleep(interval)
+    return run
+
+
+@pytest.mark.asyncio
+async def test_crashed_agent_is_restarted_with_backoff():
+    attempts = []
+
+    async def flaky(control):
+        attempts.append(time.monotonic())
+        await control.wait_until_running()
+        if len(attempts) < 3:
+            raise RuntimeError("boom")
+        control.cycle_done()
+        await asyncio.sleep(3600)
+
+    supervisor = make_supervisor()
+    agent = supervisor.add(AgentSpec("flaky", flaky))
+    await supervisor.start()
+    for _ in range(100):
+        if agent.cycles:
+            break
+        await asyncio.sleep(0.01)
+    await supervisor.stop()
+
+    assert agent.crashes == 2 and agent.restarts == 2
+    assert agent.last_error == "RuntimeError: boom"
+    # Second wait is about twice the first
+    assert attempts[2] - attempts[1] > attempts[1] - attempts[0]
+    # Slots taken by crashed cycles were given back
+    assert supervisor.cycle_slots._value == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_budget_limits_overlapping_cycles():
+    running = []
+    peak = []
+    cycles = []
+
+    async def work():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    supervisor = make_supervisor(max_concurrent=1)
+    for name in ("a", "b", "c"):
+        supervisor.add(AgentSpec(name, looping_agent(cycles, work)))
+    await supervisor.start()
+    await asyncio.sleep(0.15)
+    await supervisor.stop()
+
+    assert max(peak) == 1
+    assert {"a", "b", "c"} <= set(cycles)
+
+
+@pytest.mark.asyncio
+async def test_cpu_budget_throttles_a_busy_agent():
+    cycles = []
+
+    async def burn():
+        end = time.process_time() + 0.02
+        while time.process_time() < end:
+            pass
+
+    supervisor = make_supervisor(cpu_window=0.2)
+    busy = supervisor.add(AgentSpec("busy", looping_agent(cycles, burn), cpu_budget=0.01))
+    await supervisor.start()
+    await asyncio.sleep(0.1)
+    status = await supervisor.get_status()
+    await supervisor.stop()
+
+    assert busy.throttled >= 1
+    assert cycles.count("busy") == 1
+    assert status["agents"]["busy"]["state"] == "throttled"
+
+
+@pytest.mark.asyncio
+async def test_cpu_is_charged_to_the_agent_that_used_it():
+    cycles = []
+
+    async def burn():
+        end = time.thread_time() + 0.02
+        while time.thread_time() < end:
+            pass
+        await asyncio.sleep(0)
+
+    async def idle():
+        await asyncio.sleep(0.02)
+
+    supervisor = make_supervisor()
+    busy = supervisor.add(AgentSpec("busy", looping_agent(cycles, burn)))
+    quiet = supervisor.add(AgentSpec("quiet", looping_agent(cycles, idle)))
+    await supervisor.start()
+    await asyncio.sleep(0.2)
+    await supervisor.stop()
+
+    # The quiet agent's cycles overlap the busy one's but are not billed for them
+    assert cycles.count("quiet") >= 3
+    assert busy.cpu_total >= 0.1
+    assert quiet.cpu_total < 0.2 * busy.cpu_total
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_loops_and_flushes():
+    flushed = []
+
+    async def flush():
+        flushed.append("finance")
+
+    supervisor = make_supervisor()
+    supervisor.add(AgentSpec("finance", looping_agent([], interval=3600), on_shutdown=flush))
+    supervisor.add(AgentSpec("mycelium", looping_agent([], interval=3600), on_shutdown=lambda: flushed.append("mycelium")))
+    await supervisor.start()
+    await asyncio.sleep(0.01)
+    await supervisor.stop()
+
+    assert sorted(flushed) == ["finance", "mycelium"]
+    assert all(agent.get_stats()["state"] == "stopped" for agent in supervisor.agents.values())
+
+
+@pytest.mark.asyncio
+async def test_stack_commands_fan_out_and_route():
+    cycles = []
+    supervisor = make_supervisor()
+    finance = supervisor.add(AgentSpec("finance", looping_agent(cycles, interval=3600)))
+    supervisor.add(AgentSpec("mycelium", looping_agent(cycles, interval=3600)))
+    finance.register("reset-risk", lambda: {"reset": True})
+    await supervisor.start()
+    await asyncio.sleep(0.01)
+    control = supervisor.control
+
+    assert (await control.dispatch("finance reset-risk"))["result"] == {"reset": True}
+    assert (await control.dispatch("mycelium status"))["result"]["agent"] == "mycelium"
+
+    await control.dispatch("pause")
+    assert all(agent.paused for agent in supervisor.agents.values())
+    await control.dispatch("cycle-now")
+    await asyncio.sleep(0.02)
+    assert cycles.count("finance") == 2 and cycles.count("mycelium") == 2
+
+    status = (await control.dispatch("status"))["result"]
+    assert set(status["detail"]["agents"]) == {"finance", "mycelium"}
+    await supervisor.stop()
@@ -0,0 +1,112 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pytest
+
+from communication.bus import EventBus
+from communication.events import Tick
+from finance.data_engine import FreeDataEngine
+from finance.market_cache import QuoteCache
+from finance.tick_store import TickStore
+from finance.replay_server import store_ticks
+from finance.strategies.core_strategies import StrategyEngine
+
+T0 = 1_760_000_000.0
+
+
+def test_appends_survive_reopen_and_grow_past_capacity(tmp_path):
+    store = TickStore(str(tmp_path))
+    for i in range(3000):
+        assert store.append("bitcoin", 100.0 + i, volume=1.0, timestamp=T0 + i)
+    store.flush()
+
+    reopened = TickStore(str(tmp_path))
+    assert reopened.symbols() == ["BITCOIN"]
+    assert len(reopened) == 3000
+    last = reopened.last("BITCOIN", 5)
+    assert last.prices.tolist() == [3095.0, 3096.0, 3097.0, 3098.0, 3099.0]
+    # Appending continues after the existing rows
+    assert reopened.append("BITCOIN", 1.0, timestamp=T0 + 5000)
+    assert len(reopened.last("BITCOIN", 10_000)) == 3001
+
+
+def test_time_range_reads_are_views(tmp_path):
+    store = TickStore(str(tmp_path))
+    for i in range(100):
+        store.append("ETH", float(i), timestamp=T0 + i)
+    window = store.window("ETH", T0 + 10, T0 + 20)
+    assert window.prices.tolist() == [float(i) for i in range(10, 20)]
+    assert isinstance(window.prices, np.memmap) and not window.prices.flags.owndata
+    assert len(store.window("ETH", T0 + 500)) == 0
+    assert len(store.window("NOSUCH")) == 0
+
+
+def test_out_of_order_ticks_are_rejected(tmp_path):
+    store = TickStore(str(tmp_path))
+    assert store.append("SOL", 1.0, timestamp=T0 + 10)
+    assert not store.append("SOL", 2.0, timestamp=T0 + 5)
+    assert store.append("SOL", 3.0, timestamp=T0 + 10)
+    assert store.get_stats()["out_of_order"] == 1
+
+
+@pytest.mark.asyncio
+async def test_compaction_buckets_old_ticks_and_drops_expired(tmp_path):
+    store = TickStore(str(tmp_path), raw_window=600, resolution=60, retention=3600, compact_interval=1e9)
+    now = T0 + 7200
+    # Expired, old (bucketed) and recent (kept raw), one tick every 10s
+    for ts in np.arange(now - 5000, now, 10.0):
+        store.append("BTC", float(ts), volume=1.0, timestamp=float(ts))
+    before = store.window("BTC", now - 600)
+
+    removed = await store.compact(now=now)
+    assert removed["BTC"] > 0
+    after = store.window("BTC")
+    assert after.timestamps[0] >= now - 3600
+    assert np.all(np.diff(after.timestamps) > 0)
+    # Recent ticks untouched, older ones one per minute with volume summed
+    assert after.prices[-len(before):].tolist() == before.prices.tolist()
+    old = store.window("BTC", None, now - 600)
+    assert len(np.unique(np.floor(old.timestamps / 60))) == len(old)
+    assert old.volumes.max() == 6.0
+    assert store.append("BTC", 1.0, timestamp=now + 1)
+
+    # Survives a restart on the new generation, old files are gone
+    reopened = TickStore(str(tmp_path))
+    assert len(reopened) == len(after) + 1
+    assert sorted(os.listdir(tmp_path / "BTC")) == ["meta.json", "price.1.f64", "ts.1.f64", "volume.1.f64"]
+    assert await store.compact(now=now) == {}
+
+
+@pytest.mark.asyncio
+async def test_engine_writes_and_strategies_warm_up(tmp_path):
+    store = TickStore(str(tmp_path))
+    engine = FreeDataEngine(bus=EventBus(), quote_cache=QuoteCache(), tick_store=store)
+    await engine.get_stock_price("AAPL")
+    assert len(store.last("AAPL", 10)) == 1
+
+    for i in range(150):
+        store.append_tick(Tick("BITCOIN", 100.0 * (1.002 ** i), timestamp=T0 + i))
+    strategies = StrategyEngine()
+    assert strategies.warm_up(store) == 101
+    assert len(strategies.price_history["BITCOIN"]) == 100
+    assert strategies.price_history["BITCOIN"][-1] == pytest.approx(100.0 * 1.002 ** 149)
+
+    replay = store_ticks(str(tmp_path), ["BITCOIN"])
+    assert len(replay) == 150 and replay[0]["seq"] == 1
+
+
+@pytest.mark.asyncio
+async def test_polled_quotes_for_streaming_symbols_are_not_stored(tmp_path):
+    store = TickStore(str(tmp_path))
+    bus = EventBus()
+    polled = bus.subscribe("market.tick.#")
+    engine = FreeDataEngine(bus=bus, quote_cache=QuoteCache(), tick_store=store)
+    engine.is_streaming = lambda symbol: symbol == "AAPL"
+    await engine.get_stock_price("AAPL")
+    await engine.get_stock_price("MSFT")
+    assert len(store.last("AAPL", 10)) == 0 and len(store.last("MSFT", 10)) == 1
+    # Still published for other consumers
+    assert len(polled) == 2
+    assert store.get_stats()["out_of_order"] == 0
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.agent import AIChatbot
+from models.cerebras_client import ToolCall
+from models.client_pool import ClientPool
+import models.client_pool as client_pool
+from tools.registry import Tool, ToolRegistry
+
+SYMBOL = {"type": "object", "properties": {"symbol": {"type": "string"}}, "required": ["symbol"]}
+
+
+def _registry(calls):
+    registry = ToolRegistry(default_timeout=1.0)
+
+    async def quote(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.2)
+        return {"symbol": symbol, "price": 100.0}
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    registry.register(Tool("quote", "Price for a symbol", quote, SYMBOL, cache_ttl=60))
+    registry.register(Tool("hang", "Never returns", hang, timeout=0.05))
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently_with_timeouts_and_cache():
+    calls = []
+    registry = _registry(calls)
+    batch = [
+        ToolCall("1", "quote", '{"symbol": "BTC"}'),
+        ToolCall("2", "quote", '{"symbol": "ETH"}'),
+        ToolCall("3", "quote", '{"symbol": "BTC"}'),
+        ToolCall("4", "hang", "{}"),
+        ToolCall("5", "quote", '{"symbol": 5}'),
+        ToolCall("6", "nope", "{}"),
+    ]
+
+    start = time.perf_counter()
+    results = await registry.execute_all(batch)
+    assert time.perf_counter() - start < 0.4
+
+    assert [m.tool_call_id for m in results] == ["1", "2", "3", "4", "5", "6"]
+    assert json.loads(results[0].content)["price"] == 100.0
+    assert results[2].content == results[0].content
+    assert "timed out" in json.loads(results[3].content)["error"]
+    assert "must be string" in json.loads(results[4].content)["error"]
+    assert "Unknown tool" in json.loads(results[5].content)["error"]
+    # The duplicate BTC call shared the in-flight one
+    assert sorted(calls) == ["BTC", "ETH"]
+
+    await registry.execute(ToolCall("7", "quote", '{"symbol": "ETH"}'))
+    assert sorted(calls) == ["BTC", "ETH"]
+    assert registry.get_stats()["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_a_shared_call():
+    calls = []
+    registry = _registry(calls)
+    first = asyncio.create_task(registry.execute_all([ToolCall("1", "quote", '{"symbol": "BTC"}')]))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(registry.execute_all([ToolCall("2", "quote", '{"symbol": "BTC"}')]))
+    await asyncio.sleep(0.05)
+    first.cancel()
+
+    results = await asyncio.wait_for(second, 1)
+    assert json.loads(results[0].content)["price"] == 100.0
+    assert first.cancelled() and calls == ["BTC"]
+
+
+@pytest.mark.asyncio
+async def test_agent_resolves_tool_calls_before_answering(monkeypatch, tmp_path):
+    requests = []
+
+    async def completions(request):
+        body = await request.json()
+        requests.append(body)
+        if body["messages"][-1]["role"] != "tool":
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "c1", "type": "function", "function": {"name": "quote", "arguments": '{"symbol": "BTC"}'}}
+            ]}
+        else:
+            price = json.loads(body["messages"][-1]["content"])["price"]
+            message = {"role": "assistant", "content": f"BTC trades at {price}"}
+        return web.json_response({"choices": [{"message": message}], "usage": {}, "model": "fake"})
+
+    app = web.Application()
+    app.router.add_post("/chat/completions", completions)
+    server = TestServer(app)
+    await server.start_server()
+
+    monkeypatch.setenv("API_KEY", "dummy")
+    monkeypatch.setenv("COMPLETION_CACHE", "false")
+    monkeypatch.setenv("METERING_PATH", str(tmp_path))
+    monkeypatch.setenv("BASE_URL", str(server.make_url("")).rstrip("/"))
+    monkeypatch.setattr(client_pool, "_shared_pool", ClientPool())
+    try:
+        agent = AIChatbot(agent_id="tools", tools=_registry([]))
+        result = await agent.process("price of bitcoin?")
+        assert result["response"] == "BTC trades at 100.0"
+        assert requests[0]["tools"][0]["function"]["name"] == "quote"
+        assert requests[1]["messages"][-2]["tool_calls"][0]["id"] == "c1"
+        assert requests[1]["messages"][-1]["tool_call_id"] == "c1"
+        # Only the user turn and the final answer are remembered
+        assert [m.role for m in agent.conversation_history] == ["system", "user", "assistant"]
+    finally:
+        await client_pool.close_client_pool()
+        await server.close()